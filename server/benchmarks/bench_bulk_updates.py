@@ -0,0 +1,78 @@
+"""
+Throughput benchmark: one POST per update vs POST /api/updates/bulk.
+
+    python benchmarks/bench_bulk_updates.py --updates 5000
+
+Works on a fresh copy of the generate_data.py dataset (cached like
+bench_suite.py) and submits the same number
+of valid updates both ways through the Flask test client. Output is JSON.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from bench_suite import dataset_copy, prepare_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--promises", type=int, default=50_000, help="dataset size (see generate_data.py)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--updates", type=int, default=5_000, help="updates per mode")
+    parser.add_argument("--single", type=int, default=500,
+                        help="updates sent one POST at a time (slow path, kept smaller)")
+    args = parser.parse_args()
+
+    db_path = dataset_copy(prepare_dataset(args.promises, args.seed), prefix="bench_bulk_")
+
+    from controller import create_app
+
+    app = create_app(DB_PATH=db_path, CACHE_MAXSIZE=0)
+    client = app.test_client()
+
+    # ทุกวันที่อยู่หลังวันประกาศของข้อมูลสังเคราะห์ และเรียงขึ้นเรื่อยๆ จึงผ่านการตรวจทุกข้อ
+    rng = random.Random(7)
+    candidates = [row["promise_id"] for batch in app.extensions["models"].promises
+                  .iter_promises_with_politician_info() for row in batch if row["status"] != "เงียบหาย"]
+
+    def make_items(n, year):
+        return [{"promise_id": rng.choice(candidates), "detail": f"bench {i}",
+                 "update_date": f"{year}-{i % 12 + 1:02d}-01"} for i in range(n)]
+
+    single_items = sorted(make_items(args.single, 2090), key=lambda item: item["update_date"])
+    started = time.perf_counter()
+    for item in single_items:
+        response = client.post(f"/api/promises/{item['promise_id']}/updates", json=item)
+        assert response.status_code == 201, response.get_json()
+    single_seconds = time.perf_counter() - started
+
+    bulk_items = sorted(make_items(args.updates, 2091), key=lambda item: item["update_date"])
+    started = time.perf_counter()
+    body = client.post("/api/updates/bulk", json=bulk_items).get_json()
+    bulk_seconds = time.perf_counter() - started
+    assert body["created"] == len(bulk_items), body["rejected"]
+
+    ndjson = "\n".join(json.dumps(item) for item in
+                       sorted(make_items(args.updates, 2092), key=lambda item: item["update_date"]))
+    started = time.perf_counter()
+    body = client.post("/api/updates/bulk", data=ndjson, content_type="application/x-ndjson").get_json()
+    ndjson_seconds = time.perf_counter() - started
+    assert body["created"] == args.updates, body["rejected"]
+
+    results = {
+        "promises": args.promises,
+        "single_post": {"updates": args.single, "seconds": round(single_seconds, 3),
+                        "per_second": round(args.single / single_seconds)},
+        "bulk_json": {"updates": args.updates, "seconds": round(bulk_seconds, 3),
+                      "per_second": round(args.updates / bulk_seconds)},
+        "bulk_ndjson": {"updates": args.updates, "seconds": round(ndjson_seconds, 3),
+                        "per_second": round(args.updates / ndjson_seconds)},
+    }
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
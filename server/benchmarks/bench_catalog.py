@@ -0,0 +1,119 @@
+"""
+Catalog benchmark: in-memory CatalogEngine vs the SQLite models.
+
+    python benchmarks/bench_catalog.py --promises 100000
+
+Uses the generate_data.py dataset (cached like bench_suite.py) and reports
+the catalog's memory footprint (tracemalloc) next to the same rows held as
+tuples, plus the mean latency of get_all_politicians,
+get_politicians_by_party, get_campaigns_by_politician and
+get_promises_by_politician from SQLite (read cache off) and from the
+catalog. As in a request, the DataVersions tokens the catalog checks are
+already memoized (the ETag read of @conditional) before the timed calls.
+Output is JSON.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from bench_suite import prepare_dataset
+
+METHODS = [
+    ("politicians", "get_all_politicians", None),
+    ("politicians", "get_politicians_by_party", "party"),
+    ("campaigns", "get_campaigns_by_politician", "politician_id"),
+    ("promises", "get_promises_by_politician", "politician_id"),
+]
+
+
+def mean_us(fn, args_list):
+    started = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return round((time.perf_counter() - started) / len(args_list) * 1e6, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--promises", type=int, default=100_000, help="dataset size (see generate_data.py)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--lookups", type=int, default=2000, help="calls per method")
+    args = parser.parse_args()
+
+    db_path = prepare_dataset(args.promises, args.seed)
+
+    from controller import create_app
+    from model.catalog import CatalogEngine
+    from model.encoding import tuple_cursor
+    from model.versions_model import (POLITICIAN_LIST_SCOPE, begin_request_versions, politician_scope,
+                                      read_version)
+
+    app = create_app(DB_PATH=db_path, CACHE_MAXSIZE=0)
+    models = app.extensions["models"]
+
+    # memory: catalog เทียบกับแถวเดียวกันที่เก็บเป็น tuple (รูปแบบที่ RowSet / read cache ถือไว้)
+    tracemalloc.start()
+    engine = CatalogEngine(db_path)
+    engine.load()
+    catalog_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    with models.promises.pool.reader() as conn:
+        rows = [tuple_cursor(conn).execute(f"SELECT * FROM {table}").fetchall()
+                for table in ("Politicians", "Campaigns", "Promises")]
+    tuple_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    row_counts = [len(r) for r in rows]
+    del rows
+
+    rng = random.Random(args.seed)
+    politicians = [p["politician_id"] for p in models.politicians.get_all_politicians()]
+    parties = sorted({p["party"] for p in models.politicians.get_all_politicians()})
+    samples = {
+        None: [()] * max(1, args.lookups // 20),
+        "party": [(rng.choice(parties),) for _ in range(args.lookups)],
+        "politician_id": [(rng.choice(politicians),) for _ in range(args.lookups)],
+    }
+
+    # token ของทุก scope อ่านไว้ก่อน เหมือน @conditional อ่านไว้ให้ใน request จริง
+    begin_request_versions()
+    for scope in [POLITICIAN_LIST_SCOPE] + [politician_scope(pid) for pid in politicians]:
+        read_version(engine.pool, scope)
+
+    latency = {}
+    for model_name, method, arg in METHODS:
+        sqlite_method = getattr(getattr(models, model_name), method)
+        catalog_method = getattr(engine, method)
+        calls = samples[arg]
+        mean_us(catalog_method, calls[:50])  # warm up
+        mean_us(sqlite_method, calls[:50])
+        sqlite_us = mean_us(sqlite_method, calls)
+        catalog_us = mean_us(catalog_method, calls)
+        latency[method] = {"sqlite_us": sqlite_us, "catalog_us": catalog_us,
+                           "speedup": round(sqlite_us / max(catalog_us, 1e-9), 1)}
+
+    started = time.perf_counter()
+    engine.load()
+    rebuild_seconds = time.perf_counter() - started
+
+    results = {
+        "promises": args.promises,
+        "rows": dict(zip(("politicians", "campaigns", "promises"), row_counts)),
+        "memory_mb": {
+            "catalog": round(catalog_bytes / 2**20, 1),
+            "rows_as_tuples": round(tuple_bytes / 2**20, 1),
+        },
+        "rebuild_seconds": round(rebuild_seconds, 3),
+        "latency": latency,
+    }
+    engine.close()
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
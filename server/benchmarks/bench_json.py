@@ -0,0 +1,148 @@
+"""
+JSON benchmark: Flask's default provider vs FastJSONProvider on /api/promises.
+
+    python benchmarks/bench_json.py --rows 100000
+
+Uses the generate_data.py dataset (cached like bench_suite.py) and reports,
+for each JSON provider, the time and response size of a full /api/promises stream and the
+mean time of a 200-row page (plus the ?format=columnar page). A second
+section splits the buffered path into fetch (sqlite3.Row -> dict vs RowSet
+tuples) and encode. Output is JSON.
+"""
+import argparse
+import json
+import sqlite3
+import statistics
+import sys
+import time
+
+from bench_suite import prepare_dataset
+
+PAGE_REQUESTS = 200
+
+LIST_SQL = """
+    SELECT
+        p.promise_id, p.description, p.status, p.announcement_date,
+        pol.name AS politician_name,
+        pol.party AS party_name,
+        pol.politician_id
+    FROM Promises p
+    JOIN Politicians pol ON p.politician_id = pol.politician_id
+    ORDER BY p.announcement_date DESC
+"""
+
+
+def best_of(fn, repeat=3):
+    """(best seconds, last result) of repeat runs"""
+    times, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def endpoint_results(app):
+    client = app.test_client()
+
+    def full_stream():
+        response = client.get("/api/promises", query_string={"stream": "1"}, buffered=False)
+        size = sum(len(chunk) for chunk in response.response)
+        response.close()
+        return size
+
+    def pages(**query):
+        latencies = []
+        for _ in range(PAGE_REQUESTS):
+            started = time.perf_counter()
+            response = client.get("/api/promises", query_string={"limit": 200, **query})
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.status_code
+        return latencies, len(response.get_data())
+
+    seconds, size = best_of(full_stream)
+    page_latencies, page_bytes = pages()
+    results = {
+        "stream_seconds": round(seconds, 3),
+        "stream_bytes": size,
+        "page_mean_ms": round(statistics.mean(page_latencies) * 1000, 2),
+        "page_bytes": page_bytes,
+    }
+    if app.json.__class__.__name__ == "FastJSONProvider":
+        columnar_latencies, columnar_bytes = pages(format="columnar")
+        results["columnar_page_mean_ms"] = round(statistics.mean(columnar_latencies) * 1000, 2)
+        results["columnar_page_bytes"] = columnar_bytes
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="dataset size (see generate_data.py)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    db_path = prepare_dataset(args.rows, args.seed)
+
+    from flask.json.provider import DefaultJSONProvider
+    from controller import create_app
+    from model.encoding import RowSet, fetch_rowset, orjson, tuple_cursor
+
+    class FlaskDefaultProvider(DefaultJSONProvider):
+        """Flask's provider (sort_keys, ASCII escapes) that can also read RowSets"""
+
+        @staticmethod
+        def default(o):
+            if isinstance(o, RowSet):
+                return o.to_dicts()
+            return DefaultJSONProvider.default(o)
+
+    fast_app = create_app(DB_PATH=db_path, CACHE_MAXSIZE=0)
+    default_app = create_app(DB_PATH=db_path, CACHE_MAXSIZE=0)
+    default_app.json = FlaskDefaultProvider(default_app)
+
+    # แยกเวลา fetch / encode ของทั้งรายการ (แบบ buffered)
+    def fetch_dicts():
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in conn.execute(LIST_SQL).fetchall()]
+        finally:
+            conn.close()
+
+    def fetch_tuples():
+        conn = sqlite3.connect(db_path)
+        try:
+            return fetch_rowset(tuple_cursor(conn).execute(LIST_SQL))
+        finally:
+            conn.close()
+
+    fetch_dicts_s, dicts = best_of(fetch_dicts)
+    fetch_rowset_s, rowset = best_of(fetch_tuples)
+    default_encode_s, default_text = best_of(lambda: default_app.json.dumps(dicts))
+    fast_encode_s, fast_bytes = best_of(lambda: fast_app.json.encode(rowset))
+    columnar_encode_s, columnar_bytes = best_of(lambda: fast_app.json.encode(rowset.columnar()))
+
+    results = {
+        "rows": args.rows,
+        "encoder": "orjson " + orjson.__version__ if orjson is not None else "stdlib json",
+        "endpoint": {
+            "flask_default": endpoint_results(default_app),
+            "fast": endpoint_results(fast_app),
+        },
+        "buffered_breakdown": {
+            "fetch_dicts_seconds": round(fetch_dicts_s, 3),
+            "fetch_rowset_seconds": round(fetch_rowset_s, 3),
+            "flask_default_encode_seconds": round(default_encode_s, 3),
+            "flask_default_bytes": len(default_text.encode("utf-8")),
+            "fast_encode_seconds": round(fast_encode_s, 3),
+            "fast_bytes": len(fast_bytes),
+            "columnar_encode_seconds": round(columnar_encode_s, 3),
+            "columnar_bytes": len(columnar_bytes),
+        },
+    }
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
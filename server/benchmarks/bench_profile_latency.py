@@ -0,0 +1,115 @@
+"""
+Latency benchmark: sequential vs concurrent sub-queries for the profile and
+promise-detail reads.
+
+    python benchmarks/bench_profile_latency.py --promises 200000 --politicians 50
+
+"sequential" calls the model methods one after another (the default route
+body); "concurrent" runs them on a ReadFanout thread pool, as the routes do
+with READ_WORKERS > 0. "route" / "route_concurrent" time the full GET with
+READ_WORKERS=0 and --workers. Uses the generate_data.py dataset (cached
+like bench_suite.py); the read cache is disabled so every call reaches
+SQLite. Output is JSON.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+from bench_suite import prepare_dataset
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+    }
+
+
+def timed(fn, ids):
+    samples = []
+    for item in ids:
+        started = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--promises", type=int, default=200_000)
+    parser.add_argument("--politicians", type=int, default=50)
+    parser.add_argument("--updates-per-promise", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4, help="READ_WORKERS of the concurrent runs")
+    args = parser.parse_args()
+
+    db_path = prepare_dataset(args.promises, args.seed, politicians=args.politicians,
+                              updates_per_promise=args.updates_per_promise)
+
+    from controller import create_app
+    from model.parallel_reads import ReadFanout
+
+    app = create_app(DB_PATH=db_path, CACHE_MAXSIZE=0)
+    m = app.extensions["models"]
+    client = app.test_client()
+    concurrent_client = create_app(DB_PATH=db_path, CACHE_MAXSIZE=0, READ_WORKERS=args.workers).test_client()
+    fanout = ReadFanout(args.workers)
+
+    rng = random.Random(1)
+    politician_ids = [p["politician_id"] for p in m.politicians.get_all_politicians()]
+    pol_sample = [rng.choice(politician_ids) for _ in range(args.iterations)]
+    with m.promises.pool.reader() as conn:
+        promise_ids = [row[0] for row in conn.execute("SELECT promise_id FROM Promises")]
+    promise_sample = [rng.choice(promise_ids) for _ in range(args.iterations)]
+
+    def profile_sequential(pid):
+        m.politicians.get_politician_by_id(pid)
+        m.campaigns.get_campaigns_by_politician(pid)
+        m.promises.get_promises_by_politician(pid)
+
+    def profile_concurrent(pid):
+        fanout.run(
+            (m.politicians.get_politician_by_id, pid),
+            (m.campaigns.get_campaigns_by_politician, pid),
+            (m.promises.get_promises_by_politician, pid),
+        )
+
+    def detail_sequential(pid):
+        m.promises.get_promise_detail_by_id(pid)
+        m.updates.get_updates_by_promise_id(pid)
+
+    def detail_concurrent(pid):
+        fanout.run(
+            (m.promises.get_promise_detail_by_id, pid),
+            (m.updates.get_updates_by_promise_id, pid),
+        )
+
+    results = {
+        "promises": args.promises,
+        "politicians": args.politicians,
+        "iterations": args.iterations,
+        "profile": {
+            "sequential": timed(profile_sequential, pol_sample),
+            "concurrent": timed(profile_concurrent, pol_sample),
+            "route": timed(lambda pid: client.get(f"/api/politicians/{pid}"), pol_sample),
+            "route_concurrent": timed(lambda pid: concurrent_client.get(f"/api/politicians/{pid}"), pol_sample),
+        },
+        "promise_detail": {
+            "sequential": timed(detail_sequential, promise_sample),
+            "concurrent": timed(detail_concurrent, promise_sample),
+            "route": timed(lambda pid: client.get(f"/api/promises/{pid}"), promise_sample),
+            "route_concurrent": timed(lambda pid: concurrent_client.get(f"/api/promises/{pid}"), promise_sample),
+        },
+    }
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
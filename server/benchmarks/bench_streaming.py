@@ -0,0 +1,72 @@
+"""
+Memory benchmark: buffered JSON list vs streamed NDJSON / chunked JSON array.
+
+    python benchmarks/bench_streaming.py --rows 1000000
+
+Uses the generate_data.py dataset (cached like bench_suite.py) and reports the
+Python heap peak (tracemalloc) and wall time for producing the full /api/promises result
+in each mode. Output is JSON.
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from bench_suite import prepare_dataset
+
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(elapsed, 3), "peak_mb": round(peak / 2**20, 1), "bytes": size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="dataset size (see generate_data.py)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    db_path = prepare_dataset(args.rows, args.seed)
+
+    from controller import create_app
+    from flask import jsonify
+    from model.encoding import RowSet
+
+    # CACHE_MAXSIZE=0: ไม่ให้ cache ถือผลลัพธ์ทั้งก้อนไว้
+    app = create_app(DB_PATH=db_path, CACHE_MAXSIZE=0)
+    models = app.extensions["models"]
+    client = app.test_client()
+
+    def buffered():
+        # รูปแบบเดิม: list of dict ทั้งหมด แล้ว jsonify ทีเดียว
+        with app.app_context():
+            batches = list(models.promises.iter_promises_with_politician_info())
+            data = RowSet(batches[0].columns if batches else [], [row for batch in batches for row in batch.rows])
+            return len(jsonify({"status": "success", "count": len(data), "data": data}).get_data())
+
+    def streamed(**kwargs):
+        def run():
+            response = client.get("/api/promises", buffered=False, **kwargs)
+            size = sum(len(chunk) for chunk in response.response)
+            response.close()
+            return size
+        return run
+
+    results = {
+        "rows": args.rows,
+        "buffered_json": measure(buffered),
+        "stream_ndjson": measure(streamed(headers={"Accept": "application/x-ndjson"})),
+        "stream_json_array": measure(streamed(query_string={"stream": "1"})),
+    }
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""
+Benchmark suite: every API route, then a concurrent load test, reported as JSON.
+
+    python benchmarks/bench_suite.py --promises 100000 --output before.json
+    ... change code ...
+    python benchmarks/bench_suite.py --promises 100000 --compare before.json
+
+1. routes: each route in controller.py is called sequentially through the
+   Flask test client (p50 / p99 / mean latency, requests per second).
+2. load: --concurrency threads send a weighted mix of the same requests for
+   --duration seconds, in process through test clients or, with --url, over
+   HTTP to a running server (e.g. gunicorn).
+Peak RSS of this process is recorded after each phase.
+
+Datasets are made by generate_data.py + load_csv_to_db.py and cached under
+benchmarks/.data/ by size and seed, so repeated runs and runs on different
+commits use identical data. Each run works on a fresh copy of the cached
+database because the write routes modify it.
+"""
+import argparse
+import contextlib
+import http.client
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from urllib.parse import quote, urlsplit
+
+try:
+    import resource  # ไม่มีบน Windows
+except ImportError:
+    resource = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(SERVER_DIR, "src"))
+
+DATA_DIR = os.path.join(BENCH_DIR, ".data")
+SEARCH_TERMS = ["ค่าไฟฟ้า", "สวนสาธารณะ", "ฝุ่น PM2.5", "เบี้ยผู้สูงอายุ", "รถไฟฟ้า", "งบประมาณ", "ครม."]
+BULK_SIZE = 100
+
+
+# =========================================================
+# DATASET
+# =========================================================
+def prepare_dataset(promises: int, seed: int = 42, politicians: int = None,
+                    updates_per_promise: float = None) -> str:
+    """
+    Return the path of the cached generate_data.py database for these
+    parameters, generating it if needed. politicians / updates_per_promise
+    default to generate_data.py's own defaults.
+    """
+    name = f"{promises}-{seed}"
+    command = [sys.executable, os.path.join(BENCH_DIR, "generate_data.py"), "--promises", str(promises),
+               "--seed", str(seed)]
+    if politicians is not None:
+        name += f"-pol{politicians}"
+        command += ["--politicians", str(politicians)]
+    if updates_per_promise is not None:
+        name += f"-upd{updates_per_promise:g}"
+        command += ["--updates-per-promise", str(updates_per_promise)]
+    folder = os.path.join(DATA_DIR, name)
+    db_path = os.path.join(folder, "political_party.db")
+    if not os.path.exists(db_path):
+        subprocess.run(command + ["--out", folder, "--load"], check=True, stdout=sys.stderr)
+    return db_path
+
+
+def dataset_copy(cached_db: str, prefix: str = "bench_") -> str:
+    """Copy a cached database into a new temp directory (for runs that write to it)"""
+    db_path = os.path.join(tempfile.mkdtemp(prefix=prefix), "political_party.db")
+    shutil.copyfile(cached_db, db_path)
+    return db_path
+
+
+def sample_ids(db_path: str, rng: random.Random, size: int = 5000) -> dict:
+    conn = sqlite3.connect(db_path)
+    try:
+        def column(sql):
+            return [row[0] for row in conn.execute(sql)]
+
+        # สุ่มแบบ rowid เพื่อไม่ต้องเรียงทั้งตาราง
+        promise_ids = column(f"SELECT promise_id FROM Promises WHERE rowid IN "
+                             f"(SELECT abs(random()) % (SELECT MAX(rowid) FROM Promises) + 1 FROM "
+                             f"(WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n LIMIT {size}) "
+                             f"SELECT i FROM n))")
+        writable = column("SELECT promise_id FROM Promises WHERE status <> 'เงียบหาย' "
+                          f"AND rowid % 7 = 0 LIMIT {size}")
+        politician_ids = column(f"SELECT politician_id FROM Politicians LIMIT {size}")
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in ("Politicians", "Campaigns", "Promises", "PromiseUpdates")}
+    finally:
+        conn.close()
+    rng.shuffle(politician_ids)
+    return {"promise_ids": promise_ids, "writable": writable, "politician_ids": politician_ids, "rows": counts}
+
+
+# =========================================================
+# SCENARIOS: (ชื่อ, url rule ที่ครอบคลุม, น้ำหนักใน load test, ฟังก์ชันสร้าง request)
+# request = (method, path, json_body, headers)
+# =========================================================
+def build_scenarios(ids: dict, rng: random.Random, cursors: list):
+    # วันที่ของ write ทุกครั้งเพิ่มขึ้นเรื่อยๆ จึงไม่ชนกฎ "ห้ามย้อนหลังกว่าการอัปเดตล่าสุด"
+    day = itertools.count()
+    base = date(2030, 1, 1)
+
+    def next_date():
+        return (base + timedelta(days=next(day) // 50)).isoformat()
+
+    promise = lambda: rng.choice(ids["promise_ids"])
+    politician = lambda: rng.choice(ids["politician_ids"])
+    writable = lambda: rng.choice(ids["writable"])
+
+    return [
+        ("promises_page", "/api/promises", 10,
+         lambda: ("GET", "/api/promises?limit=50", None, {})),
+        ("promises_page_cursor", "/api/promises", 5,
+         lambda: ("GET", f"/api/promises?limit=50&cursor={rng.choice(cursors)}", None, {})),
+        ("promises_filtered_total", "/api/promises", 3,
+         lambda: ("GET", f"/api/promises?status={quote('กำลังดำเนินการ')}&include_total=1", None, {})),
+        ("promises_by_ids", "/api/promises", 3,
+         lambda: ("GET", "/api/promises?ids=" + ",".join(rng.sample(ids["promise_ids"], 20)), None, {})),
+        ("promises_stream_ndjson", "/api/promises", 0,
+         lambda: ("GET", f"/api/promises?politician_id={politician()}", None,
+                  {"Accept": "application/x-ndjson"})),
+        ("promise_detail", "/api/promises/<promise_id>", 25,
+         lambda: ("GET", f"/api/promises/{promise()}", None, {})),
+        ("politician_profile", "/api/politicians/<politician_id>", 20,
+         lambda: ("GET", f"/api/politicians/{politician()}", None, {})),
+        ("politicians_list", "/api/politicians", 3,
+         lambda: ("GET", "/api/politicians", None, {})),
+        ("search", "/api/search", 5,
+         lambda: ("GET", f"/api/search?q={quote(rng.choice(SEARCH_TERMS))}&limit=20", None, {})),
+        ("stats_politicians", "/api/stats/politicians", 2,
+         lambda: ("GET", "/api/stats/politicians", None, {})),
+        ("stats_parties", "/api/stats/parties", 2,
+         lambda: ("GET", "/api/stats/parties", None, {})),
+        ("stats_promises", "/api/stats/promises", 2,
+         lambda: ("GET", f"/api/stats/promises?politician_id={politician()}", None, {})),
+        ("batch", "/api/batch", 5,
+         lambda: ("POST", "/api/batch", {"requests": [f"/api/politicians/{politician()}"]
+                                         + [f"/api/promises/{promise()}" for _ in range(9)]}, {})),
+        ("add_update", "/api/promises/<promise_id>/updates", 2,
+         lambda: (lambda pid: ("POST", f"/api/promises/{pid}/updates",
+                               {"detail": "benchmark", "update_date": next_date()}, {}))(writable())),
+        ("bulk_updates", "/api/updates/bulk", 0,
+         lambda: ("POST", "/api/updates/bulk",
+                  [{"promise_id": writable(), "detail": "benchmark", "update_date": next_date()}
+                   for _ in range(BULK_SIZE)], {})),
+    ]
+
+
+# =========================================================
+# CLIENTS
+# =========================================================
+class TestClientRunner:
+    """Sends scenario requests through a Flask test client (one per thread)"""
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def send(self, method, path, body, headers) -> int:
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body, headers=headers)
+        response.get_data()  # อ่าน body ให้ครบ (รวม response แบบ stream)
+        return response.status_code
+
+
+class HttpRunner:
+    """Sends scenario requests to a running server, one keep-alive connection per thread"""
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.local = threading.local()
+
+    def send(self, method, path, body, headers) -> int:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers = dict(headers, **{"Content-Type": "application/json"})
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self.local.conn = None
+            return 599
+
+
+# =========================================================
+# MEASUREMENT
+# =========================================================
+def percentiles(samples) -> dict:
+    if not samples:
+        return {"p50_ms": None, "p99_ms": None, "mean_ms": None}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # Linux: KB
+
+
+def run_routes(runner, scenarios, iterations: int, warmup: int) -> dict:
+    results = {}
+    for name, _, _, make in scenarios:
+        n = max(1, iterations // 10) if name in ("promises_stream_ndjson", "bulk_updates") else iterations
+        for _ in range(min(warmup, n)):
+            runner.send(*make())
+        samples, errors = [], 0
+        started = time.perf_counter()
+        for _ in range(n):
+            request = make()
+            t0 = time.perf_counter()
+            status = runner.send(*request)
+            samples.append(time.perf_counter() - t0)
+            errors += status >= 400
+        elapsed = time.perf_counter() - started
+        results[name] = dict(percentiles(samples), requests=n, errors=errors, rps=round(n / elapsed, 1))
+        print(f"  {name:26s} p50 {results[name]['p50_ms']:>9} ms  p99 {results[name]['p99_ms']:>9} ms",
+              file=sys.stderr)
+    return results
+
+
+def run_load(runner, scenarios, concurrency: int, duration: float, seed: int) -> dict:
+    weighted = [(name, make) for name, _, weight, make in scenarios for _ in range(weight)]
+    per_thread = []
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        samples = {}
+        errors = 0
+        while time.perf_counter() < deadline:
+            name, make = rng.choice(weighted)
+            request = make()
+            t0 = time.perf_counter()
+            status = runner.send(*request)
+            samples.setdefault(name, []).append(time.perf_counter() - t0)
+            errors += status >= 400
+        per_thread.append((samples, errors))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    merged = {}
+    for samples, _ in per_thread:
+        for name, values in samples.items():
+            merged.setdefault(name, []).extend(values)
+    everything = [value for values in merged.values() for value in values]
+    return {
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "requests": len(everything),
+        "errors": sum(errors for _, errors in per_thread),
+        "rps": round(len(everything) / elapsed, 1),
+        "latency": percentiles(everything),
+        "by_scenario": {name: dict(percentiles(values), requests=len(values))
+                        for name, values in sorted(merged.items())},
+    }
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    """Ratios current / baseline (>1 means slower, or more throughput for rps)"""
+    def ratio(new, old):
+        return round(new / old, 3) if new and old else None
+
+    result = {"baseline_commit": baseline.get("meta", {}).get("commit"), "routes": {}}
+    for name, stats in current.get("routes", {}).items():
+        old = baseline.get("routes", {}).get(name)
+        if old:
+            result["routes"][name] = {"p50": ratio(stats["p50_ms"], old["p50_ms"]),
+                                      "p99": ratio(stats["p99_ms"], old["p99_ms"])}
+    if "load" in current and "load" in baseline:
+        result["load"] = {"rps": ratio(current["load"]["rps"], baseline["load"]["rps"]),
+                          "p99": ratio(current["load"]["latency"]["p99_ms"], baseline["load"]["latency"]["p99_ms"])}
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--promises", type=int, default=100_000, help="dataset size (see generate_data.py)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=300, help="sequential requests per route")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10, help="load test seconds (0 to skip)")
+    parser.add_argument("--cache-maxsize", type=int, default=None, help="override CACHE_MAXSIZE (0 = off)")
+    parser.add_argument("--url", default=None,
+                        help="load-test a running server instead (e.g. http://127.0.0.1:8000)")
+    parser.add_argument("--output", default=None, help="write JSON here instead of stdout")
+    parser.add_argument("--compare", default=None, help="baseline JSON from an earlier run")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cached_db = prepare_dataset(args.promises, args.seed)
+    ids = sample_ids(cached_db, rng)
+
+    db_path = dataset_copy(cached_db, prefix="bench_suite_")
+    work_dir = os.path.dirname(db_path)
+
+    from controller import create_app
+
+    overrides = {"DB_PATH": db_path}
+    if args.cache_maxsize is not None:
+        overrides["CACHE_MAXSIZE"] = args.cache_maxsize
+    with contextlib.redirect_stdout(sys.stderr):
+        app = create_app(**overrides)
+
+    # cursor ของหน้าถัดๆ ไป สำหรับ scenario แบ่งหน้า
+    cursors, cursor = [], None
+    for _ in range(20):
+        cursor = app.extensions["models"].promises.get_promises_page(limit=50, cursor=cursor)["next_cursor"]
+        if cursor is None:
+            break
+        cursors.append(cursor)
+    scenarios = build_scenarios(ids, rng, cursors or [""])
+
+    covered = {rule for _, rule, _, _ in scenarios}
+    routes = sorted(rule.rule for rule in app.url_map.iter_rules()
+                    if rule.endpoint != "static" and rule.rule != "/metrics")
+
+    print("--- routes ---", file=sys.stderr)
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "promises": args.promises,
+            "seed": args.seed,
+            "rows": ids["rows"],
+            "uncovered_routes": [rule for rule in routes if rule not in covered],
+        },
+        "routes": run_routes(TestClientRunner(app), scenarios, args.iterations, args.warmup),
+    }
+    result["peak_rss_mb_routes"] = peak_rss_mb()
+
+    if args.duration > 0:
+        print("--- load ---", file=sys.stderr)
+        runner = HttpRunner(args.url) if args.url else TestClientRunner(app)
+        result["load"] = run_load(runner, scenarios, args.concurrency, args.duration, args.seed)
+        result["load"]["target"] = args.url or "in-process"
+        result["peak_rss_mb"] = peak_rss_mb()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            result["compare"] = compare(result, json.load(f))
+
+    app.extensions["models"].close()
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Concurrency check: update_id allocation under parallel writers.
+
+    python benchmarks/check_update_ids.py --processes 4 --threads 4 --per-writer 200
+
+Every writer (processes x threads, each thread with its own
+ProgressUpdateService) calls add_progress_update --per-writer times on a
+fresh copy of the generate_data.py dataset. The check fails (exit code 1)
+unless the returned ids are all distinct, no call was lost, and the new
+PromiseUpdates rows are exactly those ids, numbered without gaps after the
+sequence value at the start. Output is JSON.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from bench_suite import prepare_dataset
+
+UPDATE_DATE = "2099-01-01"  # หลังวันประกาศและการอัปเดตล่าสุดของทุกคำสัญญา ทุก writer จึงผ่านการตรวจ
+
+
+def write_updates(db_path: str, promise_ids: list, threads: int, per_writer: int, worker: int) -> dict:
+    """One process: `threads` writers; returns the ids they got and the errors they hit"""
+    from model.progress_service import ProgressUpdateService
+
+    ids, errors = [], []
+    start = threading.Barrier(threads)
+
+    def run(thread: int):
+        service = ProgressUpdateService(db_path)
+        got = []
+        start.wait()
+        for i in range(per_writer):
+            promise_id = promise_ids[(worker * threads + thread + i) % len(promise_ids)]
+            try:
+                got.append(service.add_progress_update(promise_id, f"check {worker}.{thread}.{i}", UPDATE_DATE))
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+        ids.extend(got)
+
+    workers = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return {"ids": ids, "errors": errors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--promises", type=int, default=20_000, help="dataset size (see generate_data.py)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4, help="writer threads per process")
+    parser.add_argument("--per-writer", type=int, default=200, help="updates added by each thread")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="check_update_ids_"), "political_party.db")
+    shutil.copyfile(prepare_dataset(args.promises, args.seed), db_path)
+
+    from model.schema import UPDATE_ID_SEQUENCE, run_migrations
+
+    conn = sqlite3.connect(db_path)
+    run_migrations(conn)
+    promise_ids = [row[0] for row in conn.execute(
+        "SELECT promise_id FROM Promises WHERE status <> 'เงียบหาย' LIMIT 500")]
+    before_rows = conn.execute("SELECT COUNT(*) FROM PromiseUpdates").fetchone()[0]
+    before_seq = conn.execute("SELECT value FROM IdSequences WHERE name = ?", (UPDATE_ID_SEQUENCE,)).fetchone()[0]
+    conn.close()
+
+    # spawn: แต่ละ process เปิด connection pool ของตัวเอง เหมือน gunicorn worker
+    ctx = multiprocessing.get_context("spawn")
+    started = time.perf_counter()
+    with ctx.Pool(args.processes) as pool:
+        results = pool.starmap(write_updates, [(db_path, promise_ids, args.threads, args.per_writer, worker)
+                                               for worker in range(args.processes)])
+    seconds = time.perf_counter() - started
+
+    ids = [update_id for result in results for update_id in result["ids"]]
+    errors = [error for result in results for error in result["errors"]]
+    expected = args.processes * args.threads * args.per_writer
+
+    from model.promise_updates_model import format_update_id
+
+    conn = sqlite3.connect(db_path)
+    new_rows = [row[0] for row in conn.execute(
+        "SELECT update_id FROM PromiseUpdates WHERE update_date = ? AND detail LIKE 'check %'", (UPDATE_DATE,))]
+    after_rows = conn.execute("SELECT COUNT(*) FROM PromiseUpdates").fetchone()[0]
+    conn.close()
+
+    wanted = {format_update_id(n) for n in range(before_seq + 1, before_seq + expected + 1)}
+    checks = {
+        "no_errors": not errors,
+        "no_duplicate_ids": len(set(ids)) == len(ids),
+        "no_missing_calls": len(ids) == expected,
+        "rows_match_ids": sorted(new_rows) == sorted(ids) and after_rows == before_rows + expected,
+        "ids_without_gaps": set(ids) == wanted,
+    }
+    results = {
+        "writers": args.processes * args.threads,
+        "updates": expected,
+        "seconds": round(seconds, 3),
+        "updates_per_second": round(expected / seconds, 1),
+        "checks": checks,
+        "errors": errors[:10],
+    }
+    json.dump(results, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
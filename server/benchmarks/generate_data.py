@@ -0,0 +1,284 @@
+"""
+Synthetic CSV generator for scaling tests.
+
+    python benchmarks/generate_data.py --promises 1000000 --out /tmp/pp_1m --load
+
+Writes politicians.csv, campaigns.csv, promises.csv and promise_updates.csv
+in the same format as src/database/*.csv, streaming rows to disk so that 10M+
+row datasets fit in constant memory. With --load the files are then imported
+with `load_csv_to_db.py --source OUT --db OUT/political_party.db`.
+
+The data is shaped like the real thing:
+- Thai names, parties, provinces, promise and progress-update text built from
+  templates,
+- promises per politician follow a Zipf-like distribution (a few politicians
+  make most of the promises),
+- announcement dates cluster in the months around the 2019 and 2023 elections,
+- updates per promise depend on the status (finished promises have the most
+  history, not-started ones almost none) and follow the announcement with
+  exponentially distributed gaps.
+The same --seed always produces the same files.
+"""
+import argparse
+import csv
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BATCH = 10000
+END_DATE = date(2025, 12, 31)  # วันที่ล่าสุดที่สร้างได้ (คงที่เพื่อให้ผลซ้ำได้)
+START_DATE = date(2019, 1, 1)
+ELECTIONS = [(date(2019, 3, 24), 0.35), (date(2023, 5, 14), 0.65)]
+CAMPAIGN_YEARS = [2554, 2562, 2566]  # พ.ศ.
+
+PREFIXES = [("นาย", 60), ("นาง", 15), ("นางสาว", 25)]
+FIRST_NAMES = [
+    "สมชาย", "สมศักดิ์", "วิชัย", "สุรเชษฐ์", "ธนกร", "ณัฐพล", "กิตติพงษ์", "ศิริกัญญา",
+    "สุดารัตน์", "กนกวรรณ", "ปารีณา", "รังสิมันต์", "ชัยวุฒิ", "วราวุธ", "ธีรรัตน์", "อรุณี",
+    "พรทิพย์", "มานพ", "สุชาติ", "อัญชลี", "นิพนธ์", "ภูมิธรรม", "ไตรรงค์", "ประเสริฐ",
+    "จิราพร", "วันเพ็ญ", "อนุสรณ์", "ธนพร", "เกียรติศักดิ์", "พัชรินทร์",
+]
+LAST_NAMES = [
+    "ใจดี", "รักไทย", "ศรีสุข", "วงศ์สวัสดิ์", "ทองคำ", "บุญมา", "แก้วมณี", "สายสุวรรณ",
+    "ชัยมงคล", "พรหมวงศ์", "จันทร์เพ็ญ", "สุขเจริญ", "เรืองศรี", "มีสุข", "ปัญญาดี",
+    "ศักดิ์สิทธิ์", "กิจเจริญ", "ทรัพย์มาก", "สมบูรณ์", "อินทรประเสริฐ",
+]
+PARTIES = [
+    ("พรรคประชาชน", 25), ("พรรคเพื่อไทย", 24), ("พรรคภูมิใจไทย", 15),
+    ("พรรคพลังประชารัฐ", 9), ("พรรครวมไทยสร้างชาติ", 8), ("พรรคประชาธิปัตย์", 7),
+    ("พรรคชาติไทยพัฒนา", 4), ("พรรคประชาชาติ", 3), ("พรรคไทยสร้างไทย", 3), ("พรรคชาติพัฒนากล้า", 2),
+]
+PROVINCES = [
+    ("กรุงเทพฯ", 33), ("นครราชสีมา", 16), ("ขอนแก่น", 11), ("อุบลราชธานี", 11), ("เชียงใหม่", 11),
+    ("อุดรธานี", 10), ("ชลบุรี", 10), ("บุรีรัมย์", 10), ("ศรีสะเกษ", 9), ("นครศรีธรรมราช", 9),
+    ("สงขลา", 9), ("สุรินทร์", 8), ("ร้อยเอ็ด", 8), ("สมุทรปราการ", 8), ("นนทบุรี", 8),
+    ("ปทุมธานี", 7), ("เชียงราย", 7), ("สกลนคร", 7), ("ชัยภูมิ", 7), ("นครสวรรค์", 6),
+    ("ภูเก็ต", 3), ("ระยอง", 5), ("พิษณุโลก", 5), ("สุราษฎร์ธานี", 7), ("กาญจนบุรี", 5),
+]
+
+PROMISE_TEMPLATES = [
+    ("ลด{cost}ลง {pct}%", {"cost": ["ค่าไฟฟ้า", "ค่าน้ำประปา", "ค่าโดยสารรถไฟฟ้า", "ค่าครองชีพ",
+                                   "ภาษีเงินได้บุคคลธรรมดา", "ราคาน้ำมันดีเซล", "ค่าเทอมมหาวิทยาลัย"]}),
+    ("เพิ่ม{benefit}เป็น {amount} บาท", {"benefit": ["เบี้ยผู้สูงอายุ", "ค่าแรงขั้นต่ำ", "เงินอุดหนุนเด็กแรกเกิด",
+                                                      "เบี้ยคนพิการ", "เงินเดือนข้าราชการบรรจุใหม่"]}),
+    ("สร้าง{facility}เพิ่ม {n} แห่งใน{place}", {"facility": ["สวนสาธารณะ", "โรงพยาบาลชุมชน", "ศูนย์เด็กเล็ก",
+                                                              "สนามกีฬา", "ห้องสมุดประชาชน", "ถนนเลี่ยงเมือง"]}),
+    ("แก้ปัญหา{problem}ใน{place}อย่างยั่งยืน", {"problem": ["ฝุ่น PM2.5", "น้ำท่วมซ้ำซาก", "ภัยแล้ง",
+                                                             "การจราจรติดขัด", "ยาเสพติด", "หนี้ครัวเรือน"]}),
+    ("ผลักดัน{policy}ภายใน {years} ปี", {"policy": ["กฎหมายสมรสเท่าเทียม", "การกระจายอำนาจสู่ท้องถิ่น",
+                                                    "ระบบขนส่งมวลชนทุกจังหวัด", "อินเทอร์เน็ตฟรีทุกหมู่บ้าน",
+                                                    "การปฏิรูปการศึกษา", "รถไฟฟ้าสายใหม่ใน{place}"]}),
+    ("พักหนี้{group} {years} ปี", {"group": ["เกษตรกร", "ผู้ประกอบการรายย่อย", "ครู", "ข้าราชการ"]}),
+]
+UPDATE_TEMPLATES = [
+    "เสนอเรื่องเข้าสู่ที่ประชุม ครม. แล้ว",
+    "ครม. อนุมัติหลักการ อยู่ระหว่างจัดสรรงบประมาณ",
+    "แต่งตั้งคณะกรรมการศึกษาความเป็นไปได้",
+    "ลงพื้นที่สำรวจ{place} เพื่อเก็บข้อมูลประกอบการตัดสินใจ",
+    "เปิดรับฟังความคิดเห็นประชาชนใน{place}",
+    "ได้รับงบประมาณ {amount} ล้านบาท",
+    "เริ่มดำเนินการระยะที่ {n}",
+    "ดำเนินการแล้วเสร็จ {pct}%",
+    "ร่างกฎหมายผ่านวาระแรกในสภา",
+    "ติดปัญหาการจัดซื้อจัดจ้าง ล่าช้ากว่ากำหนด",
+]
+
+# สัดส่วนของสถานะ และตัวคูณจำนวนความคืบหน้าเฉลี่ยของแต่ละสถานะ
+STATUS_WEIGHTS = [("ยังไม่เริ่ม", 35, 0.2), ("กำลังดำเนินการ", 35, 1.3), ("เงียบหาย", 15, 0.5), ("สำเร็จแล้ว", 15, 1.8)]
+
+
+def cumulative(weighted):
+    total, result = 0, []
+    for _, weight in weighted:
+        total += weight
+        result.append(total)
+    return [value for value, _ in weighted], result
+
+
+class Generator:
+    """Deterministic row factory; every table reads from the same seeded RNG"""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.prefixes, self.prefix_cum = cumulative(PREFIXES)
+        self.parties, self.party_cum = cumulative(PARTIES)
+        self.provinces, self.province_cum = cumulative(PROVINCES)
+        self.statuses = [s for s, _, _ in STATUS_WEIGHTS]
+        self.status_cum = cumulative([(s, w) for s, w, _ in STATUS_WEIGHTS])[1]
+        self.status_update_factor = {s: f for s, _, f in STATUS_WEIGHTS}
+
+    def pick(self, values, cum):
+        return self.rng.choices(values, cum_weights=cum)[0]
+
+    def province(self) -> str:
+        return self.pick(self.provinces, self.province_cum)
+
+    def fill(self, template: str, extra=None) -> str:
+        rng = self.rng
+        values = {
+            "place": self.province(),
+            "pct": rng.choice([5, 10, 15, 20, 25, 30, 50, 70, 90]),
+            "amount": rng.choice([300, 450, 600, 1000, 1500, 3000, 10000, 25000]),
+            "n": rng.randint(1, 20),
+            "years": rng.randint(1, 4),
+        }
+        for key, options in (extra or {}).items():
+            values[key] = rng.choice(options).format(**values)
+        return template.format(**values)
+
+    def politician(self, politician_id: str):
+        rng = self.rng
+        name = (self.pick(self.prefixes, self.prefix_cum) + rng.choice(FIRST_NAMES)
+                + " " + rng.choice(LAST_NAMES))
+        return politician_id, name, self.pick(self.parties, self.party_cum)
+
+    def announcement_date(self) -> date:
+        rng = self.rng
+        if rng.random() < 0.8:
+            election = self.pick([e for e, _ in ELECTIONS], cumulative(ELECTIONS)[1])
+            # หาเสียงช่วง ~5 เดือนก่อนเลือกตั้ง จนถึง 1 เดือนหลัง
+            return election + timedelta(days=int(rng.triangular(-150, 30, -20)))
+        return START_DATE + timedelta(days=rng.randrange((END_DATE - START_DATE).days))
+
+    def promise_description(self) -> str:
+        template, extra = self.rng.choice(PROMISE_TEMPLATES)
+        return self.fill(template, extra)
+
+    def update_dates(self, announced: date, status: str, mean_updates: float):
+        rng = self.rng
+        mean = mean_updates * self.status_update_factor[status]
+        count = int(rng.expovariate(1.0 / mean) + 0.5) if mean > 0 else 0
+        current = announced
+        for _ in range(count):
+            current += timedelta(days=1 + int(rng.expovariate(1 / 90)))
+            if current > END_DATE:
+                break
+            yield current
+
+
+def write_csv(path, header, rows) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH:
+                writer.writerows(batch)
+                count += len(batch)
+                batch.clear()
+        writer.writerows(batch)
+        count += len(batch)
+    return count
+
+
+def generate(out_dir: str, promises: int, politicians: int = None, updates_per_promise: float = 2.0,
+             seed: int = 42) -> dict:
+    """Write the four CSV files into out_dir; returns the row count of each file"""
+    os.makedirs(out_dir, exist_ok=True)
+    gen = Generator(seed)
+    rng = gen.rng
+    politicians = politicians or max(1, promises // 20)
+
+    pol_ids = [str(10000001 + i) for i in range(politicians)]
+    counts = {"politicians.csv": write_csv(
+        os.path.join(out_dir, "politicians.csv"), ["politician_id", "name", "party"],
+        (gen.politician(pid) for pid in pol_ids),
+    )}
+
+    def campaign_rows():
+        n = 0
+        for pid in pol_ids:
+            district = f"{gen.province()} เขต {rng.randint(1, 12)}"
+            for year in CAMPAIGN_YEARS[-rng.randint(1, len(CAMPAIGN_YEARS)):]:
+                n += 1
+                yield f"C{n:03d}", pid, year, district
+
+    counts["campaigns.csv"] = write_csv(
+        os.path.join(out_dir, "campaigns.csv"),
+        ["campaign_id", "politician_id", "election_year", "district"], campaign_rows(),
+    )
+
+    # Zipf: น้ำหนักของนักการเมืองอันดับ r คือ 1 / r^0.8 (สลับลำดับเพื่อไม่ให้ผูกกับ id)
+    weights = [1 / (rank ** 0.8) for rank in range(1, politicians + 1)]
+    rng.shuffle(weights)
+    pol_cum = cumulative(list(zip(pol_ids, weights)))[1]
+
+    # promise ถูกเขียนพร้อมกับความคืบหน้าของมัน (สองไฟล์ในรอบเดียว ไม่ต้องเก็บทั้งหมดไว้ใน memory)
+    update_path = os.path.join(out_dir, "promise_updates.csv")
+    update_count = 0
+    with open(update_path, "w", encoding="utf-8", newline="") as uf:
+        update_writer = csv.writer(uf)
+        update_writer.writerow(["update_id", "promise_id", "update_date", "detail"])
+
+        def promise_rows():
+            nonlocal update_count
+            for start in range(0, promises, BATCH):
+                owners = rng.choices(pol_ids, cum_weights=pol_cum, k=min(BATCH, promises - start))
+                statuses = rng.choices(gen.statuses, cum_weights=gen.status_cum, k=len(owners))
+                updates = []
+                for offset, (owner, status) in enumerate(zip(owners, statuses)):
+                    promise_id = f"P{start + offset + 1:03d}"
+                    announced = gen.announcement_date()
+                    for update_date in gen.update_dates(announced, status, updates_per_promise):
+                        update_count += 1
+                        updates.append((f"U{update_count:03d}", promise_id, update_date.isoformat(),
+                                         gen.fill(rng.choice(UPDATE_TEMPLATES))))
+                    yield promise_id, owner, gen.promise_description(), announced.isoformat(), status
+                update_writer.writerows(updates)
+
+        counts["promises.csv"] = write_csv(
+            os.path.join(out_dir, "promises.csv"),
+            ["promise_id", "politician_id", "description", "announcement_date", "status"], promise_rows(),
+        )
+    counts["promise_updates.csv"] = update_count
+    return counts
+
+
+def load(out_dir: str, db_path: str):
+    """Import the generated CSVs with load_csv_to_db.py (rebuild mode)"""
+    subprocess.run(
+        [sys.executable, os.path.join(SERVER_DIR, "load_csv_to_db.py"), "--db", db_path, "--source", out_dir],
+        check=True,
+    )
+    # load_csv_to_db.py รายงาน error แล้วจบแบบปกติ จึงต้องตรวจผลเอง
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM Promises").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--promises", type=int, default=10_000, help="number of promises (10k - 10M)")
+    parser.add_argument("--politicians", type=int, default=None, help="default: promises / 20")
+    parser.add_argument("--updates-per-promise", type=float, default=2.0,
+                        help="average progress updates per promise, before the per-status factor")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", required=True, help="output folder for the CSV files")
+    parser.add_argument("--load", action="store_true", help="import into OUT/political_party.db afterwards")
+    parser.add_argument("--db", default=None, help="database path for --load")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = generate(args.out, args.promises, args.politicians, args.updates_per_promise, args.seed)
+    print(f"✅ Generated in {time.perf_counter() - started:.1f}s: "
+          + ", ".join(f"{name} {rows:,}" for name, rows in counts.items()))
+
+    if args.load:
+        db_path = args.db or os.path.join(args.out, "political_party.db")
+        loaded = load(args.out, db_path)
+        if loaded != counts["promises.csv"]:
+            sys.exit(f"Error: loaded {loaded} promises, expected {counts['promises.csv']}")
+
+
+if __name__ == "__main__":
+    main()
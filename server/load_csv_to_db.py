@@ -1,38 +1,113 @@
 import sqlite3
 import csv
 import os
+import sys
+import time
+import queue
+import hashlib
+import argparse
+import threading
 
 # --- ตั้งค่า Path และชื่อไฟล์ ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_FOLDER = os.path.join(BASE_DIR, "src", "database")
 DB_PATH = os.path.join(DB_FOLDER, "political_party.db")
 
+# ใช้ migration ชุดเดียวกับฝั่ง server (src/model/schema.py)
+sys.path.insert(0, os.path.join(BASE_DIR, "src"))
+from model.schema import run_migrations, get_schema_version, sync_id_sequences, LATEST_VERSION
+from model.versions_model import bump_versions, GLOBAL_SCOPE
+from model.stats_model import rebuild_stats
+from model.changes_model import record_changes, RESET
+
 # สร้างโฟลเดอร์ src/database ถ้ายังไม่มี
 os.makedirs(DB_FOLDER, exist_ok=True)
 
-def clean_old_db():
+# จำนวนแถวต่อ batch ที่อ่านจาก CSV และส่งเข้า executemany
+BATCH_SIZE = 5000
+# จำนวน batch ที่ thread อ่านไฟล์ล่วงหน้าได้ (จำกัด memory)
+PREFETCH_BATCHES = 4
+# รายงานความคืบหน้าทุกๆ กี่ batch
+PROGRESS_EVERY = 20
+
+# รายชื่อไฟล์และการ mapping (ชื่อไฟล์จริงในเครื่องต้องตรงกับ key ใน dict นี้)
+# เรียงตามลำดับ Foreign Key: ตารางแม่ต้องมาก่อนตารางลูก
+FILES_MAP = {
+    "politicians.csv": { # หรือ Politicians.csv
+        "table": "Politicians",
+        "cols": ["politician_id", "name", "party"],
+        "key": "politician_id",
+    },
+    "campaigns.csv": {
+        "table": "Campaigns",
+        "cols": ["campaign_id", "politician_id", "election_year", "district"],
+        "key": "campaign_id",
+    },
+    "promises.csv": {
+        "table": "Promises",
+        "cols": ["promise_id", "politician_id", "description", "announcement_date", "status"],
+        "key": "promise_id",
+    },
+    "promise_updates.csv": { # ตรวจสอบชื่อไฟล์นี้ให้ดี
+        "table": "PromiseUpdates",
+        "cols": ["update_id", "promise_id", "update_date", "detail"],
+        "key": "update_id",
+    },
+}
+
+# PRAGMA สำหรับโหลดข้อมูลเร็ว: ใช้กับ rebuild (ไฟล์ใหม่ ถ้าพังก็แค่รันใหม่)
+FAST_LOAD_PRAGMAS = {
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    "locking_mode": "EXCLUSIVE",
+    "temp_store": "MEMORY",
+    "cache_size": -262144,  # ~256 MB
+    # ต้องตั้งก่อนสร้างตาราง: ให้ maintain_db.py คืนพื้นที่ว่างได้ขณะ server ทำงาน (incremental_vacuum)
+    "auto_vacuum": "INCREMENTAL",
+}
+# upsert ทำกับ Database ที่ server ใช้งานอยู่ จึงต้องคง WAL และ synchronous=NORMAL ไว้
+LIVE_LOAD_PRAGMAS = {
+    "busy_timeout": 5000,
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -65536,   # ~64 MB
+}
+
+def clean_old_db(db_path=DB_PATH):
     """ลบ Database เก่าทิ้งเพื่อเริ่มใหม่แบบ Clean"""
-    if os.path.exists(DB_PATH):
+    if os.path.exists(db_path):
         try:
-            os.remove(DB_PATH)
-            print(f"Removed old database at: {DB_PATH}")
+            os.remove(db_path)
+            # ไฟล์ WAL/SHM ที่ server สร้างไว้ (journal_mode=WAL) ต้องลบตามไปด้วย
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+            print(f"Removed old database at: {db_path}")
         except PermissionError:
             print("Error: ไม่สามารถลบไฟล์ Database เก่าได้ (อาจมีโปรแกรมอื่นเปิดอยู่)")
             return False
     return True
 
-def get_csv_path(filename):
-    """หาไฟล์ CSV จากทั้งโฟลเดอร์ปัจจุบันและโฟลเดอร์ src/database"""
-    # 1. ลองหาในโฟลเดอร์เดียวกับ script
-    path1 = os.path.join(BASE_DIR, filename)
-    if os.path.exists(path1): return path1
-    
-    # 2. ลองหาในโฟลเดอร์ database
-    path2 = os.path.join(DB_FOLDER, filename)
-    if os.path.exists(path2): return path2
-    
+def get_csv_path(filename, source_dir=None):
+    """หาไฟล์ CSV จากโฟลเดอร์ที่ระบุ, โฟลเดอร์ปัจจุบัน และโฟลเดอร์ src/database"""
+    folders = [source_dir] if source_dir else [BASE_DIR, DB_FOLDER]
+    for folder in folders:
+        path = os.path.join(folder, filename)
+        if os.path.exists(path):
+            return path
+
+    # ถ้าไม่เจอ ลองหาแบบ Case Insensitive (เผื่อชื่อไฟล์ตัวเล็กตัวใหญ่ไม่ตรง)
+    for folder in folders:
+        for f in os.listdir(folder):
+            if f.lower() == filename.lower():
+                return os.path.join(folder, f)
+
     return None
 
+def apply_pragmas(conn, pragmas):
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+
 def create_tables(conn):
     cursor = conn.cursor()
     
@@ -81,77 +156,216 @@ def create_tables(conn):
     conn.commit()
     print("Created all tables successfully.")
 
-def import_csv_data(conn):
+def file_fingerprint(filepath):
+    """ขนาด, mtime และ sha256 ของไฟล์ (ใช้ตัดสินว่าไฟล์เปลี่ยนตั้งแต่ import ครั้งก่อนหรือไม่)"""
+    stat = os.stat(filepath)
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return stat.st_size, stat.st_mtime_ns, digest.hexdigest()
+
+def file_unchanged(conn, filename, filepath):
+    """เช็คกับตาราง ImportState: ขนาด+mtime เท่าเดิมถือว่าไม่เปลี่ยน ถ้าไม่เท่าค่อยเทียบ hash"""
+    row = conn.execute(
+        "SELECT size, mtime_ns, sha256 FROM ImportState WHERE filename = ?", (filename,)
+    ).fetchone()
+    if not row:
+        return False
+    stat = os.stat(filepath)
+    if (stat.st_size, stat.st_mtime_ns) == (row[0], row[1]):
+        return True
+    return file_fingerprint(filepath)[2] == row[2]
+
+def record_import_state(conn, filename, filepath, rows):
+    size, mtime_ns, sha256 = file_fingerprint(filepath)
+    conn.execute("""
+        INSERT INTO ImportState (filename, size, mtime_ns, sha256, rows, imported_at)
+        VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(filename) DO UPDATE SET
+            size = excluded.size, mtime_ns = excluded.mtime_ns, sha256 = excluded.sha256,
+            rows = excluded.rows, imported_at = excluded.imported_at
+    """, (filename, size, mtime_ns, sha256, rows))
+
+def read_csv_batches(filepath, cols, batch_size):
+    """อ่าน CSV ทีละ batch (ไม่โหลดทั้งไฟล์เข้า memory)"""
+    with open(filepath, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+
+        # Normalize headers: ลบช่องว่างหัวท้ายชื่อคอลัมน์
+        reader.fieldnames = [name.strip() for name in reader.fieldnames or []]
+
+        batch = []
+        for row in reader:
+            # ดึงข้อมูลโดยใช้ .get() เพื่อป้องกัน Error ถ้าชื่อ column ใน csv ไม่ตรงเป๊ะ
+            # และ strip() ข้อมูลเพื่อลบช่องว่างส่วนเกิน
+            record = [(row.get(col) or '').strip() for col in cols]
+
+            # เช็คว่ามีข้อมูลครบไหม (ถ้าเป็นค่าว่างทั้งหมดแสดงว่าเป็นบรรทัดเปล่า)
+            if any(record):
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+def start_reader(filepath, cols, batch_size):
+    """
+    อ่านไฟล์ใน thread แยก แล้วส่ง batch ผ่าน queue ที่จำกัดขนาด
+    ทำให้การ parse ไฟล์ทั้ง 4 ไฟล์ทำพร้อมกัน ขณะที่ตัวเขียน Database ทำงานทีละตาราง
+    """
+    q = queue.Queue(maxsize=PREFETCH_BATCHES)
+    stop = threading.Event()
+
+    def worker():
+        try:
+            for batch in read_csv_batches(filepath, cols, batch_size):
+                while not stop.is_set():
+                    try:
+                        q.put(batch, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+            q.put(None)
+        except Exception as e:
+            q.put(e)
+
+    threading.Thread(target=worker, name=f"csv-{os.path.basename(filepath)}", daemon=True).start()
+    return q, stop
+
+def build_insert_sql(config, mode):
+    cols = config['cols']
+    placeholders = ','.join(['?'] * len(cols))
+    sql = f"INSERT INTO {config['table']} ({','.join(cols)}) VALUES ({placeholders})"
+    if mode == "upsert":
+        # อัปเดตเฉพาะแถวที่ค่าเปลี่ยนจริง แถวที่เหมือนเดิมจะไม่ถูกเขียนซ้ำ
+        others = [c for c in cols if c != config['key']]
+        assignments = ', '.join(f"{c} = excluded.{c}" for c in others)
+        changed = ' OR '.join(f"{c} IS NOT excluded.{c}" for c in others)
+        sql += f" ON CONFLICT({config['key']}) DO UPDATE SET {assignments} WHERE {changed}"
+    return sql
+
+def import_csv_data(conn, mode="rebuild", batch_size=BATCH_SIZE, source_dir=None):
+    """
+    Import ทั้ง 4 ไฟล์แบบ stream ทีละ batch
+    - rebuild: Database ใหม่ทั้งหมด, ทำใน transaction เดียว
+    - upsert: ใช้กับ Database ที่ใช้งานอยู่, ข้ามไฟล์ที่ไม่เปลี่ยน และเขียนเฉพาะแถวที่เปลี่ยน
+              commit ทีละ batch เพื่อไม่ให้ถือ write lock นานจน server เขียนไม่ได้
+    คืนค่า dict สรุปผลของแต่ละไฟล์ (ไฟล์ที่ import ไม่สำเร็จมี "failed": True)
+    """
     cursor = conn.cursor()
-    
-    # รายชื่อไฟล์และการ mapping (ชื่อไฟล์จริงในเครื่องต้องตรงกับ key ใน dict นี้)
-    files_map = {
-        "politicians.csv": { # หรือ Politicians.csv
-            "table": "Politicians",
-            "cols": ["politician_id", "name", "party"]
-        },
-        "campaigns.csv": {
-            "table": "Campaigns",
-            "cols": ["campaign_id", "politician_id", "election_year", "district"]
-        },
-        "promises.csv": {
-            "table": "Promises",
-            "cols": ["promise_id", "politician_id", "description", "announcement_date", "status"]
-        },
-        "promise_updates.csv": { # ตรวจสอบชื่อไฟล์นี้ให้ดี
-            "table": "PromiseUpdates",
-            "cols": ["update_id", "promise_id", "update_date", "detail"]
-        }
-    }
-
-    print("\n--- Starting Data Import ---")
-    
-    for filename, config in files_map.items():
-        filepath = get_csv_path(filename)
-        
-        # ถ้าไม่เจอ ลองหาแบบ Case Insensitive (เผื่อชื่อไฟล์ตัวเล็กตัวใหญ่ไม่ตรง)
-        if not filepath:
-            # ลองหาไฟล์ที่มีชื่อคล้ายกันในโฟลเดอร์
-            for f in os.listdir(BASE_DIR):
-                if f.lower() == filename.lower():
-                    filepath = os.path.join(BASE_DIR, f)
-                    break
-        
+    print(f"\n--- Starting Data Import ({mode}) ---")
+
+    # หาไฟล์ทั้งหมดก่อน แล้วเริ่ม thread อ่านไฟล์พร้อมกัน
+    jobs = []
+    for filename, config in FILES_MAP.items():
+        filepath = get_csv_path(filename, source_dir)
         if not filepath:
             print(f"❌ Error: หาไฟล์ '{filename}' ไม่เจอ! (ข้ามการ import ตาราง {config['table']})")
             continue
+        if mode == "upsert" and file_unchanged(conn, filename, filepath):
+            print(f"⏭️  {os.path.basename(filepath)} ไม่มีการเปลี่ยนแปลง (ข้าม)")
+            continue
+        jobs.append((filename, config, filepath, start_reader(filepath, config['cols'], batch_size)))
+
+    summary = {}
+    started_all = time.perf_counter()
+    if mode == "rebuild":
+        cursor.execute("BEGIN")
 
+    for filename, config, filepath, (q, stop) in jobs:
         print(f"Reading {os.path.basename(filepath)}...")
-        
+        sql = build_insert_sql(config, mode)
+        read = written = batches = 0
+        started = time.perf_counter()
+
+        if mode == "rebuild":
+            cursor.execute("SAVEPOINT import_file")
         try:
-            with open(filepath, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f)
-                
-                # Normalize headers: ลบช่องว่างหัวท้ายชื่อคอลัมน์
-                reader.fieldnames = [name.strip() for name in reader.fieldnames]
-                
-                data_list = []
-                for row in reader:
-                    # ดึงข้อมูลโดยใช้ .get() เพื่อป้องกัน Error ถ้าชื่อ column ใน csv ไม่ตรงเป๊ะ
-                    # และ strip() ข้อมูลเพื่อลบช่องว่างส่วนเกิน
-                    record = [row.get(col, '').strip() for col in config['cols']]
-                    
-                    # เช็คว่ามีข้อมูลครบไหม (ถ้าเป็นค่าว่างทั้งหมดแสดงว่าเป็นบรรทัดเปล่า)
-                    if any(record):
-                        data_list.append(record)
-
-                if data_list:
-                    placeholders = ','.join(['?'] * len(config['cols']))
-                    sql = f"INSERT INTO {config['table']} ({','.join(config['cols'])}) VALUES ({placeholders})"
-                    cursor.executemany(sql, data_list)
-                    print(f"  ✅ Imported {len(data_list)} records into {config['table']}")
-                else:
-                    print(f"  ⚠️ No data found in file")
+            while True:
+                batch = q.get()
+                if batch is None:
+                    break
+                if isinstance(batch, Exception):
+                    raise batch
+
+                if mode == "upsert":
+                    cursor.execute("BEGIN IMMEDIATE")
+                changes_before = conn.total_changes
+                cursor.executemany(sql, batch)
+                written += conn.total_changes - changes_before
+                if mode == "upsert":
+                    cursor.execute("COMMIT")
 
+                read += len(batch)
+                batches += 1
+                if batches % PROGRESS_EVERY == 0:
+                    rate = read / max(time.perf_counter() - started, 1e-9)
+                    print(f"  ... {read:,} rows ({rate:,.0f} rows/s)")
+
+            if mode == "rebuild":
+                cursor.execute("RELEASE import_file")
         except Exception as e:
-            print(f"  ❌ Error importing {filename}: {e}")
+            stop.set()
+            if mode == "rebuild":
+                cursor.execute("ROLLBACK TO import_file")
+                cursor.execute("RELEASE import_file")
+                written = 0
+            elif conn.in_transaction:
+                cursor.execute("ROLLBACK")
+            # upsert: batch ก่อนหน้านี้ commit ไปแล้ว ต้องอยู่ใน summary เพื่อให้ finish_import
+            # สร้าง stats ใหม่และเปลี่ยน epoch ของ ETag / cache / change feed
+            summary[filename] = {"filepath": filepath, "rows": read, "written": written,
+                                 "seconds": time.perf_counter() - started, "failed": True}
+            print(f"  ❌ Error importing {filename}: {e} ({written:,} rows written before the error)")
+            continue
 
-    conn.commit()
+        elapsed = time.perf_counter() - started
+        summary[filename] = {"filepath": filepath, "rows": read, "written": written, "seconds": elapsed}
+        if read:
+            print(f"  ✅ Imported {read:,} records into {config['table']} "
+                  f"({written:,} written, {read / max(elapsed, 1e-9):,.0f} rows/s)")
+        else:
+            print(f"  ⚠️ No data found in file")
+
+    if mode == "rebuild":
+        cursor.execute("COMMIT")
+
+    total_rows = sum(r["rows"] for r in summary.values())
+    total_secs = time.perf_counter() - started_all
+    print(f"\nImported {total_rows:,} rows in {total_secs:.2f}s "
+          f"({total_rows / max(total_secs, 1e-9):,.0f} rows/s)")
+    return summary
+
+def finish_import(conn, summary):
+    """
+    งานหลัง import: บันทึกสถานะไฟล์, ขยับ sequence ของรหัส, สร้างตารางสรุปใหม่, เปลี่ยน epoch ของ ETag
+    และแจ้ง client ของ /api/changes ให้โหลดข้อมูลใหม่ทั้งหมด
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    for filename, result in summary.items():
+        # ไฟล์ที่ import ไม่ครบไม่บันทึก hash ไว้ รอบหน้าจึงไม่ถูกข้าม
+        if not result.get("failed"):
+            record_import_state(conn, filename, result["filepath"], result["rows"])
+    sync_id_sequences(conn)
+    written = [filename for filename, result in summary.items() if result["written"]]
+    if written:
+        rebuild_stats(conn)
+        bump_versions(conn, GLOBAL_SCOPE)
+        record_changes(conn, [(RESET, None, {"files": written})])
+    conn.execute("COMMIT")
+
+def check_foreign_keys(conn):
+    """import ปิด foreign key ไว้เพื่อความเร็ว จึงตรวจทีเดียวหลังโหลดเสร็จ"""
+    violations = conn.execute("PRAGMA foreign_key_check").fetchall()
+    if violations:
+        print(f"\n⚠️ Foreign key violations: {len(violations)}")
+        for table, rowid, parent, _ in violations[:10]:
+            print(f"  {table} rowid={rowid} -> {parent}")
+    return len(violations)
 
 def verify_data(conn):
     cursor = conn.cursor()
@@ -166,25 +380,130 @@ def verify_data(conn):
         except sqlite3.OperationalError:
             print(f"{table}: Table not found!")
 
-def main():
-    if not clean_old_db():
+def migrate_db(conn):
+    """อัปเกรด schema ของ Database ที่มีอยู่แล้ว (ไม่ลบข้อมูลเดิม)"""
+    print(f"\n--- Running Migrations (current version: {get_schema_version(conn)}) ---")
+    applied = run_migrations(conn, verbose=True)
+    if not applied:
+        print(f"  Schema is up to date (version {LATEST_VERSION})")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load CSV data into political_party.db")
+    parser.add_argument("--migrate", action="store_true",
+                        help="upgrade the existing database in place instead of rebuilding it")
+    parser.add_argument("--rebuild-stats", action="store_true",
+                        help="recompute the promise-status summary tables of the existing database")
+    parser.add_argument("--mode", choices=["rebuild", "upsert"], default="rebuild",
+                        help="rebuild: drop and reload everything (default); "
+                             "upsert: apply only changed files/rows to the existing database "
+                             "(rows missing from the CSV are not deleted)")
+    parser.add_argument("--db", default=DB_PATH, help="database file (default: src/database/political_party.db)")
+    parser.add_argument("--source", default=None, help="folder containing the CSV files")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per executemany batch")
+    return parser.parse_args()
+
+def run_migrate(db_path):
+    if not os.path.exists(db_path):
+        print(f"Error: ไม่พบ Database ที่ {db_path}")
         return
+    conn = sqlite3.connect(db_path)
+    try:
+        migrate_db(conn)
+        print("\n=== Migration Completed ===")
+    except Exception as e:
+        print(f"\nCRITICAL ERROR: {e}")
+    finally:
+        conn.close()
 
-    print(f"Creating database at: {DB_PATH}")
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("PRAGMA foreign_keys = ON")
+def run_rebuild_stats(db_path):
+    if not os.path.exists(db_path):
+        print(f"Error: ไม่พบ Database ที่ {db_path}")
+        return
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    apply_pragmas(conn, LIVE_LOAD_PRAGMAS)
+    try:
+        migrate_db(conn)
+        print("\n--- Rebuilding Stats ---")
+        conn.execute("BEGIN IMMEDIATE")
+        rebuild_stats(conn)
+        bump_versions(conn, GLOBAL_SCOPE)
+        conn.execute("COMMIT")
+        print("  ✅ Rebuilt PoliticianStatusCounts, PartyStatusCounts, PromiseUpdateStats")
+    except Exception as e:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        print(f"\nCRITICAL ERROR: {e}")
+    finally:
+        conn.close()
+
+def report_import(summary):
+    """พิมพ์ผลสุดท้าย คืน False เมื่อมีไฟล์ที่ import ไม่สำเร็จ"""
+    failed = [filename for filename, result in summary.items() if result.get("failed")]
+    if failed:
+        print(f"\n=== Process Completed with errors: {', '.join(failed)} ===")
+        return False
+    print("\n=== Process Completed ===")
+    return True
+
+def run_rebuild(db_path, source_dir, batch_size):
+    if not clean_old_db(db_path):
+        return False
+
+    print(f"Creating database at: {db_path}")
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    apply_pragmas(conn, FAST_LOAD_PRAGMAS)
+    conn.execute("PRAGMA foreign_keys = OFF")
 
     try:
         create_tables(conn)
-        import_csv_data(conn)
+        summary = import_csv_data(conn, "rebuild", batch_size, source_dir)
+        # สร้าง index หลัง import เสร็จ (เร็วกว่าอัปเดต index ทีละแถว)
+        migrate_db(conn)
+        finish_import(conn, summary)
+        check_foreign_keys(conn)
+        verify_data(conn)
+        return report_import(summary)
+
+    except Exception as e:
+        print(f"\nCRITICAL ERROR: {e}")
+        return False
+    finally:
+        conn.close()
+
+def run_upsert(db_path, source_dir, batch_size):
+    if not os.path.exists(db_path):
+        print(f"Error: ไม่พบ Database ที่ {db_path} (ใช้ --mode rebuild เพื่อสร้างใหม่)")
+        return False
+
+    print(f"Updating database at: {db_path}")
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    apply_pragmas(conn, LIVE_LOAD_PRAGMAS)
+    conn.execute("PRAGMA foreign_keys = ON")
+
+    try:
+        migrate_db(conn)
+        summary = import_csv_data(conn, "upsert", batch_size, source_dir)
+        finish_import(conn, summary)
         verify_data(conn)
-        print("\n=== Process Completed ===")
-        
+        return report_import(summary)
+
     except Exception as e:
         print(f"\nCRITICAL ERROR: {e}")
+        return False
     finally:
         conn.close()
 
+def main():
+    args = parse_args()
+
+    if args.migrate:
+        run_migrate(args.db)
+    elif args.rebuild_stats:
+        run_rebuild_stats(args.db)
+    elif args.mode == "upsert":
+        sys.exit(0 if run_upsert(args.db, args.source, args.batch_size) else 1)
+    else:
+        sys.exit(0 if run_rebuild(args.db, args.source, args.batch_size) else 1)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
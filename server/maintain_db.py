@@ -0,0 +1,457 @@
+"""
+งานดูแล Database ที่ server ใช้งานอยู่ (รันได้ขณะ server ทำงาน)
+
+    python maintain_db.py                      # analyze, vacuum, checkpoint, check, plans
+    python maintain_db.py check plans          # เฉพาะบางขั้นตอน
+    python maintain_db.py --prune-changes 30   # + ลบ ChangeLog ที่เก่ากว่า 30 วัน
+
+ขั้นตอนปกติทั้งหมดใช้ transaction สั้นๆ ภายใต้ WAL: reader ของ server ไม่ถูกบล็อก
+และ writer รอ lock ได้ไม่เกิน busy_timeout ส่วนงานที่ถือ lock นาน (--full-vacuum,
+FTS integrity-check ใน --full-check) ต้องสั่งเองเท่านั้น
+
+--full-vacuum ต้องทำในช่วง maintenance (หยุด server หรือปิด /api/search ไว้): VACUUM เปลี่ยน
+rowid ของ Promises / PromiseUpdates ได้ (primary key เป็น TEXT) แต่ FTS index ผูกกับ rowid
+ตั้งแต่ VACUUM commit จนถึงตอนที่สร้าง index ใหม่เสร็จ search จึงคืนแถวผิดได้ ถ้าถูกขัดจังหวะ
+ระหว่างนั้น ให้รัน --full-vacuum ซ้ำ (หรือ --full-check ซึ่งจะรายงาน index ที่ไม่ตรง)
+"""
+import os
+import re
+import ast
+import sys
+import glob
+import time
+import sqlite3
+import argparse
+import threading
+from urllib.parse import quote, unquote
+
+# --- ตั้งค่า Path (เหมือน load_csv_to_db.py) ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BASE_DIR, "src")
+DB_PATH = os.path.join(SRC_DIR, "database", "political_party.db")
+
+sys.path.insert(0, SRC_DIR)
+from model import db_pool
+from model.db_pool import open_connection
+from model.schema import get_schema_version, LATEST_VERSION
+
+# ลำดับที่รัน: checkpoint หลัง vacuum เพื่อย้ายหน้าที่ vacuum เขียนออกจาก WAL
+STEPS = ["analyze", "vacuum", "checkpoint", "check", "plans"]
+CHECKPOINT_MODES = ["passive", "full", "restart", "truncate"]
+
+# ANALYZE แบบประมาณ: ตรวจไม่เกินเท่านี้แถวต่อ index (เร็วและถือ write lock ไม่นาน)
+ANALYSIS_LIMIT = 1000
+# incremental_vacuum คืนพื้นที่ทีละเท่านี้ page ต่อ transaction
+VACUUM_PAGES_PER_STEP = 2000
+# ลบ ChangeLog ทีละเท่านี้แถวต่อ transaction
+PRUNE_BATCH_SIZE = 5000
+# ตาราง FTS5 (external content, ผูกกับ rowid ของ Promises / PromiseUpdates)
+FTS_TABLES = ["PromiseSearch", "UpdateSearch"]
+# SQL ที่ EXPLAIN QUERY PLAN ได้ (ไม่รวม DDL / PRAGMA / transaction)
+PLAN_PREFIXES = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+# SCAN ที่ไม่ใช่การอ่านทั้งตารางของ model: FTS5, แถวคงที่, subquery, ตารางภายในของ SQLite
+SCAN_EXEMPT = ("VIRTUAL TABLE", "CONSTANT ROW", "(subquery", "CORRELATED", "SCAN sqlite_")
+# ค่า literal ที่ trace callback แทนลงใน ? (NULL, ตัวเลข, ข้อความ, blob)
+LITERAL = re.compile(r"(?:NULL|-?\d+(?:\.\d+)?|'(?:[^']|'')*'|X'[0-9A-Fa-f]*')")
+
+
+# =========================================================
+# HELPERS
+# =========================================================
+def connect(db_path):
+    """connection ตั้งค่าเดียวกับ pool ของ server (busy_timeout, synchronous=NORMAL, autocommit)"""
+    return open_connection(db_path, sqlite3.Connection)
+
+def file_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+def format_mb(size):
+    return f"{size / 2**20:,.1f} MB"
+
+def print_sizes(conn, db_path):
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    print(f"  file {format_mb(file_size(db_path))}, WAL {format_mb(file_size(db_path + '-wal'))}, "
+          f"free pages {free_pages:,} ({format_mb(free_pages * page_size)})")
+
+
+# =========================================================
+# 1. ANALYZE: สถิติสำหรับ query planner
+# =========================================================
+def run_analyze(conn, full=False):
+    print("\n--- ANALYZE ---")
+    started = time.perf_counter()
+    # analysis_limit=0 คือ ANALYZE แบบตรวจทุกแถว (แม่นกว่าแต่ถือ write lock นานกว่า)
+    conn.execute(f"PRAGMA analysis_limit = {0 if full else ANALYSIS_LIMIT}")
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA optimize")
+    print(f"  ✅ Updated planner statistics in {time.perf_counter() - started:.2f}s"
+          f"{' (full)' if full else f' (analysis_limit={ANALYSIS_LIMIT})'}")
+
+
+# =========================================================
+# 2. VACUUM
+# =========================================================
+def rebuild_fts(conn):
+    """
+    VACUUM เปลี่ยน rowid ของตารางที่ไม่มี INTEGER PRIMARY KEY ได้ จึงต้องสร้าง FTS index ใหม่
+    ทำใน transaction เดียวกับการตรวจว่า VACUUM เสร็จแล้ว (ไม่มี writer อื่นแทรกระหว่างนั้นได้)
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            raise sqlite3.OperationalError("VACUUM did not complete (auto_vacuum is not INCREMENTAL)")
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in FTS_TABLES:
+            if table in existing:
+                conn.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+def run_vacuum(conn, db_path, pages_per_step=VACUUM_PAGES_PER_STEP, full=False):
+    print("\n--- VACUUM ---")
+    print_sizes(conn, db_path)
+    auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]  # 0 none, 1 full, 2 incremental
+
+    if full:
+        # เขียนทั้งไฟล์ใหม่: reader ยังอ่านได้ (WAL) แต่ writer ต้องรอจนเสร็จ
+        # และ search ใช้ไม่ได้จนกว่า rebuild_fts จะ commit (ดู docstring ของไฟล์)
+        print("  Running full VACUUM (maintenance window: writers wait, search is wrong until the FTS rebuild)...")
+        started = time.perf_counter()
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")  # มีผลกับไฟล์ใหม่ที่ VACUUM สร้าง
+        conn.execute("VACUUM")
+        rebuild_fts(conn)
+        print(f"  ✅ VACUUM + FTS rebuild in {time.perf_counter() - started:.2f}s (auto_vacuum=INCREMENTAL)")
+    elif auto_vacuum == 2:
+        freed = 0
+        # ทีละ step สั้นๆ: writer ของ server แทรกได้ระหว่าง step
+        while True:
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if free_pages == 0:
+                break
+            # คืนพื้นที่ทีละ page ต่อการ step หนึ่งครั้ง จึงต้อง fetchall ให้ statement รันจนจบ
+            conn.execute(f"PRAGMA incremental_vacuum({pages_per_step})").fetchall()
+            released = free_pages - conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if released <= 0:
+                break
+            freed += released
+        print(f"  ✅ Released {freed:,} free pages")
+    else:
+        print("  ⏭️  auto_vacuum is not INCREMENTAL: run once with --full-vacuum "
+              "(off-peak) to enable online space reclaim")
+    print_sizes(conn, db_path)
+
+
+# =========================================================
+# 3. WAL CHECKPOINT
+# =========================================================
+def run_checkpoint(conn, db_path, mode="passive"):
+    print(f"\n--- WAL Checkpoint ({mode}) ---")
+    wal_before = file_size(db_path + "-wal")
+    # passive ไม่รอใคร; full/restart/truncate รอ reader ที่ค้างอยู่ (ไม่เกิน busy_timeout)
+    busy, log_frames, done_frames = conn.execute(f"PRAGMA wal_checkpoint({mode.upper()})").fetchone()
+    if log_frames < 0:
+        print("  Database is not in WAL mode (skip)")
+        return
+    wal_after = file_size(db_path + "-wal")
+    print(f"  {'⚠️' if busy or done_frames < log_frames else '✅'} "
+          f"checkpointed {done_frames:,}/{log_frames:,} frames, "
+          f"WAL {format_mb(wal_before)} -> {format_mb(wal_after)}")
+    if done_frames < log_frames:
+        print("  (reader ที่เปิดค้างอยู่ยังใช้ frame ที่เหลือ จะถูก checkpoint รอบถัดไป)")
+
+
+# =========================================================
+# 4. INTEGRITY / FOREIGN KEY CHECK
+# =========================================================
+def run_checks(conn, full=False):
+    """คืนจำนวนปัญหาที่พบ (0 = ปกติ)"""
+    print(f"\n--- {'Integrity' if full else 'Quick'} Check ---")
+    problems = 0
+
+    # quick_check ไม่ตรวจ index กับข้อมูลว่าตรงกัน (เร็วกว่ามาก) ทั้งสองแบบเป็น read transaction
+    rows = [row[0] for row in conn.execute(f"PRAGMA {'integrity_check' if full else 'quick_check'}")]
+    if rows == ["ok"]:
+        print("  ✅ ok")
+    else:
+        problems += len(rows)
+        for message in rows[:20]:
+            print(f"  ❌ {message}")
+
+    violations = conn.execute("PRAGMA foreign_key_check").fetchall()
+    if violations:
+        problems += len(violations)
+        print(f"  ❌ Foreign key violations: {len(violations)}")
+        for table, rowid, parent, _ in violations[:10]:
+            print(f"    {table} rowid={rowid} -> {parent}")
+    else:
+        print("  ✅ Foreign keys ok")
+
+    if full:
+        # integrity-check ของ FTS5 เป็นคำสั่งแบบ INSERT จึงถือ write lock ระหว่างตรวจ
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in FTS_TABLES:
+            if table not in existing:
+                continue
+            try:
+                conn.execute(f"INSERT INTO {table}({table}) VALUES ('integrity-check')")
+                print(f"  ✅ {table} ok")
+            except sqlite3.DatabaseError as e:
+                problems += 1
+                print(f"  ❌ {table}: {e} (แก้ด้วย INSERT INTO {table}({table}) VALUES ('rebuild'))")
+    return problems
+
+
+# =========================================================
+# 5. QUERY PLAN REPORT
+# =========================================================
+def normalize_sql(sql):
+    return " ".join(sql.split())
+
+def source_statements():
+    """
+    SQL ที่เป็นข้อความคงที่ใน src/model/*.py (รวม INSERT/UPDATE ที่รันจริงไม่ได้ตอนตรวจ)
+    คืน {sql: "file:line"} และจำนวน SQL ที่สร้างแบบ f-string (ตรวจได้จาก route เท่านั้น)
+    """
+    statements, dynamic = {}, 0
+    for path in sorted(glob.glob(os.path.join(SRC_DIR, "model", "*.py"))):
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                    and node.func.attr in ("execute", "executemany") and node.args):
+                continue
+            arg = node.args[0]
+            if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                sql = normalize_sql(arg.value)
+                if sql.upper().startswith(PLAN_PREFIXES):
+                    statements.setdefault(sql, f"{os.path.basename(path)}:{node.lineno}")
+            elif isinstance(arg, ast.JoinedStr):
+                dynamic += 1
+    return statements, dynamic
+
+def sample_routes(conn):
+    """GET ที่ครอบคลุม query ของ route หลักๆ โดยใช้ค่าจริงจาก Database"""
+    def first(sql):
+        row = conn.execute(sql).fetchone()
+        return row[0] if row else ""
+
+    promise_id = first("SELECT promise_id FROM Promises LIMIT 1")
+    politician_id = first("SELECT politician_id FROM Politicians LIMIT 1")
+    party = first("SELECT party FROM Politicians LIMIT 1")
+    status = first("SELECT status FROM Promises LIMIT 1")
+    term = first("SELECT substr(description, 1, 4) FROM Promises LIMIT 1")
+    return [
+        "/api/promises?limit=20",
+        "/api/promises?limit=20&include_total=1",
+        f"/api/promises?status={quote(status)}&party={quote(party)}&include_total=1",
+        f"/api/promises?politician_id={politician_id}",
+        f"/api/promises?ids={promise_id}",
+        "/api/promises?stream=1",
+        f"/api/promises/{promise_id}",
+        "/api/politicians",
+        f"/api/politicians/{politician_id}",
+        f"/api/search?q={quote(term)}",
+        "/api/stats/politicians",
+        "/api/stats/parties",
+        "/api/changes?since=0",
+    ]
+
+def route_statements(conn, db_path):
+    """รัน GET ชุดหนึ่งผ่าน app (read-only ทั้งหมด) แล้วเก็บ SQL ที่ถูกรันจริงพร้อมค่า parameter"""
+    from controller import create_app
+
+    routes = sample_routes(conn)
+    statements = {}
+    seen = set()
+    current = {"route": None}
+    lock = threading.Lock()
+
+    def trace(sql):
+        sql = normalize_sql(sql)
+        # 'main'.'X_config' ฯลฯ คือ SQL ภายในของ FTS5 ไม่ใช่ของ model
+        if not sql.upper().startswith(PLAN_PREFIXES) or "'main'." in sql:
+            return
+        key = LITERAL.sub("?", sql)  # SQL เดียวกันที่ต่างกันแค่ค่า parameter นับครั้งเดียว
+        with lock:
+            if key not in seen:
+                seen.add(key)
+                statements[sql] = current["route"]
+
+    # trace callback ได้ SQL ที่แทนค่า parameter แล้ว จึง EXPLAIN ได้ทันที
+    db_pool.set_connect_hook(lambda c: c.set_trace_callback(trace))
+    app = create_app(DB_PATH=db_path, AUTO_MIGRATE=False, CACHE_MAXSIZE=0, METRICS=False,
+                     PROFILE="off", CATALOG=False, REPLICA_PATH="", RATE_LIMIT=0,
+                     RATE_LIMIT_ROUTES="", COALESCE=False)
+    app.logger.disabled = True  # route ที่ error รายงานเป็น status code แทน traceback
+    try:
+        client = app.test_client()
+        current["route"] = "GET " + unquote(routes[0])
+        first_page = client.get(routes[0]).get_json(silent=True) or {}
+        if first_page.get("next_cursor"):
+            routes.append(f"/api/promises?limit=20&cursor={first_page['next_cursor']}")
+        for route in routes:
+            current["route"] = "GET " + unquote(route)
+            response = client.get(route)
+            response.get_data()  # อ่าน stream ให้จบ
+            if response.status_code >= 500:
+                print(f"  ⚠️ {current['route']} -> {response.status_code} (query ของ route นี้อาจไม่ครบ)")
+    finally:
+        db_pool.set_connect_hook(None)
+        app.extensions["models"].close()
+    return statements
+
+def template_pattern(sql):
+    """SQL ที่มี ? -> regex ที่ตรงกับ SQL เดียวกันหลังแทนค่า parameter (ใช้ตัด SQL ซ้ำ)"""
+    return re.compile(re.escape(sql).replace(r"\?", LITERAL.pattern))
+
+def explain(conn, sql):
+    """[(depth, detail)] ของ EXPLAIN QUERY PLAN (ไม่รัน statement จริง)"""
+    params = [None] * sql.count("?")
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    depth = {0: -1}
+    plan = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        plan.append((depth[node_id], detail))
+    return plan
+
+def plan_flags(plan):
+    """SCAN ทั้งตาราง / ทั้ง index และการ sort ด้วย temp b-tree"""
+    flags = []
+    for _, detail in plan:
+        if detail.startswith("SCAN ") and not any(skip in detail for skip in SCAN_EXEMPT):
+            flags.append("FULL SCAN" if " USING " not in detail else "INDEX SCAN")
+        elif detail.startswith("USE TEMP B-TREE"):
+            flags.append("TEMP B-TREE")
+    return sorted(set(flags))
+
+def run_plans(conn, db_path, verbose=False):
+    print("\n--- Query Plans ---")
+    from_source, dynamic = source_statements()
+    version = get_schema_version(conn)
+    if version < LATEST_VERSION:
+        print(f"  ⚠️ Schema version {version} < {LATEST_VERSION}: run python load_csv_to_db.py --migrate")
+    from_routes = route_statements(conn, db_path)
+
+    # SQL ที่ route รันจริงมีค่า parameter จริง จึงใช้แทนข้อความใน source ที่ตรงกัน
+    patterns = {sql: template_pattern(sql) for sql in from_source}
+    covered = {sql for sql, pattern in patterns.items()
+               if any(pattern.fullmatch(executed) for executed in from_routes)}
+    statements = list(from_routes.items()) + [(sql, where) for sql, where in from_source.items()
+                                              if sql not in covered]
+
+    flagged = 0
+    for sql, where in statements:
+        try:
+            plan = explain(conn, sql)
+        except sqlite3.Error as e:
+            print(f"\n  ⚠️ {where}: cannot explain ({e})\n    {sql[:200]}")
+            continue
+        flags = plan_flags(plan)
+        if flags:
+            flagged += 1
+        if flags or verbose:
+            print(f"\n  {'🔸 ' + ', '.join(flags) if flags else '✅'}  {where}")
+            print(f"    {sql[:300]}{' ...' if len(sql) > 300 else ''}")
+            for depth, detail in plan:
+                print(f"    {'  ' * depth}- {detail}")
+
+    print(f"\n  {len(statements)} statements ({len(from_routes)} from routes, "
+          f"{len(statements) - len(from_routes)} from model source), {flagged} with scans or sorts")
+    if dynamic:
+        print(f"  ({dynamic} f-string SQL in src/model are checked only when a route above runs them)")
+
+
+# =========================================================
+# 6. CHANGELOG PRUNING (ไม่รันเป็นค่าเริ่มต้น)
+# =========================================================
+def prune_changes(conn, days):
+    """
+    ลบ ChangeLog ที่เก่ากว่า days วัน ทีละ batch
+    client ที่ค้างอยู่ก่อนหน้านั้นจะได้ 410 จาก /api/changes และโหลดข้อมูลใหม่ทั้งหมด
+    """
+    print(f"\n--- Pruning ChangeLog (older than {days} days) ---")
+    deleted = 0
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.execute("""
+            DELETE FROM ChangeLog WHERE seq IN (
+                SELECT seq FROM ChangeLog WHERE created_at < datetime('now', ?) ORDER BY seq LIMIT ?
+            )
+        """, (f"-{days} days", PRUNE_BATCH_SIZE))
+        conn.execute("COMMIT")
+        deleted += cursor.rowcount
+        if cursor.rowcount < PRUNE_BATCH_SIZE:
+            break
+    print(f"  ✅ Deleted {deleted:,} rows")
+
+
+# =========================================================
+# MAIN
+# =========================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description="Maintain the live political_party.db (safe while the server runs)")
+    # ไม่ใช้ choices: argparse ตรวจ choices กับ list ว่างของ nargs="*" ไม่ผ่าน
+    parser.add_argument("steps", nargs="*", metavar="STEP",
+                        help=f"steps to run: {', '.join(STEPS)} (default: all)")
+    parser.add_argument("--db", default=DB_PATH, help="database file (default: src/database/political_party.db)")
+    parser.add_argument("--full-analyze", action="store_true",
+                        help=f"ANALYZE every row instead of sampling {ANALYSIS_LIMIT} rows per index")
+    parser.add_argument("--checkpoint-mode", choices=CHECKPOINT_MODES, default="passive",
+                        help="wal_checkpoint mode; truncate also shrinks the -wal file (default: passive)")
+    parser.add_argument("--vacuum-pages", type=int, default=VACUUM_PAGES_PER_STEP,
+                        help="pages released per incremental_vacuum transaction")
+    parser.add_argument("--full-vacuum", action="store_true",
+                        help="rewrite the whole file and enable auto_vacuum=INCREMENTAL, then rebuild "
+                             "the FTS index (maintenance window only: blocks writers and search "
+                             "results are wrong until the rebuild commits)")
+    parser.add_argument("--full-check", action="store_true",
+                        help="integrity_check + FTS integrity-check instead of quick_check "
+                             "(the FTS check holds the write lock)")
+    parser.add_argument("--prune-changes", type=int, metavar="DAYS",
+                        help="also delete ChangeLog rows older than DAYS days")
+    parser.add_argument("--verbose", action="store_true", help="print the plan of every statement, not only flagged ones")
+    args = parser.parse_args()
+    unknown = [step for step in args.steps if step not in STEPS]
+    if unknown:
+        parser.error(f"unknown step(s): {', '.join(unknown)} (choose from {', '.join(STEPS)})")
+    args.steps = args.steps or STEPS
+    return args
+
+def main():
+    args = parse_args()
+    if not os.path.exists(args.db):
+        print(f"Error: ไม่พบ Database ที่ {args.db}")
+        sys.exit(1)
+
+    print(f"Maintaining database at: {args.db}")
+    conn = connect(args.db)
+    problems = 0
+    try:
+        if args.prune_changes is not None:
+            prune_changes(conn, args.prune_changes)
+        if "analyze" in args.steps:
+            run_analyze(conn, full=args.full_analyze)
+        if "vacuum" in args.steps or args.full_vacuum:
+            run_vacuum(conn, args.db, args.vacuum_pages, full=args.full_vacuum)
+        if "checkpoint" in args.steps:
+            run_checkpoint(conn, args.db, args.checkpoint_mode)
+        if "check" in args.steps:
+            problems = run_checks(conn, full=args.full_check)
+        if "plans" in args.steps:
+            run_plans(conn, args.db, verbose=args.verbose)
+        print("\n=== Maintenance Completed ===" if not problems else f"\n=== {problems} problem(s) found ===")
+    except Exception as e:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        print(f"\nCRITICAL ERROR: {e}")
+        problems = problems or 1
+    finally:
+        conn.close()
+    sys.exit(1 if problems else 0)
+
+if __name__ == "__main__":
+    main()
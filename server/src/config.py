@@ -0,0 +1,61 @@
+"""
+Server configuration, read from environment variables.
+
+    DB_PATH          path of political_party.db (default: src/database/political_party.db)
+    AUTO_MIGRATE     apply pending schema migrations at startup (default: 1)
+    CACHE_MAXSIZE    entries in the in-process read cache, 0 disables it (default: 2048)
+    CACHE_TTL        seconds before a cached entry expires (default: 300)
+    READ_WORKERS     threads that run a route's independent sub-queries concurrently, 0 runs them one after another (default: 0)
+    METRICS          record per-route / SQL metrics and serve GET /metrics (default: 0)
+    PROFILE          sampling profiler: off, header (requests with X-Profile: 1) or all (default: off)
+    PROFILE_INTERVAL_MS  profiler sampling interval (default: 5)
+    PROFILE_DIR      where per-request .folded stack files are written (default: ./profiles)
+    CATALOG          serve politician / campaign / promise lists from an in-memory copy (default: 0)
+    REPLICA_PATH     serve GET reads from a snapshot file kept here; empty disables (default: "")
+    REPLICA_INTERVAL seconds between snapshot refreshes (default: 1)
+    REPLICA_MAX_STALENESS  oldest snapshot (seconds) that may serve reads, else the primary does (default: 5)
+    COALESCE         concurrent identical GETs of the hot endpoints share one execution (default: 1)
+    RATE_LIMIT       requests per second per client and route, 0 disables (default: 0)
+    RATE_LIMIT_BURST requests a client may send at once before being limited (default: 2 x RATE_LIMIT)
+    RATE_LIMIT_ROUTES  per-endpoint overrides "endpoint=rate[/burst],..." e.g. api.add_bulk_updates=0.5/2 (default: "")
+    RATE_LIMIT_HEADER  header holding the client address set by a trusted proxy, e.g. X-Forwarded-For (default: "" = socket address)
+    FLASK_DEBUG      run the development server with the debugger (default: 0)
+"""
+import os
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.path.join(SRC_DIR, "database", "political_party.db")
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def load_config(**overrides) -> dict:
+    """Build the app config from the environment; keyword arguments win over env vars"""
+    config = {
+        "DB_PATH": os.environ.get("DB_PATH", DEFAULT_DB_PATH),
+        "AUTO_MIGRATE": _env_bool("AUTO_MIGRATE", True),
+        "CACHE_MAXSIZE": int(os.environ.get("CACHE_MAXSIZE", 2048)),
+        "CACHE_TTL": float(os.environ.get("CACHE_TTL", 300)),
+        "READ_WORKERS": int(os.environ.get("READ_WORKERS", 0)),
+        "METRICS": _env_bool("METRICS", False),
+        "PROFILE": os.environ.get("PROFILE", "off"),
+        "PROFILE_INTERVAL_MS": float(os.environ.get("PROFILE_INTERVAL_MS", 5)),
+        "PROFILE_DIR": os.environ.get("PROFILE_DIR", ""),
+        "CATALOG": _env_bool("CATALOG", False),
+        "REPLICA_PATH": os.environ.get("REPLICA_PATH", ""),
+        "REPLICA_INTERVAL": float(os.environ.get("REPLICA_INTERVAL", 1)),
+        "REPLICA_MAX_STALENESS": float(os.environ.get("REPLICA_MAX_STALENESS", 5)),
+        "COALESCE": _env_bool("COALESCE", True),
+        "RATE_LIMIT": float(os.environ.get("RATE_LIMIT", 0)),
+        "RATE_LIMIT_BURST": float(os.environ.get("RATE_LIMIT_BURST", 0)),
+        "RATE_LIMIT_ROUTES": os.environ.get("RATE_LIMIT_ROUTES", ""),
+        "RATE_LIMIT_HEADER": os.environ.get("RATE_LIMIT_HEADER", ""),
+        "DEBUG": _env_bool("FLASK_DEBUG", False),
+    }
+    config.update(overrides)
+    return config
@@ -1,7 +1,12 @@
 import sys
 import os
-from flask import Flask, jsonify, request
+import atexit
+import sqlite3
+import time
+from urllib.parse import urlsplit, parse_qs
+from flask import Flask, Blueprint, current_app, jsonify, request
 from flask_cors import CORS  # ตัวช่วยให้ Frontend เรียก API ข้าม Port ได้
+from werkzeug.exceptions import HTTPException
 from datetime import datetime
 
 # =========================================================
@@ -11,58 +16,184 @@ from datetime import datetime
 try:
     from model.politicians_model import PoliticiansModel
     from model.campaigns_model import CampaignsModel
-    from model.promises_model import PromisesModel
+    from model.promises_model import PromisesModel, DEFAULT_PAGE_SIZE
     from model.promise_updates_model import PromiseUpdatesModel
+    from model.progress_service import ProgressUpdateService, UpdateRejected, MAX_BULK_ITEMS
+    from model.search_model import SearchModel, DEFAULT_SEARCH_LIMIT
+    from model.stats_model import StatsModel
+    from model.catalog import CatalogEngine
+    from model.changes_model import ChangesModel, FeedGone, DEFAULT_CHANGES_LIMIT, MAX_CHANGES_LIMIT
+    from model.parallel_reads import ReadFanout
+    from model.versions_model import (DataVersionsModel, promise_scope, politician_scope,
+                                      PROMISE_LIST_SCOPE, POLITICIAN_LIST_SCOPE,
+                                      begin_request_versions, end_request_versions)
+    from http_cache import conditional, init_compression
+    from instrumentation import init_instrumentation
+    from json_provider import FastJSONProvider
+    from traffic import coalesce, coalescer, init_rate_limit, parse_route_limits
+    from read_replica import init_replica, close_replica, READ_AFTER_HEADER
+    from streaming import (wants_stream, start_batches, ndjson_response, json_array_response, sse_response,
+                           NDJSON_MIMETYPE)
+    from model.db_pool import PoolExhausted, get_pool
+    from model.schema import run_migrations
+    from model.cache import read_cache
+    from config import load_config
 except ImportError as e:
     print("Error Importing Models:", e)
     exit(1)
 
-app = Flask(__name__)
-# อนุญาตให้ทุกโดเมนเรียก API ได้ (จำเป็นสำหรับ Live Server Frontend)
-CORS(app) 
-
 # =========================================================
-# INITIALIZE MODELS
+# MODELS (สร้างต่อ app instance ใน create_app ไม่ใช่ตอน import
+# เพื่อให้แต่ละ worker process เปิด connection ของตัวเอง)
 # =========================================================
-politicians_model = PoliticiansModel()
-campaigns_model = CampaignsModel()
-promises_model = PromisesModel()
-updates_model = PromiseUpdatesModel()
+class Models:
+    """All models used by the API, bound to one database file"""
+
+    def __init__(self, db_path: str, read_workers: int):
+        self.politicians = PoliticiansModel(db_path)
+        self.campaigns = CampaignsModel(db_path)
+        self.promises = PromisesModel(db_path)
+        self.updates = PromiseUpdatesModel(db_path)
+        self.progress = ProgressUpdateService(db_path)
+        self.versions = DataVersionsModel(db_path)
+        self.search = SearchModel(db_path)
+        self.stats = StatsModel(db_path)
+        self.changes = ChangesModel(db_path)
+        # ทุก model ใช้ pool เดียวกัน (get_pool ตาม path ของไฟล์) จึงปิดที่นี่ครั้งเดียว
+        self.pool = get_pool(db_path)
+
+        # route ที่อ่านหลาย query ที่ไม่ขึ้นต่อกัน: ทีละ query (ค่าเริ่มต้น) หรือพร้อมกันเมื่อ READ_WORKERS > 0
+        self.reads = ReadFanout(read_workers)
+        self.catalog = None
+
+    def attach_catalog(self, engine: CatalogEngine):
+        """Load the in-memory catalog and serve the list methods from it"""
+        engine.load()
+        self.catalog = engine
+        for model in (self.politicians, self.campaigns, self.promises):
+            model.catalog = engine
+
+    def close(self):
+        """Close the shared connection pool once (graceful shutdown)"""
+        self.reads.shutdown()
+        if self.catalog is not None:
+            self.catalog.close()
+        self.pool.close()
+
+
+def models() -> Models:
+    return current_app.extensions["models"]
+
+
+api = Blueprint("api", __name__)
+
+# จำนวน id สูงสุดใน ?ids= และจำนวน sub-request สูงสุดใน POST /api/batch
+MAX_BATCH_ITEMS = 200
+
+
+def parse_id_list(raw: str) -> list:
+    """"P001, P002,P001" -> ["P001", "P002"] (ตัดช่องว่าง/ค่าว่าง/ค่าซ้ำ คงลำดับเดิม)"""
+    return list(dict.fromkeys(part.strip() for part in raw.split(',') if part.strip()))
+
 
 # =========================================================
-# 1. API: ดึงคำสัญญาทั้งหมด
-# Endpoint: GET /api/promises
+# 1. API: ดึงคำสัญญาทั้งหมด (แบ่งหน้าแบบ keyset)
+# Endpoint: GET /api/promises?limit=&cursor=&status=&party=&politician_id=&include_total=1
+# ตารางแบบ columns + rows (เล็กและ encode เร็วกว่า): &format=columnar
+# ส่งทั้งหมดแบบ stream: Accept: application/x-ndjson หรือ ?stream=1
+# ดึงหลายรายการตาม id ใน request เดียว: GET /api/promises?ids=P001,P002
 # =========================================================
-@app.route('/api/promises', methods=['GET'])
+@api.route('/api/promises', methods=['GET'])
+@conditional(lambda: models().versions, lambda: PROMISE_LIST_SCOPE)
+@coalesce
 def get_all_promises():
+    if 'ids' in request.args:
+        return get_promises_by_ids(parse_id_list(request.args['ids']))
+
     try:
-        # ดึงข้อมูล (Model return list of dict อยู่แล้ว)
-        promises = promises_model.get_all_promises_with_politician_info()
-        
-        # ส่งกลับเป็น JSON
-        return jsonify({
+        stream_mode = wants_stream()
+        if stream_mode:
+            batches = start_batches(models().promises.iter_promises_with_politician_info(
+                status=request.args.get('status') or None,
+                party=request.args.get('party') or None,
+                politician_id=request.args.get('politician_id') or None,
+            ))
+            if stream_mode == 'ndjson':
+                return ndjson_response(batches)
+            return json_array_response(batches)
+
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        include_total = request.args.get('include_total', '').lower() in ('1', 'true', 'yes')
+
+        try:
+            page = models().promises.get_promises_page(
+                limit=limit,
+                cursor=request.args.get('cursor') or None,
+                status=request.args.get('status') or None,
+                party=request.args.get('party') or None,
+                politician_id=request.args.get('politician_id') or None,
+                include_total=include_total,
+            )
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+
+        data = page["data"]
+        body = {
             "status": "success",
-            "count": len(promises),
-            "data": promises
-        }), 200
+            "count": len(data),
+            # ?format=columnar: {"columns": [...], "rows": [[...]]} ไม่ต้องซ้ำชื่อ key ทุกแถว
+            "data": data.columnar() if request.args.get('format') == 'columnar' else data,
+            "next_cursor": page["next_cursor"],
+        }
+        if include_total:
+            body["total"] = page["total"]
+
+        # ส่งกลับเป็น JSON
+        return jsonify(body), 200
+    except PoolExhausted:
+        raise
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def promises_by_ids_body(ids: list, found: dict) -> dict:
+    # เรียงผลลัพธ์ตามลำดับ id ที่ขอ และบอก id ที่ไม่พบแยกไว้
+    data = [found[i] for i in ids if i in found]
+    return {
+        "status": "success",
+        "count": len(data),
+        "data": data,
+        "missing": [i for i in ids if i not in found],
+    }
+
+
+def get_promises_by_ids(ids: list):
+    if not ids:
+        return jsonify({"status": "error", "message": "ids is empty"}), 400
+    if len(ids) > MAX_BATCH_ITEMS:
+        return jsonify({"status": "error", "message": f"At most {MAX_BATCH_ITEMS} ids per request"}), 400
+
+    # SELECT ... WHERE promise_id IN (...) ครั้งเดียว แทนการเรียกทีละ id
+    found = models().promises.get_promise_list_by_ids(ids)
+    return jsonify(promises_by_ids_body(ids, found)), 200
+
 # =========================================================
 # 2. API: ดูรายละเอียดคำสัญญา + ประวัติ
 # Endpoint: GET /api/promises/<id>
 # =========================================================
-@app.route('/api/promises/<promise_id>', methods=['GET'])
+@api.route('/api/promises/<promise_id>', methods=['GET'])
+@conditional(lambda: models().versions, lambda promise_id: promise_scope(promise_id))
+@coalesce
 def get_promise_detail(promise_id):
-    # 1. ดึงข้อมูลสัญญา
-    promise = promises_model.get_promise_detail_by_id(promise_id)
+    # 1. ดึงข้อมูลสัญญา  2. ดึงประวัติการอัปเดต
+    m = models()
+    promise, updates = m.reads.run(
+        (m.promises.get_promise_detail_by_id, promise_id),
+        (m.updates.get_updates_by_promise_id, promise_id),
+    )
     
     if not promise:
         return jsonify({"status": "error", "message": "Promise not found"}), 404
 
-    # 2. ดึงประวัติการอัปเดต
-    updates = updates_model.get_updates_by_promise_id(promise_id)
-
     return jsonify({
         "status": "success",
         "data": {
@@ -75,10 +206,12 @@ def get_promise_detail(promise_id):
 # 3. API: เพิ่มความคืบหน้า (POST JSON)
 # Endpoint: POST /api/promises/<id>/updates
 # =========================================================
-@app.route('/api/promises/<promise_id>/updates', methods=['POST'])
+@api.route('/api/promises/<promise_id>/updates', methods=['POST'])
 def add_promise_update(promise_id):
     # 1. รับข้อมูล
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"status": "error", "message": "Body must be a JSON object"}), 400
     detail = data.get('detail')
     update_date_str = data.get('update_date') # รับมาเป็น String 'YYYY-MM-DD'
     new_status = data.get('status')
@@ -86,85 +219,91 @@ def add_promise_update(promise_id):
     if not update_date_str:
         update_date_str = datetime.now().strftime("%Y-%m-%d")
 
-    # 2. ดึงข้อมูลสัญญามาตรวจสอบ
-    promise = promises_model.get_promise_detail_by_id(promise_id)
-    if not promise:
-        return jsonify({"status": "error", "message": "Promise not found"}), 404
+    # 2. ตรวจสอบ + บันทึกประวัติ + เปลี่ยนสถานะ ใน transaction เดียว (ดู ProgressUpdateService)
+    try:
+        models().progress.add_progress_update(promise_id, detail, update_date_str, new_status)
+    except UpdateRejected as e:
+        return jsonify({"status": "error", "message": e.message}), e.status_code
+    except sqlite3.Error as e:
+        print(f"Error adding update: {e}")
+        return jsonify({"status": "error", "message": "Database error"}), 500
+
+    return jsonify({
+        "status": "success", 
+        "message": "Update added and status changed"
+    }), 201
+
+# =========================================================
+# 3.1 API: เพิ่มความคืบหน้าหลายรายการในครั้งเดียว
+# Endpoint: POST /api/updates/bulk
+# Body: JSON array [{"promise_id", "detail", "update_date", "status"}, ...]
+#       หรือ NDJSON (Content-Type: application/x-ndjson) บรรทัดละหนึ่งรายการ
+# ตรวจสอบด้วยกฎเดียวกับข้อ 3 แล้ว insert ทั้งหมดใน transaction เดียว
+# =========================================================
+def parse_bulk_items():
+    """Return the list of items from a JSON or NDJSON body, or None if it is unreadable"""
+    if request.mimetype == NDJSON_MIMETYPE:
+        items = []
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(current_app.json.loads(line))
+            except ValueError:
+                items.append(None)  # รายงานเป็น error ของรายการนั้น ไม่ทิ้งทั้ง batch
+        return items
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('updates')
+    return data if isinstance(data, list) else None
+
 
-    # --- Check 1: ห้ามอัปเดตถ้า "เงียบหาย" ---
-    if promise['status'] == 'เงียบหาย':
-        return jsonify({"status": "error", "message": "Cannot update: Status is Silent"}), 400
+@api.route('/api/updates/bulk', methods=['POST'])
+def add_bulk_updates():
+    items = parse_bulk_items()
+    if not items:
+        return jsonify({"status": "error", "message": "Body must be a non-empty JSON array or NDJSON"}), 400
+    if len(items) > MAX_BULK_ITEMS:
+        return jsonify({"status": "error", "message": f"At most {MAX_BULK_ITEMS} updates per request"}), 400
+
+    # วันที่ว่าง = วันนี้ (เหมือน endpoint เดี่ยว)
+    today = datetime.now().strftime("%Y-%m-%d")
+    items = [dict(item, update_date=item.get('update_date') or today) if isinstance(item, dict) else item
+             for item in items]
 
-    # --- Check 2: วันที่อัปเดต ต้องไม่ก่อน วันที่ประกาศ ---
     try:
-        # แปลง String เป็น Object วันที่เพื่อเปรียบเทียบ
-        announcement_date = datetime.strptime(promise['announcement_date'], "%Y-%m-%d")
-        new_update_date = datetime.strptime(update_date_str, "%Y-%m-%d")
-
-        if new_update_date < announcement_date:
-            return jsonify({
-                "status": "error", 
-                "message": f"วันที่อัปเดต ({update_date_str}) ต้องไม่เกิดขึ้นก่อนวันที่ประกาศสัญญา ({promise['announcement_date']})"
-            }), 400
-            
-    except ValueError:
-        return jsonify({"status": "error", "message": "Invalid date format"}), 400
-
-    # --- Check 3: ต้องไม่ย้อนหลังไปกว่า "การอัปเดตล่าสุด" (Time Paradox)
-    # 1. ดึงประวัติการอัปเดตทั้งหมดของสัญญานี้
-    existing_updates = updates_model.get_updates_by_promise_id(promise_id)
-    
-    if existing_updates:
-        # 2. หาวันที่ล่าสุดที่มีอยู่ในระบบ (สมมติว่าใน DB เก็บเป็น YYYY-MM-DD string)
-        # ใช้ max() เพื่อหาค่าวันที่มากที่สุด
-        latest_update_str = max(u['update_date'] for u in existing_updates)
-        latest_update_date = datetime.strptime(latest_update_str, "%Y-%m-%d")
-
-        # 3. เปรียบเทียบ
-        if new_update_date < latest_update_date:
-            return jsonify({
-                "status": "error",
-                "message": f"ไม่สามารถบันทึกได้: วันที่ระบุ ({update_date_str}) เกิดขึ้นก่อนการอัปเดตล่าสุด ({latest_update_str})"
-            }), 400
-
-
-    # 3. บันทึกข้อมูล (ถ้าผ่านทุกด่าน)
-    if detail:
-        # 3.1 บันทึกประวัติ (Update Log)
-        success_log = updates_model.add_update(promise_id, detail, update_date_str)
-        
-        # 3.2 [เพิ่ม] อัปเดตสถานะสัญญา (ถ้ามีการส่งค่ามา และไม่ใช่ "same")
-        success_status = True
-        if new_status and new_status != 'same':
-            success_status = promises_model.update_promise_status(promise_id, new_status)
-
-        if success_log and success_status:
-            return jsonify({
-                "status": "success", 
-                "message": "Update added and status changed"
-            }), 201
-        else:
-            return jsonify({"status": "error", "message": "Database error"}), 500
-    else:
-        return jsonify({"status": "error", "message": "Detail is required"}), 400
+        results = models().progress.add_progress_updates_bulk(items)
+    except sqlite3.Error as e:
+        print(f"Error adding bulk updates: {e}")
+        return jsonify({"status": "error", "message": "Database error"}), 500
+
+    created = sum(1 for r in results if r["status"] == "created")
+    return jsonify({
+        "status": "success",
+        "created": created,
+        "rejected": len(results) - created,
+        "results": results
+    }), 200
 
 # =========================================================
 # 4. API: ข้อมูลนักการเมือง (Profile + Campaigns + Promises)
 # Endpoint: GET /api/politicians/<id>
 # =========================================================
-@app.route('/api/politicians/<politician_id>', methods=['GET'])
+@api.route('/api/politicians/<politician_id>', methods=['GET'])
+@conditional(lambda: models().versions, lambda politician_id: politician_scope(politician_id))
+@coalesce
 def get_politician_profile(politician_id):
-    # 1. ข้อมูลส่วนตัว
-    profile = politicians_model.get_politician_by_id(politician_id)
+    # 1. ข้อมูลส่วนตัว  2. ประวัติการหาเสียง  3. คำสัญญาของคนนี้
+    m = models()
+    profile, campaigns, promises = m.reads.run(
+        (m.politicians.get_politician_by_id, politician_id),
+        (m.campaigns.get_campaigns_json, politician_id),  # encode ไว้แล้ว ใส่ลง response ได้ทันที
+        (m.promises.get_promises_by_politician, politician_id),
+    )
     if not profile:
         return jsonify({"status": "error", "message": "Politician not found"}), 404
 
-    # 2. ประวัติการหาเสียง
-    campaigns = campaigns_model.get_campaigns_by_politician(politician_id)
-
-    # 3. คำสัญญาของคนนี้
-    promises = promises_model.get_promises_by_politician(politician_id)
-
     return jsonify({
         "status": "success",
         "data": {
@@ -177,18 +316,340 @@ def get_politician_profile(politician_id):
 # =========================================================
 # 5. API: รายชื่อนักการเมืองทั้งหมด
 # Endpoint: GET /api/politicians
+# ส่งแบบ stream: Accept: application/x-ndjson หรือ ?stream=1
 # =========================================================
-@app.route('/api/politicians', methods=['GET'])
+@api.route('/api/politicians', methods=['GET'])
+@conditional(lambda: models().versions, lambda: POLITICIAN_LIST_SCOPE)
+@coalesce
 def get_politician_list():
-    politicians = politicians_model.get_all_politicians()
+    stream_mode = wants_stream()
+    if stream_mode == 'ndjson':
+        return ndjson_response(start_batches(models().politicians.iter_all_politicians()))
+    if stream_mode == 'json':
+        return json_array_response(start_batches(models().politicians.iter_all_politicians()))
+
+    politicians = models().politicians.get_all_politicians()
     return jsonify({
         "status": "success",
         "count": len(politicians),
         "data": politicians
     }), 200
 
+# =========================================================
+# 6. API: ค้นหาคำสัญญา / ความคืบหน้า (Full-text search)
+# Endpoint: GET /api/search?q=&limit=&offset=
+# =========================================================
+@api.route('/api/search', methods=['GET'])
+def search():
+    q = request.args.get('q', '').strip()
+    limit = request.args.get('limit', DEFAULT_SEARCH_LIMIT, type=int)
+    offset = request.args.get('offset', 0, type=int)
+
+    try:
+        result = models().search.search(q, limit=limit, offset=offset)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    return jsonify({
+        "status": "success",
+        "count": len(result["data"]),
+        "data": result["data"],
+        "next_offset": result["next_offset"]
+    }), 200
+
+# =========================================================
+# 7. API: สรุปสถานะคำสัญญา (ตารางสรุปที่อัปเดตทุกครั้งที่มีการเขียน)
+# Endpoint: GET /api/stats/politicians, GET /api/stats/parties,
+#           GET /api/stats/promises?politician_id=<id> หรือ ?ids=P001,P002
+# =========================================================
+@api.route('/api/stats/politicians', methods=['GET'])
+@conditional(lambda: models().versions, lambda: PROMISE_LIST_SCOPE)
+def get_politician_stats():
+    stats = models().stats.get_politician_stats()
+    return jsonify({
+        "status": "success",
+        "count": len(stats),
+        "data": stats
+    }), 200
+
+@api.route('/api/stats/parties', methods=['GET'])
+@conditional(lambda: models().versions, lambda: PROMISE_LIST_SCOPE)
+def get_party_stats():
+    stats = models().stats.get_party_stats()
+    return jsonify({
+        "status": "success",
+        "count": len(stats),
+        "data": stats
+    }), 200
+
+# จำนวนครั้งที่อัปเดตและวันที่อัปเดตล่าสุดของแต่ละคำสัญญา
+# ไม่มี ETag: การเพิ่ม update เปลี่ยนแค่ version ของคำสัญญานั้น ไม่ใช่ของนักการเมืองหรือรายการ
+@api.route('/api/stats/promises', methods=['GET'])
+def get_promise_update_stats():
+    politician_id = request.args.get('politician_id', '').strip()
+    ids_param = request.args.get('ids')
+    if politician_id:
+        stats = models().stats.get_promise_update_stats_by_politician(politician_id)
+        return jsonify({
+            "status": "success",
+            "count": len(stats),
+            "data": stats
+        }), 200
+    if ids_param is not None:
+        ids = parse_id_list(ids_param)
+        if not ids:
+            return jsonify({"status": "error", "message": "ids is empty"}), 400
+        if len(ids) > MAX_BATCH_ITEMS:
+            return jsonify({"status": "error", "message": f"At most {MAX_BATCH_ITEMS} ids per request"}), 400
+        return jsonify(promises_by_ids_body(ids, models().stats.get_promise_update_stats_by_ids(ids))), 200
+    return jsonify({"status": "error", "message": "politician_id or ids is required"}), 400
+
+# =========================================================
+# 8. API: รวมหลาย GET ไว้ใน request เดียว
+# Endpoint: POST /api/batch
+# Body: {"requests": ["/api/politicians/POL001", {"path": "/api/promises/P001"}, ...]}
+# รองรับ: /api/promises/<id>, /api/politicians/<id>, /api/promises?ids=...
+# ทุก sub-request ถูกรวบเป็น query แบบ IN (...) ตารางละครั้ง ไม่ว่าจะขอกี่รายการ
+# =========================================================
+BATCH_ENDPOINTS = {'api.get_promise_detail', 'api.get_politician_profile', 'api.get_all_promises'}
+
+
+def plan_batch_item(adapter, path):
+    """Return (endpoint, args) for one sub-request path, or (None, (status, error_body))"""
+    if not isinstance(path, str) or not path:
+        return None, (400, {"status": "error", "message": "Missing path"})
+
+    parts = urlsplit(path)
+    try:
+        endpoint, args = adapter.match(parts.path, method='GET')
+    except HTTPException as e:
+        return None, (e.code, {"status": "error", "message": e.name})
+
+    if endpoint == 'api.get_all_promises':
+        ids = parse_id_list(','.join(parse_qs(parts.query).get('ids', [])))
+        if not ids or len(ids) > MAX_BATCH_ITEMS:
+            return None, (400, {"status": "error", "message": "Only /api/promises?ids=... is supported in a batch"})
+        args = {"ids": ids}
+    elif endpoint not in BATCH_ENDPOINTS:
+        return None, (400, {"status": "error", "message": "Path is not supported in a batch"})
+    return endpoint, args
+
+
+@api.route('/api/batch', methods=['POST'])
+def batch():
+    data = request.get_json(silent=True) or {}
+    items = data.get('requests')
+    if not isinstance(items, list) or not items:
+        return jsonify({"status": "error", "message": "requests must be a non-empty list"}), 400
+    if len(items) > MAX_BATCH_ITEMS:
+        return jsonify({"status": "error", "message": f"At most {MAX_BATCH_ITEMS} requests per batch"}), 400
+
+    # 1. แยกประเภทของแต่ละ sub-request และรวบรวม id ที่ต้องใช้
+    adapter = current_app.url_map.bind('localhost')
+    paths = [item.get('path') if isinstance(item, dict) else item for item in items]
+    plan = [plan_batch_item(adapter, path) for path in paths]
+    promise_ids, detail_ids, politician_ids = [], [], []
+    for endpoint, args in plan:
+        if endpoint == 'api.get_promise_detail':
+            detail_ids.append(args['promise_id'])
+        elif endpoint == 'api.get_all_promises':
+            promise_ids.extend(args['ids'])
+        elif endpoint == 'api.get_politician_profile':
+            politician_ids.append(args['politician_id'])
+
+    # 2. query ตารางละครั้ง
+    m = models()
+    listed, promises, updates, politicians, campaigns, pol_promises = m.reads.run(
+        (m.promises.get_promise_list_by_ids, promise_ids),
+        (m.promises.get_promises_by_ids, detail_ids),
+        (m.updates.get_updates_by_promise_ids, detail_ids),
+        (m.politicians.get_politicians_by_ids, politician_ids),
+        (m.campaigns.get_campaigns_by_politicians, politician_ids),
+        (m.promises.get_promises_by_politicians, politician_ids),
+    )
+
+    # 3. ประกอบผลลัพธ์ให้หน้าตาเหมือนเรียก endpoint เดี่ยว
+    responses = []
+    for path, (endpoint, args) in zip(paths, plan):
+        if endpoint is None:
+            status, body = args
+        elif endpoint == 'api.get_all_promises':
+            status, body = 200, promises_by_ids_body(args['ids'], listed)
+        elif endpoint == 'api.get_promise_detail':
+            promise_id = args['promise_id']
+            if promise_id in promises:
+                status, body = 200, {"status": "success",
+                                     "data": {"promise": promises[promise_id], "updates": updates[promise_id]}}
+            else:
+                status, body = 404, {"status": "error", "message": "Promise not found"}
+        else:
+            politician_id = args['politician_id']
+            if politician_id in politicians:
+                status, body = 200, {"status": "success",
+                                     "data": {"profile": politicians[politician_id],
+                                              "campaigns": campaigns[politician_id],
+                                              "promises": pol_promises[politician_id]}}
+            else:
+                status, body = 404, {"status": "error", "message": "Politician not found"}
+        responses.append({"path": path, "status": status, "body": body})
+
+    return jsonify({
+        "status": "success",
+        "count": len(responses),
+        "responses": responses
+    }), 200
+
+# =========================================================
+# 9. API: change feed สำหรับ sync แบบ incremental
+# Endpoint: GET /api/changes?since=<seq>&limit=&epoch=&wait=<วินาที>
+#           GET /api/changes/stream?since=<seq>&epoch= (Server-Sent Events)
+# client เก็บ epoch + next_since ไว้ แล้วถามเฉพาะสิ่งที่เปลี่ยนหลังจากนั้น
+# เริ่มต้น: อ่าน latest (?limit=0) -> โหลดข้อมูลทั้งหมด -> ถาม ?since=latest
+# 410 = ตำแหน่งนี้ใช้ต่อไม่ได้แล้ว (database ถูกโหลดใหม่) ต้องโหลดข้อมูลทั้งหมดใหม่
+# =========================================================
+# long-poll / SSE ถือ worker thread ไว้ตลอดเวลาที่รอ จึงจำกัดเวลาไว้
+MAX_LONG_POLL_SECONDS = 25
+SSE_MAX_SECONDS = 300
+SSE_HEARTBEAT_SECONDS = 15
+
+
+def feed_gone(e: FeedGone):
+    return jsonify({"status": "error", "message": e.message,
+                    "epoch": e.epoch, "latest": e.latest}), 410
+
+
+@api.route('/api/changes', methods=['GET'])
+def get_changes():
+    since = max(0, request.args.get('since', 0, type=int))
+    limit = request.args.get('limit', DEFAULT_CHANGES_LIMIT, type=int)
+    wait = min(max(0.0, request.args.get('wait', 0, type=float)), MAX_LONG_POLL_SECONDS)
+
+    try:
+        page = models().changes.get_changes(since, limit, epoch=request.args.get('epoch') or None,
+                                            wait=wait)
+    except FeedGone as e:
+        return feed_gone(e)
+
+    return jsonify({
+        "status": "success",
+        "epoch": page["epoch"],
+        "count": len(page["changes"]),
+        "changes": page["changes"],
+        "next_since": page["next_since"],
+        "latest": page["latest"],
+        "has_more": page["has_more"]
+    }), 200
+
+
+@api.route('/api/changes/stream', methods=['GET'])
+def stream_changes():
+    # EventSource ที่ต่อใหม่ส่ง Last-Event-ID (seq ล่าสุดที่ได้รับ) มาแทน ?since=
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    since = int(last_event_id) if last_event_id.isdigit() else request.args.get('since', 0, type=int)
+    since = max(0, since)
+    changes = models().changes
+
+    # ตรวจตำแหน่งก่อนเริ่ม stream เพื่อให้ตอบ 410 เป็น JSON ได้
+    try:
+        epoch = changes.get_changes(since, 0, epoch=request.args.get('epoch') or None)["epoch"]
+    except FeedGone as e:
+        return feed_gone(e)
+
+    def events():
+        position = since
+        started = time.monotonic()
+        yield "hello", None, {"epoch": epoch, "since": position}
+        while time.monotonic() - started < SSE_MAX_SECONDS:
+            try:
+                page = changes.get_changes(position, MAX_CHANGES_LIMIT, epoch=epoch,
+                                           wait=SSE_HEARTBEAT_SECONDS)
+            except FeedGone as e:
+                yield "resync", None, {"message": e.message, "epoch": e.epoch, "latest": e.latest}
+                return
+            for change in page["changes"]:
+                yield "change", change["seq"], change
+            if not page["changes"]:
+                yield None, None, None
+            position = page["next_since"]
+
+    return sse_response(events())
+
+# =========================================================
+# APP FACTORY
+# =========================================================
+def pool_exhausted(e: PoolExhausted):
+    # reader ทุกตัวถูกใช้อยู่นานเกิน CHECKOUT_TIMEOUT: ให้ client ลองใหม่ แทนที่จะเป็น 500
+    response = jsonify({"status": "error", "message": "Server busy, try again"})
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
+
+
+def create_app(**config_overrides) -> Flask:
+    """
+    Build a configured app. Used by wsgi.py (gunicorn, one app per worker)
+    and by the development server below.
+    """
+    config = load_config(**config_overrides)
+
+    app = Flask(__name__)
+    app.config.update(config)
+    # อนุญาตให้ทุกโดเมนเรียก API ได้ (จำเป็นสำหรับ Live Server Frontend)
+    CORS(app, expose_headers=[READ_AFTER_HEADER])
+    # JSON เร็วขึ้น (orjson ถ้ามี) และ encode RowSet ของ models ได้โดยตรง
+    app.json = FastJSONProvider(app)
+    # อ่าน DataVersions token ครั้งเดียวต่อ request ใช้ร่วมกันทั้ง ETag, read cache และ catalog
+    app.before_request(begin_request_versions)
+    app.teardown_request(end_request_versions)
+    # metrics / profiler (ปิดไว้เป็นค่าเริ่มต้น) ต้องติดตั้งก่อน compression เพื่อให้วัดขนาดหลังบีบอัด
+    # และก่อนสร้าง Models เพื่อให้ connection ถูกห่อด้วย cursor ที่จับเวลา
+    init_instrumentation(app, metrics=config["METRICS"], profile=config["PROFILE"],
+                         profile_interval_ms=config["PROFILE_INTERVAL_MS"],
+                         profile_dir=config["PROFILE_DIR"])
+    # บีบอัด JSON ขนาดใหญ่ (gzip / brotli)
+    init_compression(app)
+    # ช่วง traffic พุ่ง: จำกัด request ต่อ client ต่อ route (ปิดไว้เป็นค่าเริ่มต้น)
+    # และให้ GET ที่เหมือนกันซึ่งมาพร้อมกันใช้ผลของการรันครั้งเดียว
+    init_rate_limit(app, config["RATE_LIMIT"], config["RATE_LIMIT_BURST"],
+                    routes=parse_route_limits(config["RATE_LIMIT_ROUTES"]),
+                    client_header=config["RATE_LIMIT_HEADER"])
+    coalescer.configure(config["COALESCE"])
+
+    if config["AUTO_MIGRATE"]:
+        conn = sqlite3.connect(config["DB_PATH"])
+        try:
+            run_migrations(conn)
+        finally:
+            conn.close()
+
+    read_cache.configure(maxsize=config["CACHE_MAXSIZE"], ttl=config["CACHE_TTL"])
+
+    app_models = Models(config["DB_PATH"], config["READ_WORKERS"])
+    app.extensions["models"] = app_models
+    # รายชื่อนักการเมือง / ประวัติหาเสียง / คำสัญญา จาก memory แทน SQLite (ปิดไว้เป็นค่าเริ่มต้น)
+    if config["CATALOG"]:
+        app_models.attach_catalog(CatalogEngine(config["DB_PATH"]))
+    # GET อ่านจาก snapshot ของ database (ปิดไว้เป็นค่าเริ่มต้น) ส่วน POST เขียนที่ไฟล์หลัก
+    if config["REPLICA_PATH"]:
+        init_replica(app, config["DB_PATH"], config["REPLICA_PATH"],
+                     interval=config["REPLICA_INTERVAL"], max_staleness=config["REPLICA_MAX_STALENESS"])
+    # ปิด connection ทั้งหมดเมื่อ process จบ (gunicorn เรียก close_app เองใน worker_exit)
+    atexit.register(app_models.close)
+
+    app.register_blueprint(api)
+    app.register_error_handler(PoolExhausted, pool_exhausted)
+    return app
+
+
+def close_app(app: Flask):
+    close_replica(app)
+    app.extensions["models"].close()
+
+
 if __name__ == '__main__':
-    # รันบน port 5000 (ค่า default)
+    # development server: รันบน port 5000 (ค่า default)
     # Frontend จะ fetch ไปที่ http://localhost:5000/api/...
+    # production ใช้ gunicorn: gunicorn -c gunicorn.conf.py wsgi:app
+    app = create_app()
     print("🚀 Server running at http://localhost:5000")
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=app.config["DEBUG"], threaded=True)
@@ -0,0 +1,50 @@
+"""
+gunicorn settings for serving wsgi:app in production.
+
+Each worker process imports wsgi.py itself (preload_app = False), so every
+worker creates its own models and SQLite connections after the fork. Reads
+then scale with the number of workers while SQLite serializes the writers.
+"""
+import multiprocessing
+import os
+import sqlite3
+
+bind = os.environ.get("BIND", f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.environ.get("THREADS", 4))
+preload_app = False
+
+timeout = int(os.environ.get("TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+max_requests = int(os.environ.get("MAX_REQUESTS", 10000))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    # migrate ครั้งเดียวที่ master ก่อน fork worker (create_app จะเห็นว่า schema ล่าสุดแล้ว)
+    from config import load_config
+    from model.schema import run_migrations
+
+    config = load_config()
+    if config["AUTO_MIGRATE"]:
+        conn = sqlite3.connect(config["DB_PATH"])
+        try:
+            applied = run_migrations(conn)
+        finally:
+            conn.close()
+        if applied:
+            server.log.info("Applied schema migrations: %s", applied)
+
+
+def worker_exit(server, worker):
+    # graceful shutdown: ปิด connection ของ worker นี้
+    from controller import close_app
+
+    app = getattr(worker, "wsgi", None)
+    if app is not None:
+        close_app(app)
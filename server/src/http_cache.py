@@ -0,0 +1,111 @@
+"""
+HTTP caching helpers for the JSON API.
+
+- conditional(): ETag / Last-Modified / 304 driven by DataVersions, checked
+  before the view runs so a revalidation costs one indexed lookup.
+- init_compression(): gzip (or brotli, when the `brotli` package is
+  installed) for large JSON responses.
+"""
+import gzip
+import hashlib
+import sqlite3
+from functools import wraps
+
+from flask import current_app, g, request, make_response
+
+try:
+    import brotli  # optional
+except ImportError:
+    brotli = None
+
+CACHE_CONTROL = "public, no-cache"  # ให้ browser เก็บไว้ได้ แต่ต้อง revalidate ทุกครั้ง
+COMPRESS_MIN_SIZE = 1024  # bytes
+COMPRESS_MIMETYPES = {"application/json", "application/x-ndjson"}
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _make_etag(scope: str, token: str) -> str:
+    # query string และ Accept เปลี่ยนเนื้อหาของ response จึงต้องรวมอยู่ใน ETag ด้วย
+    raw = f"{scope}|{token}|{request.full_path}|{request.headers.get('Accept', '')}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def conditional(get_versions_model, scope_for):
+    """
+    Decorate a GET view with conditional-request handling.
+    get_versions_model() returns the app's DataVersionsModel and
+    scope_for(**view_kwargs) the DataVersions scope the response depends on.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                scope = scope_for(**kwargs)
+                token, last_modified = get_versions_model().get_version(scope)
+            except sqlite3.Error:
+                # database ยังไม่ได้ migrate: ทำงานแบบไม่มี cache
+                return current_app.ensure_sync(view)(*args, **kwargs)
+
+            etag = _make_etag(scope, token)
+            g.data_version = token  # ให้ traffic.coalesce ใช้เป็นส่วนหนึ่งของ key
+
+            # If-None-Match มีความสำคัญกว่า If-Modified-Since (RFC 9110)
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = bool(since and last_modified and last_modified <= since)
+
+            if not_modified:
+                response = make_response("", 304)
+            else:
+                # ensure_sync: รองรับทั้ง view ปกติและ async view
+                response = make_response(current_app.ensure_sync(view)(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified
+            response.headers["Cache-Control"] = CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
+
+
+def _preferred_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def init_compression(app, min_size: int = COMPRESS_MIN_SIZE):
+    """Compress JSON/NDJSON responses larger than min_size bytes"""
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or response.is_streamed
+                or "Content-Encoding" in response.headers
+                or response.mimetype not in COMPRESS_MIMETYPES):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = _preferred_encoding()
+        data = response.get_data()
+        if encoding is None or len(data) < min_size:
+            return response
+
+        if encoding == "br":
+            response.set_data(brotli.compress(data, quality=BROTLI_QUALITY))
+        else:
+            response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL))
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    return compress_response
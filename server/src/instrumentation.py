@@ -0,0 +1,473 @@
+"""
+Opt-in request instrumentation (METRICS=1) and sampling profiler (PROFILE=header|all).
+
+When enabled, init_instrumentation(app) records for every request:
+- wall time per route, split into SQL / JSON encoding / everything else,
+- SQL statement counts, time and rows fetched, by wrapping the cursors of the
+  pooled connections (see db_pool.set_connect_hook),
+- response size in bytes,
+and serves them at GET /metrics in the Prometheus text format. Each gunicorn
+worker keeps its own numbers. Requests are recorded in teardown_request, so
+a view that raises is still counted (as a 500).
+
+The profiler samples the stacks of the threads working on a request every
+PROFILE_INTERVAL_MS and writes them per request as collapsed stacks
+("frame;frame;frame count", readable by flamegraph.pl and speedscope) to
+PROFILE_DIR. PROFILE=header only profiles requests sent with `X-Profile: 1`.
+
+With both switches off nothing is installed, so the request path is unchanged;
+PROFILE alone installs no SQL or JSON timers.
+"""
+import contextvars
+import functools
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from flask import Response, request
+
+from model import db_pool, parallel_reads
+from model.cache import read_cache
+from traffic import coalescer, rate_limiter
+
+PROMETHEUS_MIMETYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+MAX_STATEMENT_LABELS = 1000
+MAX_STACK_DEPTH = 128
+
+
+# =========================================================
+# METRIC TYPES
+# =========================================================
+class CounterMetric:
+    """Monotonic counter per label tuple"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...]):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name, labels, (), value
+
+
+class HistogramMetric:
+    """Cumulative-bucket histogram per label tuple"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...], buckets: tuple):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._values: Dict[tuple, list] = {}  # labels -> [count per bucket..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[i] += 1
+                    break
+            else:
+                entry[len(self.buckets)] += 1
+            entry[-1] += value
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, list(entry)) for labels, entry in self._values.items()]
+        for labels, entry in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), entry):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield self.name + "_bucket", labels, (("le", le),), cumulative
+            yield self.name + "_count", labels, (), cumulative
+            yield self.name + "_sum", labels, (), entry[-1]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, extra, value in metric.samples():
+                pairs = list(zip(metric.labelnames, labels)) + list(extra)
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+REQUEST_SECONDS = registry.register(HistogramMetric(
+    "api_request_duration_seconds", "Wall time of a request, until the last body byte",
+    ("route", "method", "status"), LATENCY_BUCKETS))
+PHASE_SECONDS = registry.register(HistogramMetric(
+    "api_request_phase_seconds", "Request time by phase: sql (summed over threads), json, other",
+    ("route", "phase"), LATENCY_BUCKETS))
+RESPONSE_BYTES = registry.register(HistogramMetric(
+    "api_response_size_bytes", "Response body size as sent (after compression)",
+    ("route",), SIZE_BUCKETS))
+SQL_STATEMENTS = registry.register(CounterMetric(
+    "db_statements_total", "SQL statements executed", ("statement",)))
+SQL_SECONDS = registry.register(CounterMetric(
+    "db_statement_seconds_total", "Time in execute and fetch calls", ("statement",)))
+SQL_ROWS = registry.register(CounterMetric(
+    "db_rows_fetched_total", "Rows returned by fetch calls", ("statement",)))
+
+
+# =========================================================
+# PER-REQUEST STATE
+# =========================================================
+class RequestStats:
+    __slots__ = ("route", "method", "started", "sql", "json", "profile", "samples", "status", "size",
+                 "streamed")
+
+    def __init__(self, route: str, method: str, profile: bool):
+        self.route = route
+        self.method = method
+        self.started = time.perf_counter()
+        self.sql = []   # list.append ปลอดภัยเมื่อหลาย thread (ReadFanout) เขียนพร้อมกัน
+        self.json = []
+        self.profile = profile
+        self.samples = Counter() if profile else None
+        self.status = 500  # ถ้า view raise จะไม่มี response มาแทนค่านี้
+        self.size: Optional[int] = None
+        self.streamed = False
+
+
+# contextvar (ไม่ใช่ thread-local) เพื่อให้ตามไปถึง thread ของ ReadFanout
+_current: contextvars.ContextVar = contextvars.ContextVar("request_stats", default=None)
+
+
+# =========================================================
+# SQL CURSOR WRAPPING
+# =========================================================
+_WS = re.compile(r"\s+")
+_PARAM_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_labels: Dict[str, str] = {}
+
+
+def statement_label(sql: str) -> str:
+    """Whitespace-collapsed SQL with IN (?, ?, ...) lists folded, used as a metric label"""
+    label = _labels.get(sql)
+    if label is None:
+        label = _PARAM_LIST.sub("?, ...", _WS.sub(" ", sql).strip())[:200]
+        if len(_labels) < MAX_STATEMENT_LABELS:
+            _labels[sql] = label
+    return label
+
+
+def _record_sql(label: str, seconds: float, rows: int = 0, executed: bool = False):
+    if executed:
+        SQL_STATEMENTS.inc((label,))
+    SQL_SECONDS.inc((label,), seconds)
+    if rows:
+        SQL_ROWS.inc((label,), rows)
+    stats = _current.get()
+    if stats is not None:
+        stats.sql.append(seconds)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """sqlite3.Cursor that times execute/fetch calls and counts rows"""
+
+    _label = "?"
+
+    def execute(self, sql, parameters=()):
+        self._label = statement_label(sql)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _record_sql(self._label, time.perf_counter() - started, executed=True)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._label = statement_label(sql)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _record_sql(self._label, time.perf_counter() - started, executed=True)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        _record_sql(self._label, time.perf_counter() - started, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        _record_sql(self._label, time.perf_counter() - started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        _record_sql(self._label, time.perf_counter() - started, len(rows))
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            _record_sql(self._label, time.perf_counter() - started)
+            raise
+        _record_sql(self._label, time.perf_counter() - started, 1)
+        return row
+
+
+def instrument_connection(conn: sqlite3.Connection):
+    """
+    Route conn.cursor/execute/executemany through InstrumentedCursor.
+    (Connection.execute ไม่เรียก cursor() ที่ override ไว้ จึงต้องแทนทั้งสามตัว)
+    """
+    def cursor(factory=InstrumentedCursor):
+        return sqlite3.Connection.cursor(conn, factory)
+
+    def execute(sql, parameters=()):
+        return cursor().execute(sql, parameters)
+
+    def executemany(sql, seq_of_parameters):
+        return cursor().executemany(sql, seq_of_parameters)
+
+    conn.cursor = cursor
+    conn.execute = execute
+    conn.executemany = executemany
+
+
+# =========================================================
+# SAMPLING PROFILER
+# =========================================================
+_thread_owner: Dict[int, RequestStats] = {}  # thread id -> request ที่ thread นั้นกำลังทำงานให้
+_sampler = None  # หนึ่ง thread ต่อ process
+
+
+@contextmanager
+def track_thread():
+    """Attribute profiler samples of the current thread to the current request"""
+    stats = _current.get()
+    if stats is None or not stats.profile:
+        yield
+        return
+    tid = threading.get_ident()
+    previous = _thread_owner.get(tid)
+    _thread_owner[tid] = stats
+    try:
+        yield
+    finally:
+        if previous is None:
+            _thread_owner.pop(tid, None)
+        else:
+            _thread_owner[tid] = previous
+
+
+def _collapse(frame) -> str:
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class Sampler(threading.Thread):
+    """Daemon thread that samples the stacks of every thread in _thread_owner"""
+
+    def __init__(self, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            if not _thread_owner:
+                continue
+            frames = sys._current_frames()
+            for tid, stats in list(_thread_owner.items()):
+                frame = frames.get(tid)
+                if frame is not None:
+                    stats.samples[_collapse(frame)] += 1
+
+
+def _dump_profile(stats: RequestStats, profile_dir: str, elapsed: float) -> Optional[str]:
+    if not stats.samples:
+        return None
+    os.makedirs(profile_dir, exist_ok=True)
+    safe_route = re.sub(r"[^A-Za-z0-9_.-]+", "_", stats.route).strip("_") or "root"
+    path = os.path.join(
+        profile_dir,
+        f"{time.strftime('%Y%m%d-%H%M%S')}-{threading.get_ident()}-{stats.method}-{safe_route}-{elapsed * 1000:.0f}ms.folded",
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in dict(stats.samples).items():
+            f.write(f"{stack} {count}\n")
+    return path
+
+
+# =========================================================
+# FLASK WIRING
+# =========================================================
+def _finish(stats: RequestStats, status: int, size: Optional[int], profile_dir: str):
+    elapsed = time.perf_counter() - stats.started
+    sql, json_time = sum(stats.sql), sum(stats.json)
+    REQUEST_SECONDS.observe((stats.route, stats.method, str(status)), elapsed)
+    PHASE_SECONDS.observe((stats.route, "sql"), sql)
+    PHASE_SECONDS.observe((stats.route, "json"), json_time)
+    PHASE_SECONDS.observe((stats.route, "other"), max(0.0, elapsed - sql - json_time))
+    if size is not None:
+        RESPONSE_BYTES.observe((stats.route,), size)
+    if stats.profile:
+        for tid, owner in list(_thread_owner.items()):
+            if owner is stats:
+                _thread_owner.pop(tid, None)
+        _dump_profile(stats, profile_dir, elapsed)
+
+
+def _counting_body(body, stats: RequestStats, status: int, profile_dir: str):
+    """Wrap a streamed body so the request is recorded when the last chunk is sent"""
+    size = 0
+    try:
+        for chunk in body:
+            size += len(chunk)
+            yield chunk
+    finally:
+        close = getattr(body, "close", None)
+        if close is not None:
+            close()
+        _finish(stats, status, size, profile_dir)
+        _current.set(None)
+
+
+def _render_metrics() -> str:
+    cache = read_cache.stats()
+    lines = [registry.render()]
+    for key in ("hits", "misses", "evictions", "size"):
+        kind = "gauge" if key == "size" else "counter"
+        lines.append(f"# TYPE read_cache_{key} {kind}\nread_cache_{key} {cache[key]}\n")
+    flights = coalescer.stats()
+    lines.append(f"# TYPE coalesce_executions counter\ncoalesce_executions {flights['executions']}\n")
+    lines.append(f"# TYPE coalesce_shared counter\ncoalesce_shared {flights['shared']}\n")
+    lines.append(f"# TYPE rate_limit_rejected counter\nrate_limit_rejected {rate_limiter.stats()['rejected']}\n")
+    return "".join(lines)
+
+
+def _install_timers(app):
+    """SQL cursor wrapper for new pooled connections and JSON encode timing (METRICS only)"""
+    db_pool.set_connect_hook(instrument_connection)
+
+    # เวลา encode JSON: FastJSONProvider ส่งทุกอย่าง (jsonify, dumps, streaming) ผ่าน encode()
+    # provider อื่นใช้ dumps()
+    name = "encode" if hasattr(app.json, "encode") else "dumps"
+    encode = getattr(app.json, name)
+
+    @functools.wraps(encode)
+    def timed_encode(obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return encode(obj, **kwargs)
+        finally:
+            stats = _current.get()
+            if stats is not None:
+                stats.json.append(time.perf_counter() - started)
+
+    setattr(app.json, name, timed_encode)
+
+
+def init_instrumentation(app, metrics: bool, profile: str = "off",
+                         profile_interval_ms: float = 5, profile_dir: str = ""):
+    """
+    Install the hooks described in the module docstring. Must run before the
+    models open their connections; does nothing when metrics is False and
+    profile is "off".
+    """
+    profile = (profile or "off").lower()
+    if not metrics and profile == "off":
+        return
+
+    profile_dir = profile_dir or os.path.join(os.getcwd(), "profiles")
+    if metrics:
+        _install_timers(app)
+
+    if profile != "off":
+        global _sampler
+        if _sampler is None:
+            _sampler = Sampler(profile_interval_ms / 1000)
+            _sampler.start()
+        parallel_reads.set_thread_hook(track_thread)
+
+    @app.before_request
+    def start_request():
+        if request.path == "/metrics":
+            _current.set(None)
+            return
+        wants_profile = profile == "all" or (profile == "header" and request.headers.get("X-Profile") == "1")
+        rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        stats = RequestStats(rule, request.method, wants_profile)
+        _current.set(stats)
+        if wants_profile:
+            _thread_owner[threading.get_ident()] = stats
+
+    @app.after_request
+    def note_response(response):
+        stats = _current.get()
+        if stats is None:
+            return response
+        if response.is_streamed:
+            # บันทึกเมื่อส่ง chunk สุดท้าย (หลัง teardown) ไม่ใช่ตอนนี้
+            stats.streamed = True
+            response.response = _counting_body(response.response, stats, response.status_code, profile_dir)
+            return response
+        stats.status = response.status_code
+        stats.size = response.calculate_content_length()
+        return response
+
+    # teardown ทำงานเสมอ แม้ view จะ raise (after_request ไม่ถูกเรียกในกรณีนั้น)
+    @app.teardown_request
+    def finish_request(exc=None):
+        stats = _current.get()
+        if stats is None or stats.streamed:
+            return
+        _finish(stats, stats.status, stats.size, profile_dir)
+        _current.set(None)
+
+    if metrics:
+        @app.route("/metrics", methods=["GET"])
+        def metrics_endpoint():
+            return Response(_render_metrics(), mimetype=PROMETHEUS_MIMETYPE)
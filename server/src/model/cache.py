@@ -0,0 +1,149 @@
+"""
+In-process read cache for the read-mostly model lookups.
+
+Entries are evicted least-recently-used once the cache is full and expire
+after a TTL. The write paths (add_update, update_promise_status and
+ProgressUpdateService) invalidate exactly the keys they change, so hot
+profiles and promise pages are served without touching SQLite.
+
+Each entry is also stored with the DataVersions token of its scope and is
+only a hit while that token is current. Writes made by another process
+(a second gunicorn worker, load_csv_to_db.py) never reach this process's
+invalidate() calls, but they bump DataVersions, so the entry stops matching
+as soon as the ETag changes. The token is read once per request and shared
+with http_cache.conditional (see versions_model.read_version).
+"""
+import functools
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional
+
+from model.versions_model import forget_request_versions, read_version
+
+DEFAULT_MAXSIZE = 2048
+DEFAULT_TTL = 300.0  # seconds
+
+
+class ReadCache:
+    """Thread-safe LRU cache with TTL expiry and hit/miss counters"""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, token, value)
+        self._lock = threading.Lock()
+        self._generation = 0  # เพิ่มทุกครั้งที่ invalidate
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # คืน True เมื่อ request นี้ต้องอ่านข้อมูลสดเสมอ (ดู model/snapshot.needs_fresh_reads)
+        self.bypass: Optional[Callable[[], bool]] = None
+        # เรียก listener(keys) หลังทุก invalidate (เช่น CatalogEngine ใน model/catalog.py)
+        self.listeners: List[Callable[[tuple], None]] = []
+
+    def configure(self, maxsize: int = None, ttl: float = None):
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if ttl is not None:
+                self.ttl = ttl
+            self._data.clear()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], token: Hashable = None) -> Any:
+        """
+        Return the cached value for key, calling loader() on a miss. An entry
+        stored with a different token counts as a miss.
+        """
+        if self.maxsize <= 0 or (self.bypass is not None and self.bypass()):
+            return loader()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now and entry[1] == token:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+
+        with self._lock:
+            # ถ้ามีการเขียนระหว่างที่โหลด ค่าที่เพิ่งอ่านมาอาจเก่าแล้ว จึงไม่เก็บลง cache
+            if generation == self._generation:
+                self._data[key] = (time.monotonic() + self.ttl, token, value)
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, *keys: Hashable):
+        # token ที่ request นี้อ่านไว้ก่อนเขียนใช้ไม่ได้แล้ว
+        forget_request_versions()
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._data.pop(key, None)
+        for listener in self.listeners:
+            listener(keys)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# cache กลางของ process (ทุก model ชี้ไปที่ database ไฟล์เดียวกัน)
+read_cache = ReadCache()
+
+
+def cached(namespace: str, scope_for: Callable[..., str]):
+    """
+    Cache a model method by (namespace, *args) in read_cache. scope_for(*args)
+    names the DataVersions scope bumped by every write that changes the
+    result; its token (read through self.pool) validates the entry.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args):
+            def load():
+                return func(self, *args)
+
+            if read_cache.maxsize <= 0:
+                return load()
+            try:
+                token = read_version(self.pool, scope_for(*args))[0]
+            except sqlite3.Error:
+                # ยังไม่มีตาราง DataVersions (ยังไม่ได้ migrate) ตรวจความใหม่ไม่ได้: ไม่ใช้ cache
+                return load()
+            return read_cache.get_or_load((namespace,) + args, load, token)
+        return wrapper
+    return decorator
+
+
+def invalidate_promise_updates(promise_id: str):
+    """Called after a new PromiseUpdates row for promise_id is committed"""
+    read_cache.invalidate(("updates_by_promise", promise_id))
+
+
+def invalidate_promise_status(promise_id: str, politician_id: str):
+    """Called after the status of promise_id is committed"""
+    read_cache.invalidate(
+        ("promise_detail", promise_id),
+        ("promises_by_politician", politician_id),
+    )
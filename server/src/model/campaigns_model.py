@@ -1,5 +1,11 @@
 import sqlite3
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
+
+from model.db_pool import get_pool, in_chunks
+from model.cache import cached
+from model.catalog import catalog_first
+from model.encoding import RowSet, JSONFragment, encode_json, tuple_cursor, fetch_rowset
+from model.versions_model import politician_scope
 
 class CampaignsModel:
     """
@@ -8,29 +14,56 @@ class CampaignsModel:
     
     def __init__(self, db_path: str = "src/database/political_party.db"):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self.pool = get_pool(db_path)  # connection pool กลางที่ทุก model ใช้ร่วมกัน
+        self.catalog = None  # CatalogEngine (model/catalog.py) เมื่อเปิด CATALOG
 
-    def get_campaigns_by_politician(self, politician_id: str) -> List[dict]:
+    @catalog_first
+    @cached("campaigns_by_politician", politician_scope)
+    def get_campaigns_by_politician(self, politician_id: str) -> RowSet:
         """Get all campaigns history for a specific politician"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT * FROM Campaigns 
-            WHERE politician_id = ? 
-            ORDER BY election_year DESC
-        """, (politician_id,))
-        result = [dict(row) for row in cursor.fetchall()]
-        cursor.close()
+        with self.pool.reader() as conn:
+            cursor = tuple_cursor(conn)
+            cursor.execute("""
+                SELECT * FROM Campaigns 
+                WHERE politician_id = ? 
+                ORDER BY election_year DESC
+            """, (politician_id,))
+            result = fetch_rowset(cursor)
+            cursor.close()
+        return result
+
+    @cached("campaigns_json", politician_scope)
+    def get_campaigns_json(self, politician_id: str) -> JSONFragment:
+        """
+        [View 4] get_campaigns_by_politician already encoded as JSON.
+        Campaigns are only written by load_csv_to_db.py, so the encoded
+        form stays valid for as long as the cache entry lives.
+        """
+        return JSONFragment(encode_json(self.get_campaigns_by_politician(politician_id)))
+
+    def get_campaigns_by_politicians(self, politician_ids: Iterable[str]) -> Dict[str, List[dict]]:
+        """[Batch] get_campaigns_by_politician for many politicians in one query"""
+        result = {}
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            for marks, chunk in in_chunks(politician_ids):
+                for politician_id in chunk:
+                    result[politician_id] = []
+                cursor.execute(f"""
+                    SELECT * FROM Campaigns
+                    WHERE politician_id IN ({marks})
+                    ORDER BY politician_id, election_year DESC
+                """, chunk)
+                for row in cursor.fetchall():
+                    result[row['politician_id']].append(dict(row))
+            cursor.close()
         return result
 
     def get_campaign_by_id(self, campaign_id: str) -> Optional[dict]:
         """Get specific campaign details"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM Campaigns WHERE campaign_id = ?", (campaign_id,))
-        row = cursor.fetchone()
-        cursor.close()
-        return dict(row) if row else None
-
-    def close_connection(self):
-        if self.conn:
-            self.conn.close()
\ No newline at end of file
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM Campaigns WHERE campaign_id = ?", (campaign_id,))
+            row = cursor.fetchone()
+            cursor.close()
+        return dict(row) if row else None
\ No newline at end of file
@@ -0,0 +1,299 @@
+"""
+In-memory engine for the read-mostly catalog: Politicians, Campaigns and
+Promise headers (CATALOG=1, off by default).
+
+CatalogEngine loads the three tables in one read transaction into a Catalog:
+column lists per table, repeated strings (party, status, district, the
+politician_id of campaigns / promises) dictionary-encoded into compact
+arrays, and row indexes by politician_id and party. The list methods of
+PoliticiansModel, CampaignsModel and PromisesModel are then served from it
+without SQLite (see catalog_first).
+
+A Catalog is never modified; refreshes build a new one in a background
+thread and swap the reference. Each Catalog remembers the DataVersions token
+of every politician scope (and of the politician list) it was loaded at.
+Every read compares that with the current token, read once per request and
+shared with the ETag (see versions_model.read_version). On a mismatch the
+read goes to SQLite and a rebuild is requested, so writes from this or any
+other process (other workers, CSV imports) are never served stale.
+"""
+import functools
+import sqlite3
+import threading
+from array import array
+from typing import Dict, List, Optional
+
+from model.cache import read_cache
+from model.db_pool import get_pool
+from model.encoding import RowSet
+from model.versions_model import (GLOBAL_SCOPE, POLITICIAN_LIST_SCOPE, make_token, politician_scope,
+                                  read_version)
+
+# ลำดับคอลัมน์เดียวกับ SELECT * ของแต่ละตาราง
+POLITICIAN_COLUMNS = ("politician_id", "name", "party")
+CAMPAIGN_COLUMNS = ("campaign_id", "politician_id", "election_year", "district")
+PROMISE_COLUMNS = ("promise_id", "politician_id", "description", "announcement_date", "status")
+
+
+class StringTable:
+    """Dictionary encoding: each distinct value is stored once and rows keep its code"""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self):
+        self.values: list = []
+        self._codes: Dict[object, int] = {}
+
+    def encode(self, value) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value) -> Optional[int]:
+        return self._codes.get(value)
+
+
+def _int_column(values: list):
+    """array('q') when every value is an int (compact), else the list itself"""
+    if all(type(v) is int for v in values):
+        return array("q", values)
+    return values
+
+
+class Catalog:
+    """One immutable, consistent copy of the catalog tables"""
+
+    __slots__ = (
+        "politician_ids", "politician_names", "politician_party", "parties",
+        "politician_row", "party_rows",
+        "campaign_ids", "campaign_politician", "campaign_year", "campaign_district", "districts",
+        "campaign_rows",
+        "promise_ids", "promise_politician", "promise_description", "promise_date",
+        "promise_status", "statuses", "promise_rows",
+        "politician_refs", "epoch", "versions", "stale_seen",
+    )
+
+    @classmethod
+    def load(cls, conn) -> "Catalog":
+        """Read the catalog tables from conn (call inside one read transaction)"""
+        catalog = cls()
+        read_versions(conn, catalog)
+        catalog.stale_seen = set()
+        refs = catalog.politician_refs = StringTable()  # politician_id ที่ Campaigns / Promises อ้างถึง
+
+        # Politicians: เรียงตาม name (ลำดับของ get_all_politicians)
+        rows = conn.execute("SELECT politician_id, name, party FROM Politicians ORDER BY name").fetchall()
+        parties = catalog.parties = StringTable()
+        catalog.politician_ids = [r[0] for r in rows]
+        catalog.politician_names = [r[1] for r in rows]
+        catalog.politician_party = array("I", (parties.encode(r[2]) for r in rows))
+        catalog.politician_row = {pid: i for i, pid in enumerate(catalog.politician_ids)}
+        by_party: Dict[int, List[int]] = {}
+        for i in sorted(range(len(rows)), key=catalog.politician_ids.__getitem__):
+            by_party.setdefault(catalog.politician_party[i], []).append(i)
+        catalog.party_rows = {code: array("I", idx) for code, idx in by_party.items()}
+
+        # Campaigns: เรียงตาม election_year DESC ภายในนักการเมืองแต่ละคน
+        rows = conn.execute("""
+            SELECT campaign_id, politician_id, election_year, district FROM Campaigns
+            ORDER BY politician_id, election_year DESC
+        """).fetchall()
+        districts = catalog.districts = StringTable()
+        catalog.campaign_ids = [r[0] for r in rows]
+        catalog.campaign_politician = array("I", (refs.encode(r[1]) for r in rows))
+        catalog.campaign_year = _int_column([r[2] for r in rows])
+        catalog.campaign_district = array("I", (districts.encode(r[3]) for r in rows))
+        catalog.campaign_rows = _group_ranges(catalog.campaign_politician)
+
+        # Promises: ลำดับเดียวกับ idx_promises_politician_date
+        rows = conn.execute("""
+            SELECT promise_id, politician_id, description, announcement_date, status FROM Promises
+            ORDER BY politician_id, announcement_date DESC, promise_id DESC
+        """).fetchall()
+        statuses = catalog.statuses = StringTable()
+        catalog.promise_ids = [r[0] for r in rows]
+        catalog.promise_politician = array("I", (refs.encode(r[1]) for r in rows))
+        catalog.promise_description = [r[2] for r in rows]
+        catalog.promise_date = [r[3] for r in rows]
+        catalog.promise_status = array("I", (statuses.encode(r[4]) for r in rows))
+        catalog.promise_rows = _group_ranges(catalog.promise_politician)
+        return catalog
+
+    def token_for(self, scope: str) -> str:
+        """DataVersions token of scope when this catalog was loaded"""
+        return make_token(self.epoch, self.versions.get(scope, 0))
+
+    def all_politicians(self) -> RowSet:
+        parties = self.parties.values
+        return RowSet(POLITICIAN_COLUMNS, [
+            (pid, name, parties[code])
+            for pid, name, code in zip(self.politician_ids, self.politician_names, self.politician_party)
+        ])
+
+    def politicians_by_party(self, party: str) -> List[dict]:
+        code = self.parties.lookup(party)
+        parties = self.parties.values
+        return [dict(zip(POLITICIAN_COLUMNS, (self.politician_ids[i], self.politician_names[i],
+                                              parties[self.politician_party[i]])))
+                for i in self.party_rows.get(code, ())]
+
+    def campaigns_by_politician(self, politician_id: str) -> RowSet:
+        code = self.politician_refs.lookup(politician_id)
+        districts = self.districts.values
+        return RowSet(CAMPAIGN_COLUMNS, [
+            (self.campaign_ids[i], politician_id, self.campaign_year[i], districts[self.campaign_district[i]])
+            for i in self.campaign_rows.get(code, ())
+        ])
+
+    def promises_by_politician(self, politician_id: str) -> RowSet:
+        code = self.politician_refs.lookup(politician_id)
+        statuses = self.statuses.values
+        return RowSet(PROMISE_COLUMNS, [
+            (self.promise_ids[i], politician_id, self.promise_description[i], self.promise_date[i],
+             statuses[self.promise_status[i]])
+            for i in self.promise_rows.get(code, ())
+        ])
+
+
+def _group_ranges(codes: array) -> Dict[int, range]:
+    """{code: range of row numbers}; rows are sorted by politician_id, so each group is contiguous"""
+    groups: Dict[int, range] = {}
+    start = 0
+    for i in range(1, len(codes) + 1):
+        if i == len(codes) or codes[i] != codes[start]:
+            groups[codes[start]] = range(start, i)
+            start = i
+    return groups
+
+
+def read_versions(conn, catalog: Catalog):
+    """Epoch row and {scope: version} of every scope except single promises"""
+    rows = conn.execute(
+        "SELECT scope, version, updated_at FROM DataVersions WHERE scope NOT LIKE 'promise:%'"
+    ).fetchall()
+    catalog.epoch = next((row for row in rows if row['scope'] == GLOBAL_SCOPE), None)
+    catalog.versions = {row['scope']: row['version'] for row in rows}
+
+
+class CatalogEngine:
+    """Holds the current Catalog and refreshes it (see module docstring)"""
+
+    def __init__(self, db_path: str):
+        self.pool = get_pool(db_path)
+        self.catalog: Optional[Catalog] = None
+        self.rebuilds = 0
+        self.stale_reads = 0
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self._again = False
+        read_cache.listeners.append(self._on_invalidate)
+
+    def _build(self) -> Catalog:
+        # primary เสมอ และใน read transaction เดียว ทั้งสามตารางจึงมาจากจุดเวลาเดียวกัน
+        with self.pool.reader(primary=True) as conn:
+            conn.execute("BEGIN")
+            try:
+                return Catalog.load(conn)
+            finally:
+                conn.rollback()
+
+    def load(self):
+        """Build the first catalog (blocking); call once at startup"""
+        self.catalog = self._build()
+
+    def close(self):
+        if self._on_invalidate in read_cache.listeners:
+            read_cache.listeners.remove(self._on_invalidate)
+
+    def _rebuild_loop(self):
+        while True:
+            with self._lock:
+                self._again = False
+            try:
+                catalog = self._build()
+            except Exception as e:
+                print(f"Catalog rebuild failed: {e}")
+                catalog = None
+            with self._lock:
+                if catalog is not None:
+                    self.catalog = catalog
+                    self.rebuilds += 1
+                if not self._again:
+                    self._rebuilding = False
+                    return
+
+    def request_rebuild(self):
+        """Rebuild in the background; concurrent requests collapse into one more run"""
+        with self._lock:
+            if self._rebuilding:
+                self._again = True
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_loop, name="catalog-rebuild", daemon=True).start()
+
+    def _on_invalidate(self, keys):
+        # ReadCache.invalidate หลัง commit ของ process นี้: เริ่ม rebuild เลยไม่ต้องรอ read ถัดไป
+        if any(key[0] == "promises_by_politician" for key in keys):
+            self.request_rebuild()
+
+    def current(self, scope: str) -> Optional[Catalog]:
+        """
+        The catalog if it is up to date for scope, else None (read from
+        SQLite) after requesting a rebuild.
+        """
+        catalog = self.catalog
+        if catalog is None:
+            return None
+        try:
+            token = read_version(self.pool, scope)[0]
+        except sqlite3.Error:
+            return None
+        if token == catalog.token_for(scope):
+            return catalog
+
+        self.stale_reads += 1
+        # ขอ rebuild ครั้งเดียวต่อ token ที่เห็น: ถ้า read มาจาก replica ที่ตามหลัง primary
+        # catalog ใหม่ก็ยังไม่ตรง ไม่ต้อง rebuild ซ้ำไปเรื่อย ๆ
+        if token not in catalog.stale_seen:
+            catalog.stale_seen.add(token)
+            self.request_rebuild()
+        return None
+
+    # ----- ชื่อเดียวกับ method ของ model (ใช้ผ่าน catalog_first) -----
+
+    def get_all_politicians(self):
+        catalog = self.current(POLITICIAN_LIST_SCOPE)
+        return catalog.all_politicians() if catalog is not None else None
+
+    def get_politicians_by_party(self, party_name: str):
+        catalog = self.current(POLITICIAN_LIST_SCOPE)
+        return catalog.politicians_by_party(party_name) if catalog is not None else None
+
+    def get_campaigns_by_politician(self, politician_id: str):
+        catalog = self.current(politician_scope(politician_id))
+        return catalog.campaigns_by_politician(politician_id) if catalog is not None else None
+
+    def get_promises_by_politician(self, politician_id: str):
+        catalog = self.current(politician_scope(politician_id))
+        return catalog.promises_by_politician(politician_id) if catalog is not None else None
+
+
+def catalog_first(func):
+    """
+    Serve a model method from self.catalog (a CatalogEngine) when one is
+    attached and can answer; otherwise run the SQLite method as before.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self, *args):
+        catalog = self.catalog
+        if catalog is not None:
+            result = getattr(catalog, name)(*args)
+            if result is not None:
+                return result
+        return func(self, *args)
+
+    return wrapper
@@ -0,0 +1,127 @@
+"""
+Append-only change feed (ChangeLog table) for incremental client sync.
+
+Rows are written by model.write_hooks inside the same transaction as the
+data they describe, so a change is visible in the feed exactly when it is
+visible in the tables. seq is AUTOINCREMENT and never reused; consumers
+remember the last seq they applied and ask for everything after it.
+"""
+import sqlite3
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from model.db_pool import get_pool
+from model.encoding import JSONFragment, encode_json
+from model.versions_model import GLOBAL_SCOPE
+
+# ชนิดของ change
+UPDATE_ADDED = "update_added"
+STATUS_CHANGED = "status_changed"
+RESET = "reset"  # import ข้อมูลใหม่: client ต้องโหลดข้อมูลทั้งหมดใหม่
+
+DEFAULT_CHANGES_LIMIT = 500
+MAX_CHANGES_LIMIT = 5000
+POLL_INTERVAL = 0.5  # วินาที ระหว่างการเช็ค seq ล่าสุดตอน long-poll
+
+
+def record_changes(conn: sqlite3.Connection, changes: Iterable[Tuple[str, Optional[str], dict]]):
+    """
+    Append (kind, promise_id, payload) rows to ChangeLog. Call inside the
+    write transaction that makes the change.
+    """
+    conn.executemany(
+        "INSERT INTO ChangeLog (kind, promise_id, payload) VALUES (?, ?, ?)",
+        [(kind, promise_id, encode_json(payload).decode("utf-8")) for kind, promise_id, payload in changes],
+    )
+
+
+class FeedGone(Exception):
+    """`since` is no longer served by this database; the client must resync"""
+
+    def __init__(self, message: str, epoch: str, latest: int):
+        super().__init__(message)
+        self.message = message
+        self.epoch = epoch
+        self.latest = latest
+
+
+class ChangesModel:
+    """
+    Model for ChangeLog table.
+    """
+
+    def __init__(self, db_path: str = "src/database/political_party.db"):
+        self.db_path = db_path
+        self.pool = get_pool(db_path)
+
+    def get_bounds(self) -> Tuple[str, int, int]:
+        """
+        (epoch, first_seq, latest_seq). epoch changes whenever the database is
+        reloaded; first_seq is the oldest seq still kept (latest + 1 if none).
+        """
+        # อ่านจาก primary เสมอ: seq ที่ client เห็นต้องไม่ย้อนหลังเมื่อสลับไปอ่าน snapshot
+        with self.pool.reader(primary=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT
+                    (SELECT version || '.' || updated_at FROM DataVersions WHERE scope = ?),
+                    (SELECT MIN(seq) FROM ChangeLog),
+                    (SELECT seq FROM sqlite_sequence WHERE name = 'ChangeLog')
+            """, (GLOBAL_SCOPE,))
+            epoch, first_seq, latest = cursor.fetchone()
+            cursor.close()
+        latest = latest or 0
+        return epoch or "0", first_seq or latest + 1, latest
+
+    def get_changes(self, since: int, limit: int = DEFAULT_CHANGES_LIMIT,
+                    epoch: Optional[str] = None, wait: float = 0) -> dict:
+        """
+        Changes with seq > since, oldest first. With wait > 0 and nothing new,
+        block up to `wait` seconds for the next change (long-poll).
+        Raises FeedGone if the client's position cannot be continued: another
+        epoch, a seq from the future (database replaced) or pruned history.
+        Returns {"epoch", "changes", "next_since", "latest", "has_more"}.
+        """
+        limit = max(0, min(int(limit), MAX_CHANGES_LIMIT))
+        deadline = time.monotonic() + max(0.0, wait)
+
+        while True:
+            current_epoch, first_seq, latest = self.get_bounds()
+            if epoch is not None and epoch != current_epoch:
+                raise FeedGone("Database was reloaded", current_epoch, latest)
+            if since > latest:
+                raise FeedGone("Unknown position", current_epoch, latest)
+            if since < first_seq - 1:
+                raise FeedGone("Changes since this position were pruned", current_epoch, latest)
+
+            remaining = deadline - time.monotonic()
+            if latest > since or limit == 0 or remaining <= 0:
+                break
+            time.sleep(min(POLL_INTERVAL, remaining))
+
+        changes = self._fetch(since, limit) if limit and latest > since else []
+        next_since = changes[-1]["seq"] if changes else since
+        return {
+            "epoch": current_epoch,
+            "changes": changes,
+            "next_since": next_since,
+            "latest": latest,
+            "has_more": next_since < latest,
+        }
+
+    def _fetch(self, since: int, limit: int) -> List[dict]:
+        with self.pool.reader(primary=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT seq, kind, promise_id, payload, created_at
+                FROM ChangeLog
+                WHERE seq > ?
+                ORDER BY seq
+                LIMIT ?
+            """, (since, limit))
+            rows = cursor.fetchall()
+            cursor.close()
+        # payload เป็น JSON อยู่แล้ว ส่งต่อโดยไม่ต้อง decode/encode ใหม่
+        return [{"seq": seq, "kind": kind, "promise_id": promise_id,
+                 "created_at": created_at, "data": JSONFragment(payload.encode("utf-8"))}
+                for seq, kind, promise_id, payload, created_at in rows]
@@ -0,0 +1,224 @@
+"""
+Shared SQLite connection pool used by every model.
+
+Readers check a connection out of a small LIFO pool, so GET requests running
+on different threads each use their own connection and proceed in parallel
+under WAL. Writes go through a single writer connection guarded by a lock and
+wrapped in BEGIN IMMEDIATE ... COMMIT, which matches SQLite's one-writer model.
+With a replica attached (model/snapshot.py) GET requests may read from a snapshot
+file instead; see ConnectionPool.reader.
+"""
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# PRAGMA ที่ตั้งให้ทุก connection (journal_mode=WAL ตั้งครั้งเดียวที่ writer เพราะเป็นค่าถาวรของไฟล์)
+CONNECTION_PRAGMAS = {
+    "busy_timeout": 5000,        # ms, รอ lock แทนที่จะ error "database is locked" ทันที
+    "synchronous": "NORMAL",     # ปลอดภัยภายใต้ WAL และ fsync น้อยกว่า FULL
+    "cache_size": -16000,        # ~16 MB page cache ต่อ connection
+    "mmap_size": 268435456,      # 256 MB memory-mapped I/O
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+DEFAULT_MAX_READERS = 8
+CHECKOUT_TIMEOUT = 10  # seconds
+
+# ถูกเรียกกับทุก connection ที่เปิดใหม่ (ใช้โดย instrumentation.py) ดู set_connect_hook
+_connect_hook: Optional[Callable[[sqlite3.Connection], None]] = None
+
+# SQLite ก่อน 3.32 รับ host parameter ได้สูงสุด 999 ตัวต่อ statement
+MAX_IN_PARAMS = 500
+
+
+def open_connection(database: str, factory, uri: bool = False) -> sqlite3.Connection:
+    """Open a connection with the pool's settings (Row rows, pragmas, connect hook)"""
+    conn = sqlite3.connect(
+        database,
+        factory=factory,
+        uri=uri,
+        check_same_thread=False,
+        isolation_level=None,  # จัดการ transaction เองด้วย BEGIN IMMEDIATE
+    )
+    conn.row_factory = sqlite3.Row
+    for name, value in CONNECTION_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    if _connect_hook is not None:
+        _connect_hook(conn)
+    return conn
+
+
+class PoolExhausted(Exception):
+    """No reader was returned to the pool within CHECKOUT_TIMEOUT (server busy, HTTP 503)"""
+
+
+class PooledConnection(sqlite3.Connection):
+    """Read-write connection handed out by ConnectionPool.writer()"""
+
+
+class ReadOnlyConnection(PooledConnection):
+    """Connection for GET paths; query_only makes any write attempt fail"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.execute("PRAGMA query_only = ON")
+
+
+class ConnectionPool:
+    """
+    Pool of read-only connections plus one serialized writer for one DB file.
+    Use get_pool(db_path) rather than constructing this directly so that all
+    models pointing at the same file share the pool.
+    """
+
+    def __init__(self, db_path: str, max_readers: int = DEFAULT_MAX_READERS):
+        self.db_path = db_path
+        self.max_readers = max_readers
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.replica = None  # ReplicaRouter (model/snapshot.py) เมื่อเปิดโหมด snapshot
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._generation = getattr(self, "_generation", 0) + 1
+        self._writer = None
+
+    def _check_fork(self):
+        # หลัง fork (เช่น gunicorn worker) ห้ามใช้ connection ที่สืบทอดมาจาก process แม่
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+
+    def _connect(self, factory) -> sqlite3.Connection:
+        conn = open_connection(self.db_path, factory)
+        conn.pool_generation = self._generation
+        return conn
+
+    def _get_writer(self) -> PooledConnection:
+        if self._writer is None:
+            conn = self._connect(PooledConnection)
+            conn.execute("PRAGMA journal_mode = WAL")
+            self._writer = conn
+        return self._writer
+
+    @contextmanager
+    def reader(self, primary: bool = False) -> Iterator[ReadOnlyConnection]:
+        """
+        Check out a read-only connection for the duration of the block.
+        With a replica attached, the replica decides per request whether the
+        snapshot may serve it; primary=True always reads the primary file.
+        """
+        snapshot = self.replica.choose() if self.replica is not None and not primary else None
+        if snapshot is not None:
+            with snapshot.reader() as conn:
+                yield conn
+            return
+
+        self._check_fork()
+        if self._writer is None:
+            # เปิด writer ก่อนเพื่อให้ไฟล์อยู่ในโหมด WAL ก่อนที่ reader ตัวแรกจะเปิด
+            with self._write_lock:
+                self._get_writer()
+
+        conn = None
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._created < self.max_readers:
+                    self._created += 1
+                    conn = self._connect(ReadOnlyConnection)
+            if conn is None:
+                try:
+                    conn = self._idle.get(timeout=CHECKOUT_TIMEOUT)
+                except queue.Empty:
+                    raise PoolExhausted(f"no read connection free after {CHECKOUT_TIMEOUT}s") from None
+
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            if conn.pool_generation == self._generation:
+                self._idle.put(conn)
+            else:
+                conn.close()
+
+    @contextmanager
+    def writer(self) -> Iterator[PooledConnection]:
+        """
+        Run the block as one write transaction on the single writer connection.
+        Commits on success and rolls back if the block raises.
+        """
+        self._check_fork()
+        with self._write_lock:
+            conn = self._get_writer()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+                if self.replica is not None:
+                    self.replica.note_write()
+
+    def close(self):
+        """Close idle readers and the writer; the pool reopens lazily if used again"""
+        with self._write_lock, self._lock:
+            idle, writer = self._idle, self._writer
+            self._reset()
+        while True:
+            try:
+                idle.get_nowait().close()
+            except queue.Empty:
+                break
+        if writer is not None:
+            writer.close()
+
+
+def in_chunks(values: Iterable[str], size: int = MAX_IN_PARAMS) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Split values (deduplicated, order kept) into chunks for `WHERE x IN (...)`.
+    Yields (placeholders, chunk) where placeholders is "?, ?, ..." for the chunk.
+    """
+    unique = list(dict.fromkeys(values))
+    for start in range(0, len(unique), size):
+        chunk = unique[start:start + size]
+        yield ", ".join("?" * len(chunk)), chunk
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def set_connect_hook(hook: Optional[Callable[[sqlite3.Connection], None]]):
+    """
+    Call hook(conn) on every connection opened from now on. Pools that already
+    have connections are closed so that they reopen through the hook.
+    """
+    global _connect_hook
+    _connect_hook = hook
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """Return the process-wide pool for db_path, creating it on first use"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path)
+        return pool
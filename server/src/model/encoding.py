@@ -0,0 +1,121 @@
+"""
+Result containers and JSON encoding that skip the sqlite3.Row -> dict step.
+
+- RowSet: rows as plain tuples plus one tuple of column names. It reads like
+  a list of dicts (indexing / iteration build a dict on demand). The fetch
+  builds no dicts, but encoding a RowSet as a list of objects still makes one
+  short-lived dict per row inside the encoder's default hook: orjson writes
+  dicts in C, and joining per-cell orjson.dumps() into an object template in
+  Python measured 1.5-2x slower. Only RowSet.columnar() is encoded without
+  any per-row dict.
+- JSONFragment: JSON that was encoded once and is inserted into later
+  responses as-is (orjson >= 3.9; older orjson and the stdlib decode it first).
+- encode_json(): orjson when installed, otherwise compact stdlib json.
+"""
+import json
+from collections.abc import Sequence
+from typing import Callable, List, Optional
+
+try:
+    import orjson  # optional
+except ImportError:
+    orjson = None
+
+_Fragment = getattr(orjson, "Fragment", None)
+
+
+class RowSet(Sequence):
+    """Query result as tuples + column names (see module docstring)"""
+
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, columns, rows: List[tuple]):
+        self.columns = tuple(columns)
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RowSet(self.columns, self.rows[index])
+        return dict(zip(self.columns, self.rows[index]))
+
+    def __iter__(self):
+        columns = self.columns
+        for row in self.rows:
+            yield dict(zip(columns, row))
+
+    def __eq__(self, other):
+        if isinstance(other, (RowSet, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"RowSet(columns={self.columns!r}, rows={len(self.rows)})"
+
+    def to_dicts(self) -> List[dict]:
+        return list(self)
+
+    def columnar(self) -> dict:
+        """{"columns": [...], "rows": [[...], ...]}: the compact wire format, no dicts at all"""
+        return {"columns": self.columns, "rows": self.rows}
+
+
+def tuple_cursor(conn):
+    """A cursor on conn that returns plain tuples (for building RowSets)"""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor
+
+
+def fetch_rowset(cursor) -> RowSet:
+    """fetchall() of a tuple_cursor as a RowSet"""
+    return RowSet([d[0] for d in cursor.description], cursor.fetchall())
+
+
+class JSONFragment:
+    """Pre-encoded JSON (UTF-8 bytes)"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def __repr__(self):
+        return f"JSONFragment({len(self.data)} bytes)"
+
+
+def encodable(obj, fallback: Optional[Callable] = None):
+    """`default` hook shared by both encoders; fallback handles any other type"""
+    if isinstance(obj, RowSet):
+        # dict ต่อแถวสร้างตรงนี้ (ตอน encode) และทิ้งทันที ดู docstring ของไฟล์
+        columns = obj.columns
+        return [dict(zip(columns, row)) for row in obj.rows]
+    if isinstance(obj, JSONFragment):
+        if _Fragment is not None:
+            return _Fragment(obj.data)
+        return json.loads(obj.data)
+    if fallback is not None:
+        return fallback(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    # PASSTHROUGH_DATETIME: ให้ date/datetime ไปที่ fallback เหมือน encoder ของ Flask
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def encode_json(obj, default: Optional[Callable] = None, indent: bool = False) -> bytes:
+        option = _OPTIONS | orjson.OPT_INDENT_2 if indent else _OPTIONS
+        return orjson.dumps(obj, default=lambda o: encodable(o, default), option=option)
+
+    decode_json = orjson.loads
+else:
+    def encode_json(obj, default: Optional[Callable] = None, indent: bool = False) -> bytes:
+        text = json.dumps(obj, default=lambda o: encodable(o, default), ensure_ascii=False,
+                          indent=2 if indent else None, separators=None if indent else (",", ":"))
+        return text.encode("utf-8")
+
+    decode_json = json.loads
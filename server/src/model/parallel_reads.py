@@ -0,0 +1,64 @@
+"""
+Optional fan-out of a route's independent model reads (READ_WORKERS > 0,
+off by default).
+
+sqlite3 releases the GIL while a statement runs, so reads submitted to a
+thread pool can overlap, each on its own pooled reader connection. On a warm
+page cache the per-call hand-off costs more than the overlap saves
+(benchmarks/bench_profile_latency.py), so routes call their reads one after
+another unless READ_WORKERS is set; it only pays off when sub-queries wait
+on disk.
+"""
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# context manager ที่ครอบทุก call บน executor (ใช้โดย profiler ใน instrumentation.py)
+_thread_hook = None
+
+
+def set_thread_hook(hook):
+    """Run every executor call inside `with hook():`"""
+    global _thread_hook
+    _thread_hook = hook
+
+
+def _run_hooked(hook, func):
+    with hook():
+        return func()
+
+
+class ReadFanout:
+    """Runs independent model calls, sequentially or on a bounded thread pool"""
+
+    def __init__(self, max_workers: int = 0):
+        self._executor = None
+        if max_workers > 0:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-read")
+
+    def run(self, *calls) -> list:
+        """
+        calls are (method, *args) tuples; returns their results in the same
+        order. With a pool, the first call runs on the calling thread while
+        the others run on the pool.
+        """
+        if self._executor is None or len(calls) < 2:
+            return [method(*args) for method, *args in calls]
+
+        futures = [self._executor.submit(self._bind(method, args)) for method, *args in calls[1:]]
+        method, *args = calls[0]
+        first = method(*args)
+        return [first] + [future.result() for future in futures]
+
+    @staticmethod
+    def _bind(method, args):
+        func = functools.partial(method, *args)
+        # executor ไม่ส่ง contextvars ต่อให้เอง (replica.py และ DataVersions token ของ request อยู่ใน contextvar)
+        ctx = contextvars.copy_context()
+        if _thread_hook is not None:
+            return functools.partial(ctx.run, _run_hooked, _thread_hook, func)
+        return functools.partial(ctx.run, func)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
@@ -1,5 +1,11 @@
 import sqlite3
-from typing import List, Tuple, Optional, Dict
+from typing import Iterable, Iterator, List, Tuple, Optional, Dict
+
+from model.db_pool import get_pool, in_chunks
+from model.cache import cached
+from model.catalog import catalog_first
+from model.encoding import RowSet, tuple_cursor, fetch_rowset
+from model.versions_model import POLITICIAN_LIST_SCOPE, politician_scope
 
 class PoliticiansModel:
     """
@@ -8,33 +14,77 @@ class PoliticiansModel:
     
     def __init__(self, db_path: str = "src/database/political_party.db"):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row  # ให้ผลลัพธ์เป็น Dictionary-like
+        self.pool = get_pool(db_path)  # connection pool กลางที่ทุก model ใช้ร่วมกัน
+        self.catalog = None  # CatalogEngine (model/catalog.py) เมื่อเปิด CATALOG
 
-    def get_all_politicians(self) -> List[dict]:
+    @catalog_first
+    @cached("all_politicians", lambda: POLITICIAN_LIST_SCOPE)
+    def get_all_politicians(self) -> RowSet:
         """Get all politicians ordered by name"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM Politicians ORDER BY name")
-        result = [dict(row) for row in cursor.fetchall()]
-        cursor.close()
+        with self.pool.reader() as conn:
+            cursor = tuple_cursor(conn)
+            cursor.execute("SELECT * FROM Politicians ORDER BY name")
+            result = fetch_rowset(cursor)
+            cursor.close()
         return result
 
+    def iter_all_politicians(self, batch_size: int = 500) -> Iterator[RowSet]:
+        """
+        Streaming version of get_all_politicians, yields keyset batches of
+        batch_size; the reader goes back to the pool before each yield.
+        """
+        position = None
+        while True:
+            with self.pool.reader() as conn:
+                cursor = tuple_cursor(conn)
+                if position is None:
+                    cursor.execute("SELECT * FROM Politicians ORDER BY name, politician_id LIMIT ?", (batch_size,))
+                else:
+                    cursor.execute("""
+                        SELECT * FROM Politicians
+                        WHERE (name, politician_id) > (?, ?)
+                        ORDER BY name, politician_id
+                        LIMIT ?
+                    """, position + (batch_size,))
+                rows = fetch_rowset(cursor)
+                cursor.close()
+
+            if not rows:
+                return
+            yield rows
+            if len(rows) < batch_size:
+                return
+            last = rows[-1]
+            position = (last["name"], last["politician_id"])
+
+    @cached("politician", politician_scope)
     def get_politician_by_id(self, politician_id: str) -> Optional[dict]:
         """Get specific politician profile"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM Politicians WHERE politician_id = ?", (politician_id,))
-        row = cursor.fetchone()
-        cursor.close()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM Politicians WHERE politician_id = ?", (politician_id,))
+            row = cursor.fetchone()
+            cursor.close()
         return dict(row) if row else None
     
-    def get_politicians_by_party(self, party_name: str) -> List[dict]:
-        """Filter politicians by party"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM Politicians WHERE party = ?", (party_name,))
-        result = [dict(row) for row in cursor.fetchall()]
-        cursor.close()
+    def get_politicians_by_ids(self, politician_ids: Iterable[str]) -> Dict[str, dict]:
+        """[Batch] get_politician_by_id for many ids in one query; missing ids are absent"""
+        result = {}
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            for marks, chunk in in_chunks(politician_ids):
+                cursor.execute(f"SELECT * FROM Politicians WHERE politician_id IN ({marks})", chunk)
+                for row in cursor.fetchall():
+                    result[row['politician_id']] = dict(row)
+            cursor.close()
         return result
 
-    def close_connection(self):
-        if self.conn:
-            self.conn.close()
\ No newline at end of file
+    @catalog_first
+    def get_politicians_by_party(self, party_name: str) -> List[dict]:
+        """Filter politicians by party"""
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM Politicians WHERE party = ?", (party_name,))
+            result = [dict(row) for row in cursor.fetchall()]
+            cursor.close()
+        return result
\ No newline at end of file
@@ -0,0 +1,235 @@
+from datetime import datetime
+from typing import List, Optional
+
+from model.db_pool import get_pool, in_chunks
+from model.cache import invalidate_promise_updates, invalidate_promise_status
+from model.write_hooks import on_update_added, on_status_changed
+from model.promises_model import VALID_STATUSES, SILENT_STATUS
+from model.promise_updates_model import allocate_update_ids
+
+DATE_FORMAT = "%Y-%m-%d"
+MAX_BULK_ITEMS = 10000  # ต่อ request (ทั้ง batch ถือ write lock ไว้ใน transaction เดียว)
+
+
+class UpdateRejected(Exception):
+    """A progress update failed validation; carries the HTTP status to return"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def validate_update(promise, latest_update: Optional[str], detail: Optional[str],
+                    update_date: str, new_status: Optional[str]):
+    """
+    Apply the [View 3] rules to one update. `promise` needs status and
+    announcement_date; latest_update is the newest update_date of the promise.
+    Raises UpdateRejected on the first rule that fails.
+    """
+    # --- Check 0: ชนิดข้อมูลจาก JSON (เช่น list / dict) ต้องได้ 400 ไม่ใช่ TypeError ---
+    if detail is not None and not isinstance(detail, str):
+        raise UpdateRejected("Detail must be a string")
+    if not isinstance(update_date, str):
+        raise UpdateRejected("Invalid date format")
+    if new_status is not None and not isinstance(new_status, str):
+        raise UpdateRejected("Status must be a string")
+
+    # --- Check 1: ห้ามอัปเดตถ้า "เงียบหาย" ---
+    if promise['status'] == SILENT_STATUS:
+        raise UpdateRejected("Cannot update: Status is Silent")
+
+    # --- Check 2: วันที่อัปเดต ต้องไม่ก่อน วันที่ประกาศ ---
+    try:
+        announcement_date = datetime.strptime(promise['announcement_date'], DATE_FORMAT)
+        new_update_date = datetime.strptime(update_date, DATE_FORMAT)
+    except (ValueError, TypeError):
+        raise UpdateRejected("Invalid date format")
+
+    if new_update_date < announcement_date:
+        raise UpdateRejected(
+            f"วันที่อัปเดต ({update_date}) ต้องไม่เกิดขึ้นก่อนวันที่ประกาศสัญญา ({promise['announcement_date']})"
+        )
+
+    # --- Check 3: ต้องไม่ย้อนหลังไปกว่า "การอัปเดตล่าสุด" (Time Paradox)
+    if latest_update:
+        latest_update_date = datetime.strptime(latest_update, DATE_FORMAT)
+        if new_update_date < latest_update_date:
+            raise UpdateRejected(
+                f"ไม่สามารถบันทึกได้: วันที่ระบุ ({update_date}) เกิดขึ้นก่อนการอัปเดตล่าสุด ({latest_update})"
+            )
+
+    if not detail:
+        raise UpdateRejected("Detail is required")
+
+    if new_status and new_status != 'same' and new_status not in VALID_STATUSES:
+        raise UpdateRejected(f"Invalid status: {new_status}")
+
+
+class ProgressUpdateService:
+    """
+    Write path for [View 3]: validate a progress update, insert it and change
+    the promise status in a single transaction (one BEGIN IMMEDIATE, one commit).
+    Because validation runs under the write lock, no other writer can slip an
+    update in between the time-paradox check and the insert.
+    """
+
+    def __init__(self, db_path: str = "src/database/political_party.db"):
+        self.db_path = db_path
+        self.pool = get_pool(db_path)
+
+    def add_progress_update(self, promise_id: str, detail: Optional[str], update_date: str,
+                            new_status: Optional[str] = None) -> str:
+        """
+        Add an update (and optional status change) to a promise.
+        Returns the new update_id; raises UpdateRejected if any rule fails.
+        """
+        change_status = bool(new_status) and new_status != 'same'
+
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+
+            # 1. ดึงข้อมูลสัญญามาตรวจสอบ
+            cursor.execute("""
+                SELECT p.politician_id, p.status, p.announcement_date, pol.party
+                FROM Promises p
+                JOIN Politicians pol ON p.politician_id = pol.politician_id
+                WHERE p.promise_id = ?
+            """, (promise_id,))
+            promise = cursor.fetchone()
+            if not promise:
+                raise UpdateRejected("Promise not found", 404)
+
+            # MAX() ใช้ index (promise_id, update_date) จึงไม่ต้องดึงประวัติทั้งหมดมาหาใน Python
+            cursor.execute(
+                "SELECT MAX(update_date) FROM PromiseUpdates WHERE promise_id = ?",
+                (promise_id,),
+            )
+            validate_update(promise, cursor.fetchone()[0], detail, update_date, new_status)
+
+            # 2. บันทึกประวัติ (Update Log)
+            new_id = allocate_update_ids(conn)[0]
+            cursor.execute("""
+                INSERT INTO PromiseUpdates (update_id, promise_id, update_date, detail)
+                VALUES (?, ?, ?, ?)
+            """, (new_id, promise_id, update_date, detail))
+
+            # 3. อัปเดตสถานะสัญญา (ถ้ามีการส่งค่ามา และไม่ใช่ "same") ใน transaction เดียวกัน
+            if change_status:
+                cursor.execute(
+                    "UPDATE Promises SET status = ? WHERE promise_id = ?",
+                    (new_status, promise_id),
+                )
+
+            cursor.close()
+
+            # version ของ ETag + ตารางสรุปสถิติ เปลี่ยนใน transaction เดียวกับข้อมูล
+            on_update_added(conn, promise_id, [(new_id, update_date, detail)])
+            if change_status:
+                on_status_changed(conn, promise_id, promise['politician_id'], promise['party'],
+                                  promise['status'], new_status)
+
+        # ล้าง cache หลัง commit แล้วเท่านั้น
+        invalidate_promise_updates(promise_id)
+        if change_status:
+            invalidate_promise_status(promise_id, promise['politician_id'])
+
+        return new_id
+
+    def add_progress_updates_bulk(self, items: List[dict]) -> List[dict]:
+        """
+        Validate and insert many updates in one transaction.
+        Each item is {"promise_id", "detail", "update_date", "status"?}. Items are
+        checked in order with the same rules as add_progress_update, and accepted
+        items count towards later ones (an earlier update in the batch moves the
+        latest date; an earlier status change to "เงียบหาย" blocks the rest).
+        Invalid items are skipped, not fatal. Returns one result per item:
+        {"index", "status": "created", "update_id"} or
+        {"index", "status": "error", "code", "message"}.
+        """
+        results = [None] * len(items)
+        accepted = []        # (index, promise_id, update_date, detail)
+        status_changes = []  # (promise_id, politician_id, party, old_status, new_status)
+
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+
+            # 1. โหลดสถานะของทุกสัญญาที่อ้างถึง + วันที่อัปเดตล่าสุด (query ละครั้งต่อ chunk)
+            promise_ids = [item.get('promise_id') for item in items
+                           if isinstance(item, dict) and isinstance(item.get('promise_id'), str)]
+            state = {}
+            for marks, chunk in in_chunks(promise_ids):
+                cursor.execute(f"""
+                    SELECT p.promise_id, p.politician_id, p.status, p.announcement_date, pol.party
+                    FROM Promises p
+                    JOIN Politicians pol ON p.politician_id = pol.politician_id
+                    WHERE p.promise_id IN ({marks})
+                """, chunk)
+                for row in cursor.fetchall():
+                    state[row['promise_id']] = dict(row, latest=None)
+                cursor.execute(f"""
+                    SELECT promise_id, MAX(update_date) AS latest
+                    FROM PromiseUpdates
+                    WHERE promise_id IN ({marks})
+                    GROUP BY promise_id
+                """, chunk)
+                for row in cursor.fetchall():
+                    state[row['promise_id']]['latest'] = row['latest']
+
+            # 2. ตรวจทีละรายการตามลำดับ (ไม่ต้องแตะ database อีก)
+            for index, item in enumerate(items):
+                try:
+                    if not isinstance(item, dict):
+                        raise UpdateRejected("Item must be a JSON object")
+                    promise_id = item.get('promise_id')
+                    promise = state.get(promise_id) if isinstance(promise_id, str) else None
+                    if promise is None:
+                        raise UpdateRejected("Promise not found", 404)
+                    detail, update_date = item.get('detail'), item.get('update_date')
+                    new_status = item.get('status')
+                    validate_update(promise, promise['latest'], detail, update_date, new_status)
+                except UpdateRejected as e:
+                    results[index] = {"index": index, "status": "error",
+                                      "code": e.status_code, "message": e.message}
+                    continue
+
+                accepted.append((index, promise_id, update_date, detail))
+                promise['latest'] = max(promise['latest'] or update_date, update_date)
+                if new_status and new_status != 'same':
+                    status_changes.append((promise_id, promise['politician_id'], promise['party'],
+                                           promise['status'], new_status))
+                    promise['status'] = new_status
+
+            # 3. บันทึกทั้งหมดด้วย executemany ใน transaction เดียว
+            new_ids = []
+            if accepted:
+                new_ids = allocate_update_ids(conn, len(accepted))
+                cursor.executemany("""
+                    INSERT INTO PromiseUpdates (update_id, promise_id, update_date, detail)
+                    VALUES (?, ?, ?, ?)
+                """, [(update_id, promise_id, update_date, detail)
+                      for update_id, (_, promise_id, update_date, detail) in zip(new_ids, accepted)])
+                for update_id, (index, _, _, _) in zip(new_ids, accepted):
+                    results[index] = {"index": index, "status": "created", "update_id": update_id}
+
+            if status_changes:
+                cursor.executemany("UPDATE Promises SET status = ? WHERE promise_id = ?",
+                                   [(new_status, promise_id) for promise_id, _, _, _, new_status in status_changes])
+            cursor.close()
+
+            # version ของ ETag + ตารางสรุปสถิติ + change feed (รวมต่อสัญญา ไม่ใช่ต่อแถว)
+            per_promise = {}
+            for update_id, (_, promise_id, update_date, detail) in zip(new_ids, accepted):
+                per_promise.setdefault(promise_id, []).append((update_id, update_date, detail))
+            for promise_id, updates in per_promise.items():
+                on_update_added(conn, promise_id, updates)
+            for change in status_changes:
+                on_status_changed(conn, *change)
+
+        # ล้าง cache หลัง commit แล้วเท่านั้น
+        for promise_id in per_promise:
+            invalidate_promise_updates(promise_id)
+        for promise_id, politician_id, _, _, _ in status_changes:
+            invalidate_promise_status(promise_id, politician_id)
+
+        return results
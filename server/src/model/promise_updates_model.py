@@ -1,5 +1,37 @@
 import sqlite3
-from typing import List
+from typing import Dict, Iterable, List
+
+from model.db_pool import get_pool, in_chunks
+from model.cache import cached, invalidate_promise_updates
+from model.encoding import RowSet, tuple_cursor, fetch_rowset
+from model.write_hooks import on_update_added
+from model.schema import UPDATE_ID_SEQUENCE
+from model.versions_model import promise_scope
+
+
+def format_update_id(number: int) -> str:
+    """U001 ... U999, then U1000 onwards (existing 3-digit ids stay valid)"""
+    return f"U{number:03d}"
+
+
+def allocate_update_ids(conn: sqlite3.Connection, count: int = 1) -> List[str]:
+    """
+    Reserve `count` consecutive update ids from the IdSequences table.
+    Must be called inside a write transaction (ConnectionPool.writer), whose
+    BEGIN IMMEDIATE lock makes the increment atomic across threads and processes.
+    """
+    cursor = conn.cursor()
+    cursor.execute("UPDATE IdSequences SET value = value + ? WHERE name = ?", (count, UPDATE_ID_SEQUENCE))
+    if cursor.rowcount == 0:
+        cursor.close()
+        raise sqlite3.OperationalError(
+            "IdSequences is missing; run `python load_csv_to_db.py --migrate`"
+        )
+    cursor.execute("SELECT value FROM IdSequences WHERE name = ?", (UPDATE_ID_SEQUENCE,))
+    last = cursor.fetchone()[0]
+    cursor.close()
+    return [format_update_id(n) for n in range(last - count + 1, last + 1)]
+
 
 class PromiseUpdatesModel:
     """
@@ -8,54 +40,61 @@ class PromiseUpdatesModel:
     
     def __init__(self, db_path: str = "src/database/political_party.db"):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self.pool = get_pool(db_path)  # connection pool กลางที่ทุก model ใช้ร่วมกัน
 
-    def get_updates_by_promise_id(self, promise_id: str) -> List[dict]:
+    @cached("updates_by_promise", promise_scope)
+    def get_updates_by_promise_id(self, promise_id: str) -> RowSet:
         """[View 2 History] Get all updates for a specific promise"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT update_id, update_date, detail
-            FROM PromiseUpdates
-            WHERE promise_id = ?
-            ORDER BY update_date DESC
-        """, (promise_id,))
-        result = [dict(row) for row in cursor.fetchall()]
-        cursor.close()
+        with self.pool.reader() as conn:
+            cursor = tuple_cursor(conn)
+            cursor.execute("""
+                SELECT update_id, update_date, detail
+                FROM PromiseUpdates
+                WHERE promise_id = ?
+                ORDER BY update_date DESC
+            """, (promise_id,))
+            result = fetch_rowset(cursor)
+            cursor.close()
+        return result
+
+    def get_updates_by_promise_ids(self, promise_ids: Iterable[str]) -> Dict[str, List[dict]]:
+        """[Batch] get_updates_by_promise_id for many promises in one query"""
+        result = {}
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            for marks, chunk in in_chunks(promise_ids):
+                for promise_id in chunk:
+                    result[promise_id] = []
+                cursor.execute(f"""
+                    SELECT promise_id, update_id, update_date, detail
+                    FROM PromiseUpdates
+                    WHERE promise_id IN ({marks})
+                    ORDER BY promise_id, update_date DESC
+                """, chunk)
+                for row in cursor.fetchall():
+                    result[row['promise_id']].append(
+                        {"update_id": row['update_id'], "update_date": row['update_date'], "detail": row['detail']}
+                    )
+            cursor.close()
         return result
 
     def add_update(self, promise_id: str, detail: str, update_date: str) -> bool:
         """[View 3] Add new progress update"""
         try:
-            cursor = self.conn.cursor()
-            
-            # Auto-generate ID logic (Uxxx -> U+1)
-            cursor.execute("SELECT MAX(update_id) FROM PromiseUpdates")
-            max_id = cursor.fetchone()[0]
-            
-            if max_id:
-                # Assuming ID format "Uxxx" e.g., "U005"
-                prefix = max_id[0]
-                try:
-                    number = int(max_id[1:]) + 1
-                except ValueError:
-                    number = 1 # Fallback if ID format is weird
-                new_id = f"{prefix}{number:03d}"
-            else:
-                new_id = "U001"
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
 
-            cursor.execute("""
-                INSERT INTO PromiseUpdates (update_id, promise_id, update_date, detail)
-                VALUES (?, ?, ?, ?)
-            """, (new_id, promise_id, update_date, detail))
-            
-            self.conn.commit()
-            cursor.close()
+                # จองรหัสใหม่จาก IdSequences (O(1) และไม่ชนกันแม้ POST พร้อมกัน)
+                new_id = allocate_update_ids(conn)[0]
+
+                cursor.execute("""
+                    INSERT INTO PromiseUpdates (update_id, promise_id, update_date, detail)
+                    VALUES (?, ?, ?, ?)
+                """, (new_id, promise_id, update_date, detail))
+                cursor.close()
+                on_update_added(conn, promise_id, [(new_id, update_date, detail)])
+            invalidate_promise_updates(promise_id)
             return True
         except sqlite3.Error as e:
             print(f"Error adding update: {e}")
-            return False
-
-    def close_connection(self):
-        if self.conn:
-            self.conn.close()
\ No newline at end of file
+            return False
\ No newline at end of file
@@ -1,5 +1,63 @@
+import base64
 import sqlite3
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from model.db_pool import get_pool, in_chunks
+from model.encoding import RowSet, tuple_cursor, fetch_rowset
+from model.cache import cached, invalidate_promise_status
+from model.catalog import catalog_first
+from model.write_hooks import on_status_changed
+from model.versions_model import PROMISE_LIST_SCOPE, politician_scope, promise_scope
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+STREAM_BATCH_SIZE = 500
+
+VALID_STATUSES = {"ยังไม่เริ่ม", "กำลังดำเนินการ", "เงียบหาย", "สำเร็จแล้ว"}
+SILENT_STATUS = "เงียบหาย"
+
+# คอลัมน์ของ [View 1] ทุกรูปแบบ (หน้า, stream, ?ids=) ให้ client ได้ schema เดียวกัน
+LIST_COLUMNS = """
+    p.promise_id, p.description, p.status, p.announcement_date,
+    pol.name AS politician_name,
+    pol.party AS party_name,
+    pol.politician_id
+"""
+
+
+def encode_cursor(announcement_date: str, promise_id: str) -> str:
+    """Encode the keyset position (announcement_date, promise_id) as an opaque token"""
+    raw = f"{announcement_date}|{promise_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple:
+    """Decode a token made by encode_cursor. Raises ValueError if it is malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    announcement_date, sep, promise_id = raw.partition("|")
+    if not sep or not announcement_date or not promise_id:
+        raise ValueError("Invalid cursor")
+    return announcement_date, promise_id
+
+
+def list_filters(status: Optional[str], party: Optional[str], politician_id: Optional[str]) -> tuple:
+    """WHERE conditions and parameters shared by the View 1 list queries"""
+    filters, params = [], []
+    if status:
+        filters.append("p.status = ?")
+        params.append(status)
+    if party:
+        filters.append("pol.party = ?")
+        params.append(party)
+    if politician_id:
+        filters.append("p.politician_id = ?")
+        params.append(politician_id)
+    return filters, params
+
 
 class PromisesModel:
     """
@@ -8,69 +66,217 @@ class PromisesModel:
     
     def __init__(self, db_path: str = "src/database/political_party.db"):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self.pool = get_pool(db_path)  # connection pool กลางที่ทุก model ใช้ร่วมกัน
+        self.catalog = None  # CatalogEngine (model/catalog.py) เมื่อเปิด CATALOG
 
-    def get_all_promises_with_politician_info(self) -> List[dict]:
+    @cached("promise_count", lambda *filters: PROMISE_LIST_SCOPE)
+    def count_promises(self, status: Optional[str] = None, party: Optional[str] = None,
+                       politician_id: Optional[str] = None) -> int:
         """
-        [View 1] Get all promises joined with politician name.
-        Ordered by announcement date (Newest first).
+        Number of promises matching the list filters. Cached per filter set
+        until the next status change or import (PROMISE_LIST_SCOPE token),
+        so paging with include_total does not re-count every page.
         """
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT 
-                p.promise_id, p.description, p.status, p.announcement_date,
-                pol.name AS politician_name, 
-                pol.party AS party_name,
-                pol.politician_id
-            FROM Promises p
-            JOIN Politicians pol ON p.politician_id = pol.politician_id
-            ORDER BY p.announcement_date DESC
-        """)
-        result = [dict(row) for row in cursor.fetchall()]
-        cursor.close()
-        return result
+        filters, params = list_filters(status, party, politician_id)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        with self.pool.reader() as conn:
+            return conn.execute(f"""
+                SELECT COUNT(*)
+                FROM Promises p
+                JOIN Politicians pol ON p.politician_id = pol.politician_id
+                {where}
+            """, params).fetchone()[0]
+
+    def get_promises_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                          status: Optional[str] = None, party: Optional[str] = None,
+                          politician_id: Optional[str] = None,
+                          include_total: bool = False) -> dict:
+        """
+        [View 1] All promises joined with politician name, keyset-paginated.
+        Pages are ordered by (announcement_date, promise_id) newest first, so every
+        page seeks straight to the cursor position instead of skipping earlier rows.
+        Returns {"data", "next_cursor", "total"}; total is only counted on request
+        (see count_promises).
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        filters, params = list_filters(status, party, politician_id)
+        total = self.count_promises(status, party, politician_id) if include_total else None
+
+        with self.pool.reader() as conn:
+            cur = tuple_cursor(conn)
+            page_filters, page_params = list(filters), list(params)
+            if cursor:
+                last_date, last_id = decode_cursor(cursor)
+                page_filters.append("(p.announcement_date, p.promise_id) < (?, ?)")
+                page_params.extend([last_date, last_id])
+            where = f"WHERE {' AND '.join(page_filters)}" if page_filters else ""
+
+            # ดึงเกินมา 1 แถวเพื่อดูว่ายังมีหน้าถัดไปหรือไม่
+            cur.execute(f"""
+                SELECT {LIST_COLUMNS}
+                FROM Promises p
+                JOIN Politicians pol ON p.politician_id = pol.politician_id
+                {where}
+                ORDER BY p.announcement_date DESC, p.promise_id DESC
+                LIMIT ?
+            """, page_params + [limit + 1])
+            rows = fetch_rowset(cur)
+            cur.close()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last["announcement_date"], last["promise_id"])
+
+        return {"data": rows, "next_cursor": next_cursor, "total": total}
 
-    def get_promises_by_politician(self, politician_id: str) -> List[dict]:
+    def iter_promises_with_politician_info(self, status: Optional[str] = None,
+                                           party: Optional[str] = None,
+                                           politician_id: Optional[str] = None,
+                                           batch_size: int = STREAM_BATCH_SIZE) -> Iterator[RowSet]:
+        """
+        [View 1 streaming] Same rows and order as get_promises_page without a limit,
+        yielded in keyset batches of batch_size so the full result is never held in
+        memory. Each batch checks a reader out of the pool and returns it before
+        yielding, so a slow client never keeps a pooled connection; a status change
+        made while the stream runs may show up in the batches after it.
+        """
+        filters, params = list_filters(status, party, politician_id)
+        position = None
+        while True:
+            page_filters, page_params = list(filters), list(params)
+            if position is not None:
+                page_filters.append("(p.announcement_date, p.promise_id) < (?, ?)")
+                page_params.extend(position)
+            where = f"WHERE {' AND '.join(page_filters)}" if page_filters else ""
+
+            with self.pool.reader() as conn:
+                cursor = tuple_cursor(conn)
+                cursor.execute(f"""
+                    SELECT {LIST_COLUMNS}
+                    FROM Promises p
+                    JOIN Politicians pol ON p.politician_id = pol.politician_id
+                    {where}
+                    ORDER BY p.announcement_date DESC, p.promise_id DESC
+                    LIMIT ?
+                """, page_params + [batch_size])
+                rows = fetch_rowset(cursor)
+                cursor.close()
+
+            if not rows:
+                return
+            yield rows
+            if len(rows) < batch_size:
+                return
+            last = rows[-1]
+            position = (last["announcement_date"], last["promise_id"])
+
+    @catalog_first
+    @cached("promises_by_politician", politician_scope)
+    def get_promises_by_politician(self, politician_id: str) -> RowSet:
         """[View 4] Get promises for specific politician"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT * FROM Promises 
-            WHERE politician_id = ? 
-            ORDER BY announcement_date DESC
-        """, (politician_id,))
-        result = [dict(row) for row in cursor.fetchall()]
-        cursor.close()
+        with self.pool.reader() as conn:
+            cursor = tuple_cursor(conn)
+            cursor.execute("""
+                SELECT * FROM Promises 
+                WHERE politician_id = ? 
+                ORDER BY announcement_date DESC
+            """, (politician_id,))
+            result = fetch_rowset(cursor)
+            cursor.close()
         return result
 
+    @cached("promise_detail", promise_scope)
     def get_promise_detail_by_id(self, promise_id: str) -> Optional[dict]:
         """[View 2 Header] Get detailed promise info including politician name"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT p.*, pol.name AS politician_name, pol.party
-            FROM Promises p
-            JOIN Politicians pol ON p.politician_id = pol.politician_id
-            WHERE p.promise_id = ?
-        """, (promise_id,))
-        row = cursor.fetchone()
-        cursor.close()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT p.*, pol.name AS politician_name, pol.party
+                FROM Promises p
+                JOIN Politicians pol ON p.politician_id = pol.politician_id
+                WHERE p.promise_id = ?
+            """, (promise_id,))
+            row = cursor.fetchone()
+            cursor.close()
         return dict(row) if row else None
 
+    def get_promises_by_ids(self, promise_ids: Iterable[str]) -> Dict[str, dict]:
+        """[Batch] get_promise_detail_by_id for many ids in one query; missing ids are absent"""
+        result = {}
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            for marks, chunk in in_chunks(promise_ids):
+                cursor.execute(f"""
+                    SELECT p.*, pol.name AS politician_name, pol.party
+                    FROM Promises p
+                    JOIN Politicians pol ON p.politician_id = pol.politician_id
+                    WHERE p.promise_id IN ({marks})
+                """, chunk)
+                for row in cursor.fetchall():
+                    result[row['promise_id']] = dict(row)
+            cursor.close()
+        return result
+
+    def get_promise_list_by_ids(self, promise_ids: Iterable[str]) -> Dict[str, dict]:
+        """[View 1 ?ids=] List rows (same columns as get_promises_page) by id; missing ids are absent"""
+        result = {}
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            for marks, chunk in in_chunks(promise_ids):
+                cursor.execute(f"""
+                    SELECT {LIST_COLUMNS}
+                    FROM Promises p
+                    JOIN Politicians pol ON p.politician_id = pol.politician_id
+                    WHERE p.promise_id IN ({marks})
+                """, chunk)
+                for row in cursor.fetchall():
+                    result[row['promise_id']] = dict(row)
+            cursor.close()
+        return result
+
+    def get_promises_by_politicians(self, politician_ids: Iterable[str]) -> Dict[str, List[dict]]:
+        """[Batch] get_promises_by_politician for many politicians in one query"""
+        result = {}
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            for marks, chunk in in_chunks(politician_ids):
+                for politician_id in chunk:
+                    result[politician_id] = []
+                cursor.execute(f"""
+                    SELECT * FROM Promises
+                    WHERE politician_id IN ({marks})
+                    ORDER BY politician_id, announcement_date DESC
+                """, chunk)
+                for row in cursor.fetchall():
+                    result[row['politician_id']].append(dict(row))
+            cursor.close()
+        return result
+
     def update_promise_status(self, promise_id: str, new_status: str) -> bool:
         """Update the status of a promise"""
-        valid_statuses = {"ยังไม่เริ่ม", "กำลังดำเนินการ", "เงียบหาย", "สำเร็จแล้ว"}
-        if new_status not in valid_statuses:
+        if new_status not in VALID_STATUSES:
             return False
 
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("UPDATE Promises SET status = ? WHERE promise_id = ?", (new_status, promise_id))
-            self.conn.commit()
-            cursor.close()
-            return cursor.rowcount > 0
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT p.politician_id, p.status, pol.party
+                    FROM Promises p
+                    JOIN Politicians pol ON p.politician_id = pol.politician_id
+                    WHERE p.promise_id = ?
+                """, (promise_id,))
+                row = cursor.fetchone()
+                if not row:
+                    cursor.close()
+                    return False
+                cursor.execute("UPDATE Promises SET status = ? WHERE promise_id = ?", (new_status, promise_id))
+                cursor.close()
+                on_status_changed(conn, promise_id, row['politician_id'], row['party'],
+                                  row['status'], new_status)
+            invalidate_promise_status(promise_id, row['politician_id'])
+            return True
         except sqlite3.Error:
-            return False
-
-    def close_connection(self):
-        if self.conn:
-            self.conn.close()
\ No newline at end of file
+            return False
\ No newline at end of file
@@ -0,0 +1,215 @@
+"""
+Versioned schema migrations for political_party.db.
+
+Each migration runs once, in its own transaction, and is recorded in the
+SchemaVersion table so that an existing database can be upgraded in place
+(python load_csv_to_db.py --migrate) instead of being dropped and reloaded.
+New migrations must only ever be appended to MIGRATIONS.
+"""
+import sqlite3
+from typing import Callable, List, Tuple, Union
+
+from model.stats_model import rebuild_stats
+
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+
+# ชื่อ sequence ของรหัสความคืบหน้า (Uxxx) ในตาราง IdSequences
+UPDATE_ID_SEQUENCE = "PromiseUpdates"
+
+
+def sync_id_sequences(conn: sqlite3.Connection):
+    """
+    Move the PromiseUpdates sequence up to the highest numeric Uxxx id present.
+    Needed after rows are loaded from CSV outside of the allocator; never moves
+    the sequence backwards.
+    """
+    conn.execute("""
+        INSERT INTO IdSequences (name, value)
+        SELECT ?, COALESCE(MAX(CAST(SUBSTR(update_id, 2) AS INTEGER)), 0)
+        FROM PromiseUpdates
+        WHERE update_id GLOB 'U[0-9]*'
+        ON CONFLICT(name) DO UPDATE SET value = MAX(value, excluded.value)
+    """, (UPDATE_ID_SEQUENCE,))
+
+
+MIGRATIONS: List[Tuple[int, str, List[Step]]] = [
+    (1, "Indexes matching the model query shapes", [
+        # PromisesModel: รายการทั้งหมด / แบ่งหน้า (ORDER BY announcement_date, promise_id)
+        """CREATE INDEX IF NOT EXISTS idx_promises_date_id
+           ON Promises(announcement_date DESC, promise_id DESC)""",
+        # PromisesModel: คำสัญญาของนักการเมือง + filter politician_id ของหน้ารวม
+        """CREATE INDEX IF NOT EXISTS idx_promises_politician_date
+           ON Promises(politician_id, announcement_date DESC, promise_id DESC)""",
+        # PromisesModel: filter status ของหน้ารวม
+        """CREATE INDEX IF NOT EXISTS idx_promises_status_date
+           ON Promises(status, announcement_date DESC, promise_id DESC)""",
+        # PoliticiansModel: ORDER BY name / WHERE party = ?
+        """CREATE INDEX IF NOT EXISTS idx_politicians_name
+           ON Politicians(name)""",
+        """CREATE INDEX IF NOT EXISTS idx_politicians_party
+           ON Politicians(party, politician_id)""",
+        # CampaignsModel: WHERE politician_id = ? ORDER BY election_year DESC
+        """CREATE INDEX IF NOT EXISTS idx_campaigns_politician_year
+           ON Campaigns(politician_id, election_year DESC)""",
+        # PromiseUpdatesModel: WHERE promise_id = ? ORDER BY update_date DESC
+        """CREATE INDEX IF NOT EXISTS idx_updates_promise_date
+           ON PromiseUpdates(promise_id, update_date DESC)""",
+    ]),
+    (2, "IdSequences table for race-free update_id allocation", [
+        """CREATE TABLE IF NOT EXISTS IdSequences (
+               name TEXT PRIMARY KEY,
+               value INTEGER NOT NULL
+           )""",
+        sync_id_sequences,
+    ]),
+    (3, "DataVersions table for HTTP ETag / Last-Modified", [
+        """CREATE TABLE IF NOT EXISTS DataVersions (
+               scope TEXT PRIMARY KEY,
+               version INTEGER NOT NULL DEFAULT 0,
+               updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+           )""",
+        # แถว '*' คือ epoch ของทั้ง database (เปลี่ยนเมื่อ import ข้อมูลใหม่)
+        """INSERT OR IGNORE INTO DataVersions (scope, version) VALUES ('*', 0)""",
+    ]),
+    (4, "ImportState table for incremental CSV imports", [
+        """CREATE TABLE IF NOT EXISTS ImportState (
+               filename TEXT PRIMARY KEY,
+               size INTEGER NOT NULL,
+               mtime_ns INTEGER NOT NULL,
+               sha256 TEXT NOT NULL,
+               rows INTEGER NOT NULL,
+               imported_at TEXT NOT NULL
+           )""",
+    ]),
+    (5, "FTS5 search index over promise descriptions and update details", [
+        # trigram tokenizer: ภาษาไทยไม่มีช่องว่างระหว่างคำ unicode61 จึงตัดคำไม่ได้
+        # trigram ทำ index ทุกๆ 3 ตัวอักษร ทำให้ค้นหาคำย่อยในประโยคได้ (ต้องการ SQLite >= 3.34)
+        # external content: ข้อความเก็บที่ตารางจริง FTS เก็บแค่ index (rowid ผูกกับ rowid ของตารางต้นทาง)
+        """CREATE VIRTUAL TABLE IF NOT EXISTS PromiseSearch USING fts5(
+               description,
+               content='Promises', content_rowid='rowid',
+               tokenize='trigram'
+           )""",
+        """CREATE VIRTUAL TABLE IF NOT EXISTS UpdateSearch USING fts5(
+               detail,
+               content='PromiseUpdates', content_rowid='rowid',
+               tokenize='trigram'
+           )""",
+        """CREATE TRIGGER IF NOT EXISTS trg_promises_search_ai AFTER INSERT ON Promises BEGIN
+               INSERT INTO PromiseSearch(rowid, description) VALUES (new.rowid, new.description);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_promises_search_ad AFTER DELETE ON Promises BEGIN
+               INSERT INTO PromiseSearch(PromiseSearch, rowid, description)
+               VALUES ('delete', old.rowid, old.description);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_promises_search_au AFTER UPDATE OF description ON Promises BEGIN
+               INSERT INTO PromiseSearch(PromiseSearch, rowid, description)
+               VALUES ('delete', old.rowid, old.description);
+               INSERT INTO PromiseSearch(rowid, description) VALUES (new.rowid, new.description);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_updates_search_ai AFTER INSERT ON PromiseUpdates BEGIN
+               INSERT INTO UpdateSearch(rowid, detail) VALUES (new.rowid, new.detail);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_updates_search_ad AFTER DELETE ON PromiseUpdates BEGIN
+               INSERT INTO UpdateSearch(UpdateSearch, rowid, detail)
+               VALUES ('delete', old.rowid, old.detail);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_updates_search_au AFTER UPDATE OF detail ON PromiseUpdates BEGIN
+               INSERT INTO UpdateSearch(UpdateSearch, rowid, detail)
+               VALUES ('delete', old.rowid, old.detail);
+               INSERT INTO UpdateSearch(rowid, detail) VALUES (new.rowid, new.detail);
+           END""",
+        # สร้าง index จากข้อมูลที่มีอยู่แล้ว
+        "INSERT INTO PromiseSearch(PromiseSearch) VALUES ('rebuild')",
+        "INSERT INTO UpdateSearch(UpdateSearch) VALUES ('rebuild')",
+    ]),
+    (6, "Materialized promise-status summaries per politician, party and promise", [
+        """CREATE TABLE IF NOT EXISTS PoliticianStatusCounts (
+               politician_id TEXT NOT NULL,
+               status TEXT NOT NULL,
+               promise_count INTEGER NOT NULL,
+               PRIMARY KEY (politician_id, status)
+           ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS PartyStatusCounts (
+               party TEXT NOT NULL,
+               status TEXT NOT NULL,
+               promise_count INTEGER NOT NULL,
+               PRIMARY KEY (party, status)
+           ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS PromiseUpdateStats (
+               promise_id TEXT PRIMARY KEY,
+               update_count INTEGER NOT NULL,
+               latest_update_date TEXT
+           )""",
+        rebuild_stats,
+    ]),
+    (7, "ChangeLog table for the /api/changes feed", [
+        # AUTOINCREMENT: seq ไม่ถูกนำกลับมาใช้ซ้ำแม้แถวเก่าถูกลบ (client อ้างอิง seq ที่เคยเห็น)
+        """CREATE TABLE IF NOT EXISTS ChangeLog (
+               seq INTEGER PRIMARY KEY AUTOINCREMENT,
+               kind TEXT NOT NULL,
+               promise_id TEXT,
+               payload TEXT NOT NULL,
+               created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+           )""",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def ensure_version_table(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS SchemaVersion (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Return the highest applied migration version (0 for an unversioned DB)"""
+    ensure_version_table(conn)
+    row = conn.execute("SELECT MAX(version) FROM SchemaVersion").fetchone()
+    return row[0] or 0
+
+
+def run_migrations(conn: sqlite3.Connection, verbose: bool = False) -> List[int]:
+    """
+    Apply every migration newer than the current schema version.
+    Safe to run repeatedly; returns the list of versions applied by this call.
+    """
+    current = get_schema_version(conn)
+    applied = []
+
+    for version, description, steps in MIGRATIONS:
+        if version <= current:
+            continue
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # process อื่น (เช่น worker อีกตัว) อาจ migrate ไปแล้วระหว่างที่รอ lock
+            if conn.execute("SELECT 1 FROM SchemaVersion WHERE version = ?", (version,)).fetchone():
+                conn.rollback()
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(
+                "INSERT INTO SchemaVersion (version, description) VALUES (?, ?)",
+                (version, description),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        applied.append(version)
+        if verbose:
+            print(f"  ✅ Migration {version}: {description}")
+
+    return applied
@@ -0,0 +1,123 @@
+import html
+from typing import Optional
+
+from model.db_pool import get_pool, in_chunks
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+MIN_QUERY_LENGTH = 3  # trigram tokenizer จับคู่ได้เมื่อคำค้นยาวอย่างน้อย 3 ตัวอักษร
+
+# snippet() คั่นคำที่ตรงด้วยอักขระ private-use แทน HTML เพื่อ escape ข้อความก่อนแล้วค่อยใส่ <mark>
+MARK_START, MARK_END = "\ue000", "\ue001"
+
+
+def build_match_query(q: str) -> str:
+    """
+    Turn free text into an FTS5 MATCH expression: every whitespace-separated
+    term becomes a quoted phrase and all terms must match (implicit AND).
+    Raises ValueError if any term is too short for the trigram index.
+    """
+    terms = q.split()
+    if not terms:
+        raise ValueError("Query is required")
+    if any(len(term) < MIN_QUERY_LENGTH for term in terms):
+        raise ValueError(f"Each search term must be at least {MIN_QUERY_LENGTH} characters")
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def highlight(snippet: str) -> str:
+    """HTML-escape a snippet, then turn the match delimiters into <mark> tags"""
+    return html.escape(snippet).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+PROMISE_HIT_SQL = """
+    SELECT PromiseSearch.rowid AS hit, 'promise' AS kind, p.promise_id, NULL AS update_id, NULL AS update_date,
+           snippet(PromiseSearch, 0, ?, ?, '…', 16) AS snippet,
+           p.description, p.status, pol.name AS politician_name, pol.party AS party_name
+    FROM PromiseSearch
+    JOIN Promises p ON p.rowid = PromiseSearch.rowid
+    JOIN Politicians pol ON pol.politician_id = p.politician_id
+    WHERE PromiseSearch MATCH ? AND PromiseSearch.rowid IN ({marks})
+"""
+
+UPDATE_HIT_SQL = """
+    SELECT UpdateSearch.rowid AS hit, 'update' AS kind, p.promise_id, u.update_id, u.update_date,
+           snippet(UpdateSearch, 0, ?, ?, '…', 16) AS snippet,
+           p.description, p.status, pol.name AS politician_name, pol.party AS party_name
+    FROM UpdateSearch
+    JOIN PromiseUpdates u ON u.rowid = UpdateSearch.rowid
+    JOIN Promises p ON p.promise_id = u.promise_id
+    JOIN Politicians pol ON pol.politician_id = p.politician_id
+    WHERE UpdateSearch MATCH ? AND UpdateSearch.rowid IN ({marks})
+"""
+
+
+class SearchModel:
+    """
+    Model for the PromiseSearch / UpdateSearch FTS5 indexes.
+    """
+
+    def __init__(self, db_path: str = "src/database/political_party.db"):
+        self.db_path = db_path
+        self.pool = get_pool(db_path)
+
+    def search(self, q: str, limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0) -> dict:
+        """
+        Full-text search over promise descriptions and update details,
+        best matches first. Returns {"data", "next_offset"}.
+
+        bm25() values of two FTS tables are not comparable (different
+        document counts and lengths), so each source's rank is divided by the
+        rank of its own best match: score is 1.0 for the best promise and the
+        best update and falls towards 0 for weaker matches. snippet is
+        HTML-escaped text with the matches wrapped in <mark>.
+        """
+        match = build_match_query(q)
+        limit = max(1, min(int(limit), MAX_SEARCH_LIMIT))
+        offset = max(0, int(offset))
+
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            # 1. จัดอันดับและตัดหน้าจาก (rowid, bm25) เท่านั้น: snippet ของทุกผลลัพธ์แพงเกินไป
+            cursor.execute("""
+                WITH promise_hits AS (
+                    SELECT rowid, bm25(PromiseSearch) AS rank FROM PromiseSearch WHERE PromiseSearch MATCH ?
+                ), update_hits AS (
+                    SELECT rowid, bm25(UpdateSearch) AS rank FROM UpdateSearch WHERE UpdateSearch MATCH ?
+                )
+                SELECT 'promise' AS kind, rowid, COALESCE(rank / NULLIF(MIN(rank) OVER (), 0), 1.0) AS score
+                FROM promise_hits
+                UNION ALL
+                SELECT 'update' AS kind, rowid, COALESCE(rank / NULLIF(MIN(rank) OVER (), 0), 1.0) AS score
+                FROM update_hits
+                ORDER BY score DESC, kind, rowid
+                LIMIT ? OFFSET ?
+            """, (match, match, limit + 1, offset))
+            hits = cursor.fetchall()
+
+            # 2. snippet และข้อมูลประกอบเฉพาะแถวในหน้านี้
+            details = {}
+            for kind, sql in (("promise", PROMISE_HIT_SQL), ("update", UPDATE_HIT_SQL)):
+                rowids = [hit['rowid'] for hit in hits if hit['kind'] == kind]
+                for marks, chunk in in_chunks(rowids):
+                    cursor.execute(sql.format(marks=marks), [MARK_START, MARK_END, match] + chunk)
+                    for row in cursor.fetchall():
+                        details[(kind, row['hit'])] = row
+            cursor.close()
+
+        rows = []
+        for hit in hits:
+            row = details.get((hit['kind'], hit['rowid']))
+            if row is None:
+                continue
+            item = dict(row)
+            del item['hit']
+            item['snippet'] = highlight(item['snippet'])
+            item['score'] = hit['score']
+            rows.append(item)
+
+        next_offset: Optional[int] = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_offset = offset + limit
+        return {"data": rows, "next_offset": next_offset}
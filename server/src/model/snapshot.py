@@ -0,0 +1,258 @@
+"""
+Read-only snapshot of the primary database for serving GET requests.
+
+SnapshotRefresher copies the primary into one snapshot file with the SQLite
+online backup API (only when something was committed since the last copy)
+and swaps it in with an atomic rename. Readers open the snapshot with
+immutable=1, so SQLite takes no locks and never checks the file for changes:
+reads scale across processes without touching the primary's WAL or locks.
+The snapshot's mtime is the time up to which it is known to match the
+primary; the refresher bumps it on every check.
+
+ReplicaRouter decides per request whether a read may use the snapshot: only
+for requests that allow it (GET), only while the snapshot is no older than
+max_staleness, and only if it already contains the client's own last write
+(read_after). Otherwise the primary serves the read. The choice is pinned for
+the rest of the request so all its queries see one consistent source.
+"""
+import contextvars
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from model.db_pool import ReadOnlyConnection, open_connection, DEFAULT_MAX_READERS, CHECKOUT_TIMEOUT
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+DEFAULT_REFRESH_INTERVAL = 1.0  # seconds
+DEFAULT_MAX_STALENESS = 5.0  # seconds
+
+_PRIMARY = "primary"
+
+
+class ReadRoute:
+    """Read routing state of one request"""
+
+    __slots__ = ("allow_snapshot", "read_after", "inode", "mtime", "pinned", "wrote_at")
+
+    def __init__(self, allow_snapshot: bool, read_after: float = 0.0):
+        self.allow_snapshot = allow_snapshot
+        self.read_after = read_after
+        self.inode = None  # snapshot ที่เห็นตอนเริ่ม request
+        self.mtime = 0.0
+        self.pinned = None  # _PRIMARY หรือ inode ของ snapshot ที่เลือกใช้
+        self.wrote_at = None
+
+
+_route: contextvars.ContextVar[Optional[ReadRoute]] = contextvars.ContextVar("read_route", default=None)
+
+
+class SnapshotReaders:
+    """LIFO pool of immutable read-only connections to the current snapshot file"""
+
+    def __init__(self, path: str, max_readers: int = DEFAULT_MAX_READERS):
+        self.path = path
+        self.max_readers = max_readers
+        self._lock = threading.Lock()
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self.inode = None
+
+    def swap(self, inode: Optional[int]):
+        """A new snapshot file was renamed into place: drop connections to the old one"""
+        self.inode = inode
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._created -= 1
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        uri = Path(os.path.abspath(self.path)).as_uri() + "?immutable=1"
+        conn = open_connection(uri, ReadOnlyConnection, uri=True)
+        conn.snapshot_inode = self.inode
+        return conn
+
+    @contextmanager
+    def reader(self) -> Iterator[ReadOnlyConnection]:
+        conn = None
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._created < self.max_readers:
+                    self._created += 1
+                    conn = self._connect()
+            if conn is None:
+                conn = self._idle.get(timeout=CHECKOUT_TIMEOUT)
+
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            if conn.snapshot_inode == self.inode:
+                self._idle.put(conn)
+            else:
+                with self._lock:
+                    self._created -= 1
+                conn.close()
+
+    def close(self):
+        self.swap(None)
+
+
+class SnapshotRefresher(threading.Thread):
+    """
+    Keeps snapshot_path in step with the primary every `interval` seconds.
+    Every process starts one, but only the holder of an exclusive lock on
+    <snapshot>.lock copies; the others retry the lock and take over if the
+    holder exits.
+    """
+
+    def __init__(self, primary_path: str, snapshot_path: str,
+                 interval: float = DEFAULT_REFRESH_INTERVAL):
+        super().__init__(name="snapshot-refresher", daemon=True)
+        self.primary_path = primary_path
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._lock_file = None
+        self._source = None
+        self._data_version = None
+        self.copies = 0
+
+    def _try_lock(self) -> bool:
+        if self._lock_file is None:
+            self._lock_file = open(self.snapshot_path + ".lock", "a")
+        try:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def refresh(self) -> bool:
+        """Copy the primary if it changed since the last copy; returns True if it copied"""
+        if self._source is None:
+            self._source = sqlite3.connect(self.primary_path, check_same_thread=False)
+        # เวลาก่อนอ่าน: ทุก commit ที่เสร็จก่อนเวลานี้อยู่ใน snapshot แน่นอน
+        checked_at = time.time()
+        # data_version เปลี่ยนเมื่อ connection อื่น (ทุก process) commit
+        data_version = self._source.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version and os.path.exists(self.snapshot_path):
+            os.utime(self.snapshot_path, (checked_at, checked_at))
+            return False
+
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        target = sqlite3.connect(tmp_path)
+        try:
+            # pages=-1: copy ในขั้นเดียวภายใต้ read transaction เดียว (ไม่บล็อก writer ภายใต้ WAL)
+            self._source.backup(target)
+            # immutable reader ไม่ใช้ -wal/-shm จึงเปลี่ยนไฟล์ snapshot เป็น rollback journal
+            target.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            target.close()
+        os.utime(tmp_path, (checked_at, checked_at))
+        os.replace(tmp_path, self.snapshot_path)
+        self._data_version = data_version
+        self.copies += 1
+        return True
+
+    def run(self):
+        locked = False
+        while True:
+            try:
+                locked = locked or self._try_lock()
+                if locked:
+                    self.refresh()
+            except Exception as e:
+                print(f"Snapshot refresh failed: {e}")
+            if self._stop_event.wait(self.interval):
+                break
+        if self._source is not None:
+            self._source.close()
+        if self._lock_file is not None:
+            self._lock_file.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class ReplicaRouter:
+    """Attached to ConnectionPool.replica; chooses snapshot or primary per request"""
+
+    def __init__(self, snapshot_path: str, max_staleness: float = DEFAULT_MAX_STALENESS,
+                 max_readers: int = DEFAULT_MAX_READERS):
+        self.snapshot_path = snapshot_path
+        self.max_staleness = max_staleness
+        self.readers = SnapshotReaders(snapshot_path, max_readers)
+        self.on_swap: Optional[Callable[[], None]] = None  # เรียกเมื่อ snapshot ใหม่ถูกสลับเข้ามา
+        self.snapshot_reads = 0
+        self.primary_reads = 0
+
+    def begin_request(self, allow_snapshot: bool, read_after: float = 0.0) -> ReadRoute:
+        """Start routing for the current request (call before its first query)"""
+        route = ReadRoute(allow_snapshot, read_after)
+        try:
+            st = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            st = None
+        if st is not None:
+            route.inode, route.mtime = st.st_ino, st.st_mtime
+            if st.st_ino != self.readers.inode:
+                self.readers.swap(st.st_ino)
+                if self.on_swap is not None:
+                    self.on_swap()
+        _route.set(route)
+        return route
+
+    def choose(self) -> Optional[SnapshotReaders]:
+        """SnapshotReaders if the current read may use the snapshot, else None (primary)"""
+        route = _route.get()
+        if route is None or not route.allow_snapshot:
+            return None
+        if route.pinned is None:
+            usable = (route.inode is not None
+                      and route.mtime >= time.time() - self.max_staleness
+                      and route.mtime >= route.read_after)
+            route.pinned = route.inode if usable else _PRIMARY
+            if usable:
+                self.snapshot_reads += 1
+            else:
+                self.primary_reads += 1
+        # snapshot ถูกสลับกลางทาง: primary ใหม่กว่าเสมอ จึงอ่านจาก primary ต่อ
+        if route.pinned == _PRIMARY or route.pinned != self.readers.inode:
+            return None
+        return self.readers
+
+    def note_write(self):
+        """Called by ConnectionPool.writer after each commit"""
+        route = _route.get()
+        if route is not None:
+            route.wrote_at = time.time()
+            route.pinned = _PRIMARY
+
+
+def needs_fresh_reads() -> bool:
+    """
+    True while the snapshot has not caught up with this client's last write.
+    ReadCache skips cached values then (they may have been loaded from the
+    older snapshot after the write invalidated them).
+    """
+    route = _route.get()
+    return route is not None and route.read_after > route.mtime
+
+
+def snapshots_supported() -> bool:
+    return fcntl is not None
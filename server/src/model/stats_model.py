@@ -0,0 +1,148 @@
+import sqlite3
+from typing import Dict, Iterable, List
+
+from model.db_pool import get_pool, in_chunks
+
+# คำสัญญาที่ยังไม่มีการอัปเดตไม่มีแถวใน PromiseUpdateStats จึงได้ 0 / null
+PROMISE_UPDATE_STATS_COLUMNS = """
+    p.promise_id, COALESCE(s.update_count, 0) AS update_count, s.latest_update_date
+    FROM Promises p
+    LEFT JOIN PromiseUpdateStats s ON s.promise_id = p.promise_id
+"""
+
+
+def rebuild_stats(conn: sqlite3.Connection):
+    """
+    Recompute every summary table from scratch. Used by migrations and
+    load_csv_to_db.py; the write paths keep the tables current incrementally.
+    """
+    conn.execute("DELETE FROM PoliticianStatusCounts")
+    conn.execute("""
+        INSERT INTO PoliticianStatusCounts (politician_id, status, promise_count)
+        SELECT politician_id, status, COUNT(*) FROM Promises GROUP BY politician_id, status
+    """)
+    conn.execute("DELETE FROM PartyStatusCounts")
+    conn.execute("""
+        INSERT INTO PartyStatusCounts (party, status, promise_count)
+        SELECT pol.party, p.status, COUNT(*)
+        FROM Promises p
+        JOIN Politicians pol ON pol.politician_id = p.politician_id
+        GROUP BY pol.party, p.status
+    """)
+    conn.execute("DELETE FROM PromiseUpdateStats")
+    conn.execute("""
+        INSERT INTO PromiseUpdateStats (promise_id, update_count, latest_update_date)
+        SELECT promise_id, COUNT(*), MAX(update_date) FROM PromiseUpdates GROUP BY promise_id
+    """)
+
+
+def apply_status_change(conn: sqlite3.Connection, politician_id: str, party: str,
+                        old_status: str, new_status: str):
+    """Move one promise from old_status to new_status in the per-politician and per-party counts"""
+    if old_status == new_status:
+        return
+    conn.execute("""
+        UPDATE PoliticianStatusCounts SET promise_count = promise_count - 1
+        WHERE politician_id = ? AND status = ?
+    """, (politician_id, old_status))
+    conn.execute("""
+        INSERT INTO PoliticianStatusCounts (politician_id, status, promise_count) VALUES (?, ?, 1)
+        ON CONFLICT(politician_id, status) DO UPDATE SET promise_count = promise_count + 1
+    """, (politician_id, new_status))
+    conn.execute("""
+        UPDATE PartyStatusCounts SET promise_count = promise_count - 1
+        WHERE party = ? AND status = ?
+    """, (party, old_status))
+    conn.execute("""
+        INSERT INTO PartyStatusCounts (party, status, promise_count) VALUES (?, ?, 1)
+        ON CONFLICT(party, status) DO UPDATE SET promise_count = promise_count + 1
+    """, (party, new_status))
+
+
+def record_promise_update(conn: sqlite3.Connection, promise_id: str, update_date: str, count: int = 1):
+    """Add `count` updates (the latest dated update_date) to the per-promise update stats"""
+    conn.execute("""
+        INSERT INTO PromiseUpdateStats (promise_id, update_count, latest_update_date) VALUES (?, ?, ?)
+        ON CONFLICT(promise_id) DO UPDATE SET
+            update_count = update_count + excluded.update_count,
+            latest_update_date = MAX(latest_update_date, excluded.latest_update_date)
+    """, (promise_id, count, update_date))
+
+
+def _group_counts(rows, key_cols) -> List[dict]:
+    result, current = [], None
+    for row in rows:
+        key = tuple(row[c] for c in key_cols)
+        if current is None or current["_key"] != key:
+            current = {"_key": key, **{c: row[c] for c in key_cols}, "total": 0, "counts": {}}
+            result.append(current)
+        if row['status'] is not None and row['promise_count']:
+            current["counts"][row['status']] = row['promise_count']
+            current["total"] += row['promise_count']
+    for item in result:
+        del item["_key"]
+    return result
+
+
+class StatsModel:
+    """
+    Model for the promise-status summary tables (PoliticianStatusCounts,
+    PartyStatusCounts, PromiseUpdateStats). Reads are O(#politicians) or
+    O(#parties) regardless of how many promises exist.
+    """
+
+    def __init__(self, db_path: str = "src/database/political_party.db"):
+        self.db_path = db_path
+        self.pool = get_pool(db_path)
+
+    def get_politician_stats(self) -> List[dict]:
+        """Status counts for every politician, ordered by name"""
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT pol.politician_id, pol.name, pol.party, s.status, s.promise_count
+                FROM Politicians pol
+                LEFT JOIN PoliticianStatusCounts s ON s.politician_id = pol.politician_id
+                ORDER BY pol.name, pol.politician_id
+            """)
+            rows = cursor.fetchall()
+            cursor.close()
+        return _group_counts(rows, ("politician_id", "name", "party"))
+
+    def get_party_stats(self) -> List[dict]:
+        """Status counts for every party"""
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT party, status, promise_count
+                FROM PartyStatusCounts
+                ORDER BY party
+            """)
+            rows = cursor.fetchall()
+            cursor.close()
+        return _group_counts(rows, ("party",))
+
+    def get_promise_update_stats_by_politician(self, politician_id: str) -> List[dict]:
+        """Update count and latest update date of each promise of a politician (newest promise first)"""
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT {PROMISE_UPDATE_STATS_COLUMNS}
+                WHERE p.politician_id = ?
+                ORDER BY p.announcement_date DESC, p.promise_id DESC
+            """, (politician_id,))
+            rows = [dict(row) for row in cursor.fetchall()]
+            cursor.close()
+        return rows
+
+    def get_promise_update_stats_by_ids(self, promise_ids: Iterable[str]) -> Dict[str, dict]:
+        """{promise_id: update stats} for the promises that exist"""
+        result = {}
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            for marks, chunk in in_chunks(promise_ids):
+                cursor.execute(f"SELECT {PROMISE_UPDATE_STATS_COLUMNS} WHERE p.promise_id IN ({marks})", chunk)
+                for row in cursor.fetchall():
+                    result[row['promise_id']] = dict(row)
+            cursor.close()
+        return result
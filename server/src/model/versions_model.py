@@ -0,0 +1,116 @@
+import contextvars
+import sqlite3
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from model.db_pool import get_pool
+
+# scope ที่ใช้ทำ ETag ของแต่ละ endpoint
+GLOBAL_SCOPE = "*"
+PROMISE_LIST_SCOPE = "promises"
+POLITICIAN_LIST_SCOPE = "politicians"
+
+
+# token ที่อ่านแล้วใน request ปัจจุบัน {scope: (token, last_modified)} ดู begin_request_versions
+_request_versions: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("request_versions",
+                                                                                   default=None)
+
+
+def begin_request_versions():
+    """
+    Start a per-request memo of version tokens. ETag (http_cache.conditional),
+    read cache and catalog then all see the same token for a scope within one
+    request, and the later ones need no extra query.
+    """
+    _request_versions.set({})
+
+
+def end_request_versions(exc=None):
+    """teardown_request: worker threads are reused, never carry tokens over"""
+    _request_versions.set(None)
+
+
+def forget_request_versions():
+    """This request committed a write: the memoized tokens are outdated"""
+    memo = _request_versions.get()
+    if memo is not None:
+        memo.clear()
+
+
+def promise_scope(promise_id: str) -> str:
+    return f"promise:{promise_id}"
+
+
+def politician_scope(politician_id: str) -> str:
+    return f"politician:{politician_id}"
+
+
+def bump_versions(conn: sqlite3.Connection, *scopes: str):
+    """
+    Increment the version of each scope. Call inside the write transaction that
+    changes the data so the new version becomes visible together with the data.
+    """
+    conn.executemany("""
+        INSERT INTO DataVersions (scope, version, updated_at)
+        VALUES (?, 1, CURRENT_TIMESTAMP)
+        ON CONFLICT(scope) DO UPDATE SET
+            version = version + 1,
+            updated_at = CURRENT_TIMESTAMP
+    """, [(scope,) for scope in scopes])
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+
+
+def make_token(epoch, version: int) -> str:
+    """Version token of a scope; epoch is the GLOBAL_SCOPE row (None before the first import)"""
+    epoch_token = f"{epoch['version']}.{epoch['updated_at']}" if epoch else "0"
+    return f"{epoch_token}:{version}"
+
+
+def read_version(pool, scope: str) -> Tuple[str, Optional[datetime]]:
+    """
+    Return (version_token, last_modified) for scope. The token also carries
+    the database epoch so a reloaded database never reuses an old ETag.
+    Memoized per request (see begin_request_versions).
+    """
+    memo = _request_versions.get()
+    if memo is not None and scope in memo:
+        return memo[scope]
+
+    with pool.reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT scope, version, updated_at FROM DataVersions WHERE scope IN (?, ?)",
+            (scope, GLOBAL_SCOPE),
+        )
+        rows = {row['scope']: row for row in cursor.fetchall()}
+        cursor.close()
+
+    epoch = rows.get(GLOBAL_SCOPE)
+    entry = rows.get(scope)
+
+    stamps = [_parse_timestamp(r['updated_at']) for r in (epoch, entry) if r]
+    last_modified = max(stamps) if stamps else None
+    result = (make_token(epoch, entry['version'] if entry else 0), last_modified)
+    if memo is not None:
+        memo[scope] = result
+    return result
+
+
+class DataVersionsModel:
+    """
+    Model for DataVersions table: a cheap per-table / per-entity change counter
+    that lets GET endpoints answer revalidations without running their queries.
+    """
+
+    def __init__(self, db_path: str = "src/database/political_party.db"):
+        self.db_path = db_path
+        self.pool = get_pool(db_path)
+
+    def get_version(self, scope: str) -> Tuple[str, Optional[datetime]]:
+        """(version_token, last_modified) for scope, see read_version"""
+        return read_version(self.pool, scope)
@@ -0,0 +1,37 @@
+"""
+Bookkeeping that must accompany every write to Promises / PromiseUpdates.
+
+These run inside the caller's write transaction (ConnectionPool.writer), so
+the derived rows (versions, stats, change feed) commit or roll back together
+with the data itself. Cache invalidation is not done here because it must
+wait until after the commit.
+"""
+import sqlite3
+from typing import List, Tuple
+
+from model.changes_model import record_changes, UPDATE_ADDED, STATUS_CHANGED
+from model.stats_model import apply_status_change, record_promise_update
+from model.versions_model import (bump_versions, promise_scope, politician_scope,
+                                  PROMISE_LIST_SCOPE)
+
+
+def on_update_added(conn: sqlite3.Connection, promise_id: str, updates: List[Tuple[str, str, str]]):
+    """After inserting PromiseUpdates rows (update_id, update_date, detail) for promise_id"""
+    bump_versions(conn, promise_scope(promise_id))
+    record_promise_update(conn, promise_id, max(update_date for _, update_date, _ in updates), len(updates))
+    record_changes(conn, [
+        (UPDATE_ADDED, promise_id, {"update_id": update_id, "promise_id": promise_id,
+                                    "update_date": update_date, "detail": detail})
+        for update_id, update_date, detail in updates
+    ])
+
+
+def on_status_changed(conn: sqlite3.Connection, promise_id: str, politician_id: str, party: str,
+                      old_status: str, new_status: str):
+    """After changing the status of promise_id from old_status to new_status"""
+    bump_versions(conn, promise_scope(promise_id), politician_scope(politician_id), PROMISE_LIST_SCOPE)
+    apply_status_change(conn, politician_id, party, old_status, new_status)
+    record_changes(conn, [
+        (STATUS_CHANGED, promise_id, {"promise_id": promise_id, "politician_id": politician_id,
+                                      "party": party, "old_status": old_status, "new_status": new_status})
+    ])
@@ -0,0 +1,75 @@
+"""
+Snapshot read-replica mode (REPLICA_PATH, off by default).
+
+GET/HEAD requests read from an immutable snapshot of the primary database
+(model/snapshot.py) while it is at most REPLICA_MAX_STALENESS seconds old;
+everything else, and every write, uses the primary. After a request commits
+a write, the response carries the commit time as the `read_after` cookie and
+the X-Read-After header. A client that sends either one back reads from the
+primary until the snapshot has caught up with that write (read-your-writes).
+"""
+import math
+import time
+
+from flask import Flask, g, request
+
+from model.cache import read_cache
+from model.db_pool import get_pool
+from model.snapshot import ReplicaRouter, SnapshotRefresher, needs_fresh_reads, snapshots_supported
+
+READ_AFTER_COOKIE = "read_after"
+READ_AFTER_HEADER = "X-Read-After"
+SNAPSHOT_METHODS = ("GET", "HEAD")
+
+
+def _parse_timestamp(value) -> float:
+    try:
+        stamp = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return stamp if math.isfinite(stamp) else 0.0
+
+
+def init_replica(app: Flask, db_path: str, snapshot_path: str, interval: float, max_staleness: float):
+    """
+    Serve GET reads from a snapshot of db_path kept at snapshot_path. Starts
+    this process's refresher (one process at a time actually copies).
+    """
+    if not snapshots_supported():
+        raise RuntimeError("REPLICA_PATH needs fcntl file locks (POSIX)")
+
+    router = ReplicaRouter(snapshot_path, max_staleness=max_staleness)
+    # ค่าใน cache อาจโหลดมาจาก snapshot เก่า: ล้างทุกครั้งที่มี snapshot ใหม่
+    router.on_swap = read_cache.clear
+    read_cache.bypass = needs_fresh_reads
+    get_pool(db_path).replica = router
+
+    refresher = SnapshotRefresher(db_path, snapshot_path, interval=interval)
+    refresher.start()
+    app.extensions["replica"] = router
+    app.extensions["replica_refresher"] = refresher
+
+    @app.before_request
+    def route_reads():
+        read_after = max(_parse_timestamp(request.cookies.get(READ_AFTER_COOKIE)),
+                         _parse_timestamp(request.headers.get(READ_AFTER_HEADER)))
+        # เวลา write ต้องไม่อยู่ในอนาคต (กันค่าปลอมที่จะบังคับให้อ่าน primary ตลอด)
+        read_after = min(read_after, time.time())
+        g.read_route = router.begin_request(request.method in SNAPSHOT_METHODS, read_after)
+
+    @app.after_request
+    def mark_writes(response):
+        route = g.get("read_route")
+        if route is not None and route.wrote_at is not None:
+            stamp = f"{route.wrote_at:.6f}"
+            response.headers[READ_AFTER_HEADER] = stamp
+            response.set_cookie(READ_AFTER_COOKIE, stamp, max_age=math.ceil(max_staleness) + 1,
+                                httponly=True, samesite="Lax")
+        return response
+
+
+def close_replica(app: Flask):
+    refresher = app.extensions.get("replica_refresher")
+    if refresher is not None:
+        refresher.stop()
+        app.extensions["replica"].readers.close()
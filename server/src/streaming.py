@@ -0,0 +1,107 @@
+"""
+Streaming JSON responses for the large list endpoints.
+
+The models yield rows in keyset batches (each batch borrows a pooled reader
+only while it is fetched); these helpers encode each batch as it arrives, so
+the full result set is never held as a list or a string.
+sse_response writes Server-Sent Events for long-lived feeds (/api/changes).
+"""
+import itertools
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from flask import Response, current_app, request
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+SSE_MIMETYPE = "text/event-stream"
+
+
+def wants_stream() -> str:
+    """
+    Return the requested streaming mode: "ndjson" (Accept: application/x-ndjson),
+    "json" (?stream=1, chunked JSON array) or "" for the normal buffered response.
+    """
+    accept = request.accept_mimetypes
+    if accept[NDJSON_MIMETYPE] > accept["application/json"]:
+        return "ndjson"
+    if request.args.get("stream", "").lower() in ("1", "true", "yes"):
+        return "json"
+    return ""
+
+
+def start_batches(batches: Iterable) -> Iterator:
+    """
+    Fetch the first batch now, inside the view, so an error before any output
+    (e.g. PoolExhausted) still reaches the app's error handlers and status code.
+    """
+    batches = iter(batches)
+    first = next(batches, None)
+    return batches if first is None else itertools.chain([first], batches)
+
+
+def _encoder():
+    """bytes encoder of the app's JSON provider (FastJSONProvider.encode, or dumps)"""
+    provider = current_app.json
+    encode = getattr(provider, "encode", None)
+    if encode is None:
+        return lambda obj: provider.dumps(obj).encode("utf-8")
+    return encode
+
+
+def ndjson_response(batches: Iterable[List[dict]]) -> Response:
+    """One JSON object per line"""
+    encode = _encoder()
+
+    def generate():
+        for batch in batches:
+            yield b"".join(encode(row) + b"\n" for row in batch)
+
+    return Response(generate(), mimetype=NDJSON_MIMETYPE)
+
+
+def json_array_response(batches: Iterable[List[dict]]) -> Response:
+    """
+    Same envelope as the buffered endpoints ({"status", "data", "count"}),
+    written incrementally with chunked transfer encoding.
+    """
+    encode = _encoder()
+
+    def generate():
+        yield b'{"status": "success", "data": ['
+        count = 0
+        for batch in batches:
+            if not batch:
+                continue
+            # ทั้ง batch (list หรือ RowSet) เป็น array เดียว แล้วตัด [ ] ออก
+            chunk = encode(batch)[1:-1]
+            yield (b"," + chunk) if count else chunk
+            count += len(batch)
+        yield f'], "count": {count}}}'.encode()
+
+    return Response(generate(), mimetype="application/json")
+
+
+def sse_response(events: Iterable[Tuple[Optional[str], Optional[int], object]]) -> Response:
+    """
+    Server-Sent Events. Each item is (event, id, data); data is encoded as
+    JSON, and an item with data None is sent as a keep-alive comment.
+    """
+    encode = _encoder()
+
+    def generate():
+        # EventSource ต่อใหม่เองหลัง 3 วินาทีเมื่อ stream จบ (ส่ง Last-Event-ID มาด้วย)
+        yield b"retry: 3000\n\n"
+        for event, event_id, data in events:
+            if data is None:
+                yield b": keep-alive\n\n"
+                continue
+            head = b""
+            if event_id is not None:
+                head += b"id: %d\n" % event_id
+            if event:
+                head += b"event: " + event.encode("utf-8") + b"\n"
+            yield head + b"data: " + encode(data) + b"\n\n"
+
+    response = Response(generate(), mimetype=SSE_MIMETYPE)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # ไม่ให้ nginx buffer event ไว้
+    return response
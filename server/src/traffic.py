@@ -0,0 +1,210 @@
+"""
+Protection for the hot GET endpoints during traffic spikes.
+
+- coalesce(): concurrent identical GETs share one run of the view. The first
+  request executes it; the others that arrive while it is running wait and
+  get a copy of its encoded response instead of querying SQLite again.
+  Requests are identical when endpoint, path + query string, Accept header
+  and the DataVersions token read by @conditional all match, so a request
+  that starts after a write never receives a response computed before it.
+- init_rate_limit(): token bucket per client and per route. A request with
+  no token left gets 429 with Retry-After before the view (or any query)
+  runs.
+
+Both work per process; with gunicorn each worker keeps its own flights and
+buckets, so a client may get up to WEB_CONCURRENCY times the configured rate.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+from flask import Flask, Response, current_app, g, jsonify, make_response, request
+
+COALESCE_WAIT_SECONDS = 10  # follower รอ leader นานสุดเท่านี้ แล้วรัน view เอง
+MAX_BUCKETS = 65536  # จำนวน (client, route) ที่จำไว้ เกินแล้วทิ้งตัวที่ไม่ได้ใช้นานที่สุด
+EXEMPT_METHODS = ("OPTIONS",)  # CORS preflight ไม่นับ
+
+
+# =========================================================
+# SINGLE-FLIGHT COALESCING
+# =========================================================
+class _Flight:
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Tuple[int, list, bytes]] = None  # (status, headers, body)
+
+
+class ResponseCoalescer:
+    """Runs a view once per key among concurrent callers (see module docstring)"""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._flights: Dict[tuple, _Flight] = {}
+        self.executions = 0
+        self.shared = 0
+
+    def configure(self, enabled: bool):
+        self.enabled = enabled
+
+    def run(self, key: tuple, call_view) -> Response:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.executions += 1
+
+        if not leader:
+            if flight.done.wait(COALESCE_WAIT_SECONDS) and flight.result is not None:
+                with self._lock:
+                    self.shared += 1
+                status, headers, body = flight.result
+                return Response(body, status, headers)
+            # leader ล้มเหลว ส่ง stream หรือช้าเกินไป: รัน view เอง
+            return make_response(call_view())
+
+        try:
+            response = make_response(call_view())
+            if not response.is_streamed:
+                flight.result = (response.status_code, list(response.headers), response.get_data())
+            return response
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"executions": self.executions, "shared": self.shared, "in_flight": len(self._flights)}
+
+
+coalescer = ResponseCoalescer()
+
+
+def coalesce(view):
+    """
+    Decorate a GET view (below @conditional, whose version token becomes
+    part of the key) so concurrent identical requests share one execution.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        def call_view():
+            return current_app.ensure_sync(view)(*args, **kwargs)
+
+        token = g.get("data_version")
+        # ไม่มี token (ยังไม่ได้ migrate) แยกไม่ออกว่ามีการเขียนระหว่างนั้นหรือไม่: ไม่รวม
+        if not coalescer.enabled or request.method != "GET" or token is None:
+            return call_view()
+        key = (request.endpoint, request.full_path, request.headers.get("Accept", ""), token)
+        return coalescer.run(key, call_view)
+    return wrapper
+
+
+# =========================================================
+# RATE LIMITING (TOKEN BUCKET)
+# =========================================================
+def parse_route_limits(text: str) -> Dict[str, Tuple[float, float]]:
+    """
+    "api.add_bulk_updates=0.5/2, api.search=10" -> {endpoint: (rate, burst)}.
+    burst is optional (0 = default); rate 0 turns the limit off for that route.
+    """
+    limits = {}
+    for item in (text or "").split(","):
+        if not item.strip():
+            continue
+        endpoint, sep, value = item.partition("=")
+        if not sep or not endpoint.strip():
+            raise ValueError(f"RATE_LIMIT_ROUTES: expected endpoint=rate[/burst], got {item.strip()!r}")
+        rate, _, burst = value.partition("/")
+        limits[endpoint.strip()] = (float(rate), float(burst or 0))
+    return limits
+
+
+def default_burst(rate: float) -> float:
+    return max(1.0, 2 * rate)
+
+
+class TokenBucketLimiter:
+    """
+    One bucket per key holding up to `burst` tokens, refilled at `rate`
+    tokens per second; each request takes one token.
+    """
+
+    def __init__(self, max_buckets: int = MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[tuple, list]" = OrderedDict()  # key -> [tokens, last refill]
+        self.rejected = 0
+
+    def take(self, key: tuple, rate: float, burst: float) -> float:
+        """Take a token: 0.0 if allowed, else the seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [burst, now]
+                if len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            self.rejected += 1
+            return (1 - bucket[0]) / rate
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"rejected": self.rejected, "buckets": len(self._buckets)}
+
+
+rate_limiter = TokenBucketLimiter()
+
+
+def client_id(client_header: str = "") -> str:
+    """remote_addr, or the last value of client_header set by a trusted proxy"""
+    if client_header:
+        value = request.headers.get(client_header, "")
+        if value:
+            # proxy ต่อท้ายค่าของตัวเอง ค่าก่อนหน้านั้น client ปลอมมาได้
+            return value.rsplit(",", 1)[-1].strip()
+    return request.remote_addr or ""
+
+
+def init_rate_limit(app: Flask, rate: float, burst: float = 0,
+                    routes: Optional[Dict[str, Tuple[float, float]]] = None, client_header: str = ""):
+    """
+    Limit every route to `rate` requests per second per client (bursts of up
+    to `burst`); `routes` overrides the limit per endpoint. Nothing is
+    installed when no route has a limit.
+    """
+    limits = {endpoint: (r, b or default_burst(r)) for endpoint, (r, b) in (routes or {}).items()}
+    default = (rate, burst or default_burst(rate)) if rate > 0 else None
+    if default is None and not any(r > 0 for r, _ in limits.values()):
+        return
+
+    @app.before_request
+    def limit_request():
+        if request.method in EXEMPT_METHODS:
+            return None
+        endpoint = request.endpoint or "unmatched"
+        route_rate, route_burst = limits.get(endpoint, default or (0, 0))
+        if route_rate <= 0:
+            return None
+
+        wait = rate_limiter.take((client_id(client_header), endpoint), route_rate, route_burst)
+        if wait == 0.0:
+            return None
+        response = jsonify({"status": "error", "message": "Too many requests"})
+        response.status_code = 429
+        response.headers["Retry-After"] = str(max(1, math.ceil(wait)))
+        return response
@@ -0,0 +1,8 @@
+"""
+WSGI entry point for production serving:
+
+    cd src && gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from controller import create_app
+
+app = create_app()
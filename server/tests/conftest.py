@@ -0,0 +1,36 @@
+import os
+import shutil
+import sqlite3
+import sys
+
+import pytest
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(SERVER_DIR, "src"))
+
+SAMPLE_DB = os.path.join(SERVER_DIR, "src", "database", "political_party.db")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A copy of the committed sample database (the write routes modify it)"""
+    path = str(tmp_path / "political_party.db")
+    shutil.copyfile(SAMPLE_DB, path)
+    return path
+
+
+@pytest.fixture
+def client(db_path):
+    from controller import create_app
+
+    return create_app(DB_PATH=db_path).test_client()
+
+
+@pytest.fixture
+def open_promise_id(db_path):
+    """A promise that still accepts updates"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT promise_id FROM Promises WHERE status <> 'เงียบหาย' LIMIT 1").fetchone()[0]
+    finally:
+        conn.close()
@@ -0,0 +1,32 @@
+import pytest
+
+VALID = {"detail": "ความคืบหน้า", "update_date": "2099-01-01"}
+
+
+@pytest.mark.parametrize("field, value", [
+    ("status", ["a"]),
+    ("status", {"a": 1}),
+    ("detail", ["a"]),
+    ("update_date", 20990101),
+])
+def test_non_string_field_is_rejected(client, open_promise_id, field, value):
+    response = client.post(f"/api/promises/{open_promise_id}/updates", json=dict(VALID, **{field: value}))
+    assert response.status_code == 400
+    assert response.get_json()["status"] == "error"
+
+
+def test_non_object_body_is_rejected(client, open_promise_id):
+    response = client.post(f"/api/promises/{open_promise_id}/updates", json=[VALID])
+    assert response.status_code == 400
+
+
+def test_bulk_rejects_only_the_bad_item(client, open_promise_id):
+    items = [
+        dict(VALID, promise_id=open_promise_id),
+        dict(VALID, promise_id=open_promise_id, status=["a"]),
+    ]
+    response = client.post("/api/updates/bulk", json=items)
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert results[0]["status"] == "created"
+    assert results[1]["status"] == "error" and results[1]["code"] == 400
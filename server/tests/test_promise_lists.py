@@ -0,0 +1,16 @@
+def test_ids_form_has_the_page_schema(client):
+    page = client.get("/api/promises?limit=3").get_json()["data"]
+    ids = ",".join(row["promise_id"] for row in page)
+    by_ids = client.get(f"/api/promises?ids={ids}").get_json()
+    assert by_ids["data"] == page
+    assert by_ids["missing"] == []
+
+
+def test_batch_ids_form_has_the_page_schema(client):
+    page = client.get("/api/promises?limit=2").get_json()["data"]
+    ids = ",".join(row["promise_id"] for row in page)
+    body = client.post("/api/batch", json={"requests": [f"/api/promises?ids={ids}",
+                                                        f"/api/promises/{page[0]['promise_id']}"]}).get_json()
+    listed, detail = body["responses"]
+    assert listed["body"]["data"] == page
+    assert "party" in detail["body"]["data"]["promise"]
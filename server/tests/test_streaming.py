@@ -0,0 +1,39 @@
+import json
+
+from model import db_pool
+
+
+def test_stream_matches_pages(client):
+    pages, cursor = [], None
+    while True:
+        body = client.get("/api/promises", query_string={"limit": 5, **({"cursor": cursor} if cursor else {})}).get_json()
+        pages.extend(body["data"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    response = client.get("/api/promises", headers={"Accept": "application/x-ndjson"})
+    streamed = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert streamed == pages
+
+
+def test_stream_batches_do_not_hold_a_reader(client):
+    models = client.application.extensions["models"]
+    pool = models.promises.pool
+    batches = models.promises.iter_promises_with_politician_info(batch_size=2)
+    first = next(batches)
+    # ระหว่างที่ client ยังอ่าน batch แรกไม่เสร็จ reader ต้องกลับเข้า pool แล้ว
+    assert pool._idle.qsize() == pool._created
+    rest = [row for batch in batches for row in batch]
+    assert len(first) + len(rest) == len(models.promises.get_promises_page(limit=200)["data"])
+
+
+def test_pool_timeout_is_503(client, monkeypatch):
+    pool = client.application.extensions["models"].promises.pool
+    monkeypatch.setattr(db_pool, "CHECKOUT_TIMEOUT", 0.05)
+    monkeypatch.setattr(pool, "max_readers", 1)
+    with pool.reader():
+        for path in ("/api/promises?limit=5", "/api/promises?stream=1"):
+            response = client.get(path, headers={"Cache-Control": "no-cache"})
+            assert response.status_code == 503, path
+            assert response.headers["Retry-After"]